@@ -10,105 +10,156 @@ Inclui métricas solicitadas pelos revisores:
 
 import pandas as pd
 import numpy as np
+import csv
+import io
+import json
 import os
-import re
+import sys
 from datetime import datetime
 from collections import defaultdict
 
+from catalog import CSV_PATH, PROJECT_DIR, load_catalog, short_model_names
+from keywords import has_all, has_any
+from trends import compute_trends, parse_periods
+from bootstrap import CORRELATION_PAIRS, bootstrap_confidence_intervals
+from correlation_matrix import N_PERMUTATIONS, compute_correlation_matrix, pair_result
+from instrumentation import (instrumented, stage, enabled, start_trace, stop_trace, format_summary,
+                             write_trace)
+
 # Configuração de caminhos
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
-CSV_PATH = os.path.join(PROJECT_DIR, "Table1_v12 - Cópia de Página1.csv")
 OUTPUT_PATH = os.path.join(PROJECT_DIR, "Alterações", "RELATORIO_TABELA.txt")
+# Trace da instrumentação (--profile), ao lado do relatório
+TRACE_SUFFIX = "_perfil.json"
 
 CURRENT_YEAR = 2026
 
 
-def load_data():
-    """Carrega e limpa o CSV"""
-    df = pd.read_csv(CSV_PATH, encoding='utf-8')
-    return df
+def load_data(csv_path=CSV_PATH):
+    """Carrega o catálogo tipado (cacheado por hash do CSV)"""
+    return load_catalog(csv_path)
 
 
-def extract_number(value, get_max=True):
-    """Extrai número de uma string (máximo ou mínimo)"""
-    if pd.isna(value):
-        return None
-    nums = re.findall(r'\d+', str(value))
-    if not nums:
-        return None
-    nums = [int(n) for n in nums]
-    return max(nums) if get_max else min(nums)
+GRADES = ['Consumer', 'Research', 'Clinical']
 
+# Limiares da classificação por grade (R3C4)
+GRADE_THRESHOLDS = {
+    'price_low': 500,
+    'price_high': 2000,
+    'channels_low': 8,
+    'channels_high': 16
+}
 
-def extract_price(value):
-    """Extrai preço de uma string"""
-    if pd.isna(value):
-        return None
-    p_str = str(value).strip()
-    if p_str in ['---', '-', '', 'nan']:
-        return None
-    p_clean = p_str.replace('>', '').replace('<', '').replace(',', '').replace('$', '').strip()
-    try:
-        return float(p_clean)
-    except:
-        return None
-
+# Grade de limiares para a análise de sensibilidade
+GRADE_SWEEP_GRID = {
+    'price_low': np.arange(200, 1001, 100),
+    'price_high': np.arange(1000, 5001, 500),
+    'channels_low': np.array([4, 6, 8, 10, 12]),
+    'channels_high': np.array([12, 16, 20, 24, 32])
+}
 
-def has_open_api(row):
-    """Verifica se dispositivo tem API aberta"""
-    software = str(row.get('Bundled Software', '')).lower()
-    sync = str(row.get('Data Synchronization', '')).lower()
-    raw_data = str(row.get('Raw data access', '')).lower()
-    
-    keywords = ['open', 'sdk', 'api', 'lsl', 'free']
-    return any(k in software or k in sync or k in raw_data for k in keywords)
+# Dispositivos por bloco na varredura (memória constante; float32 é exato até 2**24)
+SWEEP_CHUNK_ROWS = 65_536
 
 
-def is_dry_electrode(row):
-    """Verifica se usa eletrodo seco"""
-    sensor = str(row.get('Sensor Type', '')).lower()
-    return 'dry' in sensor
+def grade_features(df):
+    """Vetores usados pela classificação por grade (preço/canais zero contam como ausentes)"""
+    features = df['features'].to_numpy()
+    
+    return {
+        'price': df['price'].where(df['price'] != 0).to_numpy(dtype=float),
+        'channels': df['channels_max'].where(df['channels_max'] != 0).to_numpy(dtype=float),
+        'clinical': has_any(features, 'clinical_grade'),
+        'wet_gel': has_all(features, 'sensor_wet', 'sensor_gel'),
+        'dry_or_semi': has_any(features, 'sensor_dry', 'sensor_semi')
+    }
 
 
-def classify_grade(row):
-    """Classifica dispositivo em Consumer/Research/Clinical (R3C4)"""
-    price = extract_price(row.get('Price (USD)'))
-    channels = extract_number(row.get('Channels'))
-    sensor_type = str(row.get('Sensor Type', '')).lower()
-    aux = str(row.get('Auxiliary capabilities', '')).lower()
-    
-    # Clinical indicators
-    clinical_keywords = ['fda', 'medical', 'clinical', 'ce mark', 'certified']
-    is_clinical = any(k in aux.lower() for k in clinical_keywords)
-    
-    if is_clinical:
-        return 'Clinical'
+def classify_grade(df, price_low=500, price_high=2000, channels_low=8, channels_high=16):
+    """Classifica todos os dispositivos em Consumer/Research/Clinical (R3C4)"""
+    f = grade_features(df)
+    
+    # Comparações com NaN são sempre falsas (valor ausente não decide a regra)
+    with np.errstate(invalid='ignore'):
+        # Research grade: >$2000 OR >16 channels OR wet electrodes
+        research = (f['price'] > price_high) | (f['channels'] > channels_high) | f['wet_gel']
+        # Consumer: <$500 OR <=8 channels OR dry/semi-dry electrodes
+        consumer = (f['price'] < price_low) | (f['channels'] <= channels_low) | f['dry_or_semi']
+    
+    # Ordem das regras: Clinical > Research > Consumer; na dúvida, Research
+    grade = np.select(
+        [f['clinical'], research, consumer],
+        ['Clinical', 'Research', 'Consumer'],
+        default='Research'
+    )
+    return pd.Series(pd.Categorical(grade, categories=GRADES), index=df.index, name='grade')
+
+
+@instrumented
+def sweep_grade_thresholds(df, grid=None):
+    """Contagem por grade para todas as combinações de limiares (sensibilidade R3C4)"""
+    grid = {**GRADE_SWEEP_GRID, **(grid or {})}
+    price_low = np.asarray(grid['price_low'], dtype=float)
+    price_high = np.asarray(grid['price_high'], dtype=float)
+    channels_low = np.asarray(grid['channels_low'], dtype=float)
+    channels_high = np.asarray(grid['channels_high'], dtype=float)
+    
+    f = grade_features(df)
+    n_clinical = int(f['clinical'].sum())
+    
+    # Apenas dispositivos não clínicos dependem dos limiares
+    keep = ~f['clinical']
+    price_all = f['price'][keep]
+    channels_all = f['channels'][keep]
+    wet_gel = f['wet_gel'][keep]
+    dry_or_semi = f['dry_or_semi'][keep]
+    
+    # Consumer = não-Research E regra Consumer, para cada par de combinações,
+    # acumulado por blocos de dispositivos
+    consumer_counts = np.zeros((len(price_high) * len(channels_high), len(price_low) * len(channels_low)),
+                               dtype=np.int64)
+    for start in range(0, len(price_all), SWEEP_CHUNK_ROWS):
+        block = slice(start, start + SWEEP_CHUNK_ROWS)
+        price = price_all[block][:, None, None]
+        channels = channels_all[block][:, None, None]
+        
+        with np.errstate(invalid='ignore'):
+            # (dispositivo, price_high, channels_high)
+            research = ((price > price_high[None, :, None])
+                        | (channels > channels_high[None, None, :])
+                        | wet_gel[block][:, None, None])
+            # (dispositivo, price_low, channels_low)
+            consumer = ((price < price_low[None, :, None])
+                        | (channels <= channels_low[None, None, :])
+                        | dry_or_semi[block][:, None, None])
+        
+        n = len(price)
+        not_research = (~research).reshape(n, -1).astype(np.float32)
+        consumer = consumer.reshape(n, -1).astype(np.float32)
+        consumer_counts += (not_research.T @ consumer).round().astype(np.int64)
     
-    # Research grade: >$2000 OR >16 channels OR wet electrodes
-    if price and price > 2000:
-        return 'Research'
-    if channels and channels > 16:
-        return 'Research'
-    if 'wet' in sensor_type and 'gel' in sensor_type:
-        return 'Research'
+    consumer_counts = consumer_counts.reshape(
+        len(price_high), len(channels_high), len(price_low), len(channels_low)
+    ).transpose(2, 0, 3, 1)
     
-    # Consumer: <$500 OR <=8 channels OR dry/semi-dry electrodes
-    if price and price < 500:
-        return 'Consumer'
-    if channels and channels <= 8:
-        return 'Consumer'
-    if 'dry' in sensor_type or 'semi' in sensor_type:
-        return 'Consumer'
+    pl, ph, cl, ch = np.meshgrid(price_low, price_high, channels_low, channels_high, indexing='ij')
+    consumer_counts = consumer_counts.ravel()
     
-    # Default to Research if unclear
-    return 'Research'
+    return pd.DataFrame({
+        'price_low': pl.ravel(),
+        'price_high': ph.ravel(),
+        'channels_low': cl.ravel().astype(int),
+        'channels_high': ch.ravel().astype(int),
+        'Consumer': consumer_counts,
+        'Research': len(df) - n_clinical - consumer_counts,
+        'Clinical': n_clinical
+    })
 
 
 # ============================================================================
 # ANÁLISES BÁSICAS
 # ============================================================================
 
+@instrumented
 def analyze_years(df):
     """Análise de anos de lançamento"""
     years = df['Year of first appearance'].dropna()
@@ -123,6 +174,7 @@ def analyze_years(df):
     }
 
 
+@instrumented
 def analyze_manufacturers(df):
     """Análise de fabricantes"""
     manufacturers = df['Manufacturer'].dropna().str.strip()
@@ -131,6 +183,7 @@ def analyze_manufacturers(df):
     return {'total': len(unique), 'list': sorted(unique)}
 
 
+@instrumented
 def analyze_countries(df):
     """Análise de países"""
     countries = df['Origin'].dropna().str.strip()
@@ -141,23 +194,20 @@ def analyze_countries(df):
     }
 
 
+@instrumented
 def analyze_technology(df):
     """Análise de tecnologias"""
     tech = df['Technology'].dropna().str.strip()
     return {'counts': tech.value_counts().to_dict()}
 
 
+@instrumented
 def analyze_prices(df):
     """Análise de preços"""
-    valid_prices = []
-    missing = 0
-    
-    for p in df['Price (USD)'].dropna():
-        price = extract_price(p)
-        if price:
-            valid_prices.append(price)
-        else:
-            missing += 1
+    has_cell = df['Price (USD)'].notna()
+    prices = df.loc[has_cell, 'price']
+    valid_prices = prices[prices.notna() & (prices != 0)].tolist()
+    missing = int(has_cell.sum()) - len(valid_prices)
     
     return {
         'total_with_price': len(valid_prices),
@@ -169,10 +219,10 @@ def analyze_prices(df):
     }
 
 
+@instrumented
 def analyze_channels(df):
     """Análise de canais"""
-    channel_values = [extract_number(c) for c in df['Channels'].dropna()]
-    channel_values = [c for c in channel_values if c is not None]
+    channel_values = df['channels_max'].dropna().astype(int).tolist()
     
     return {
         'min': min(channel_values) if channel_values else None,
@@ -182,10 +232,10 @@ def analyze_channels(df):
     }
 
 
+@instrumented
 def analyze_studies(df):
     """Análise de estudos"""
-    studies_values = [extract_number(s) for s in df['Studies Found'].dropna()]
-    studies_values = [s for s in studies_values if s is not None]
+    studies_values = df['studies'].dropna().astype(int).tolist()
     
     return {
         'total': sum(studies_values),
@@ -200,6 +250,7 @@ def analyze_studies(df):
 # ANÁLISES AVANÇADAS - REVISORES
 # ============================================================================
 
+@instrumented
 def calculate_lorenz_gini(values):
     """Calcula Curva de Lorenz e Coeficiente de Gini (R3C3)"""
     if not values or len(values) == 0:
@@ -226,25 +277,17 @@ def calculate_lorenz_gini(values):
     return lorenz_y.tolist(), round(gini, 4)
 
 
+@instrumented
 def calculate_correlations(df):
     """Calcula correlações estatísticas (R3C3)"""
-    data = []
-    
-    for _, row in df.iterrows():
-        price = extract_price(row.get('Price (USD)'))
-        channels = extract_number(row.get('Channels'))
-        studies = extract_number(row.get('Studies Found'))
-        
-        if studies is not None:
-            data.append({
-                'price': price,
-                'channels': channels,
-                'studies': studies,
-                'open_api': 1 if has_open_api(row) else 0,
-                'dry_electrode': 1 if is_dry_electrode(row) else 0
-            })
-    
-    df_analysis = pd.DataFrame(data)
+    with_studies = df[df['studies'].notna()]
+    df_analysis = pd.DataFrame({
+        'price': with_studies['price'],
+        'channels': with_studies['channels_max'],
+        'studies': with_studies['studies'],
+        'open_api': with_studies['open_api'].astype(int),
+        'dry_electrode': with_studies['dry_electrode'].astype(int)
+    })
     
     correlations = {}
     
@@ -289,148 +332,269 @@ def calculate_correlations(df):
     return correlations
 
 
-def analyze_temporal_trends(df):
+@instrumented
+def analyze_temporal_trends(df, periods=None):
     """Análises temporais (R1C1, R3C5)"""
-    # Agrupar por período
-    periods = {
-        '2008-2014': (2008, 2014),
-        '2015-2018': (2015, 2018),
-        '2019-2022': (2019, 2022),
-        '2023-2025': (2023, 2025)
-    }
-    
-    trends = {period: {
-        'devices': 0,
-        'channels': [],
-        'prices': [],
-        'wireless_bluetooth': 0,
-        'wireless_wifi': 0
-    } for period in periods}
-    
-    for _, row in df.iterrows():
-        year = extract_number(row.get('Year of first appearance'))
-        if year is None:
-            continue
-        
-        for period_name, (start, end) in periods.items():
-            if start <= year <= end:
-                trends[period_name]['devices'] += 1
-                
-                # Canais
-                channels = extract_number(row.get('Channels'))
-                if channels:
-                    trends[period_name]['channels'].append(channels)
-                
-                # Preço
-                price = extract_price(row.get('Price (USD)'))
-                if price:
-                    trends[period_name]['prices'].append(price)
-                
-                # Wireless
-                wireless = str(row.get('Wireless Connectivity', '')).lower()
-                if 'bluetooth' in wireless or 'ble' in wireless:
-                    trends[period_name]['wireless_bluetooth'] += 1
-                if 'wi-fi' in wireless or 'wifi' in wireless:
-                    trends[period_name]['wireless_wifi'] += 1
-                
-                break
-    
-    # Calcular médias e porcentagens
-    for period in trends:
-        t = trends[period]
-        t['avg_channels'] = sum(t['channels']) / len(t['channels']) if t['channels'] else 0
-        t['avg_price'] = sum(t['prices']) / len(t['prices']) if t['prices'] else 0
-        t['pct_bluetooth'] = 100 * t['wireless_bluetooth'] / t['devices'] if t['devices'] > 0 else 0
-        t['pct_wifi'] = 100 * t['wireless_wifi'] / t['devices'] if t['devices'] > 0 else 0
-        
-        # Custo por canal
-        if t['channels'] and t['prices']:
-            costs_per_channel = []
-            for ch, pr in zip(t['channels'], t['prices']):
-                if ch > 0:
-                    costs_per_channel.append(pr / ch)
-            t['avg_cost_per_channel'] = sum(costs_per_channel) / len(costs_per_channel) if costs_per_channel else 0
-        else:
-            t['avg_cost_per_channel'] = 0
-    
-    return trends
+    trends = compute_trends(df, periods)
+    return trends.to_dict('index')
 
 
+@instrumented
 def classify_all_devices(df):
     """Classifica todos os dispositivos (R1C2, R3C4)"""
-    grades = {'Consumer': 0, 'Research': 0, 'Clinical': 0}
-    device_grades = []
-    
-    for _, row in df.iterrows():
-        grade = classify_grade(row)
-        grades[grade] += 1
-        model = str(row.get('Model', 'Unknown')).split('\n')[0][:40]
-        device_grades.append({'model': model, 'grade': grade})
+    grade = classify_grade(df, **GRADE_THRESHOLDS)
+    grades = {k: int(v) for k, v in grade.value_counts().reindex(GRADES).items()}
+    
+    device_grades = [
+        {'model': model, 'grade': g}
+        for model, g in zip(short_model_names(df), grade.astype(str))
+    ]
+    return grade_summary(grades, sweep_grade_thresholds(df), len(df), device_grades)
+
+
+def grade_summary(grades, sweep, n_devices, devices=None):
+    """Contagens, porcentagens e sensibilidade aos limiares a partir das contagens por grade"""
+    # Sensibilidade aos limiares: faixa de % por grade sobre toda a grade de limiares
+    sensitivity = {
+        k: (round(100 * sweep[k].min() / n_devices, 1), round(100 * sweep[k].max() / n_devices, 1))
+        for k in GRADES
+    }
     
     return {
         'counts': grades,
-        'percentages': {k: round(100 * v / len(df), 1) for k, v in grades.items()},
-        'devices': device_grades
+        'percentages': {k: round(100 * v / n_devices, 1) for k, v in grades.items()},
+        'devices': devices,
+        'sensitivity': sensitivity,
+        'sweep_size': len(sweep)
     }
 
 
+@instrumented
 def calculate_articles_per_year(df):
     """Calcula artigos/ano normalizado (R1C1)"""
-    results = []
+    valid = df['year'].notna() & df['studies'].notna() & (df['studies'] != 0)
+    data = pd.DataFrame({
+        'model': short_model_names(df[valid]),
+        'year': df.loc[valid, 'year'].astype(int),
+        'studies': df.loc[valid, 'studies'].astype(int)
+    })
     
-    for _, row in df.iterrows():
-        model = str(row.get('Model', 'Unknown')).split('\n')[0][:40]
-        year = extract_number(row.get('Year of first appearance'))
-        studies = extract_number(row.get('Studies Found'))
-        
-        if year is None or studies is None or studies == 0:
-            continue
-        
-        years_active = CURRENT_YEAR - year
-        if years_active > 0:
-            articles_per_year = studies / years_active
-            results.append({
-                'model': model,
-                'year': year,
-                'studies': studies,
-                'years_active': years_active,
-                'articles_per_year': round(articles_per_year, 2)
-            })
+    data['years_active'] = CURRENT_YEAR - data['year']
+    data = data[data['years_active'] > 0]
+    data['articles_per_year'] = (data['studies'] / data['years_active']).round(2)
     
-    results.sort(key=lambda x: x['articles_per_year'], reverse=True)
-    return results
+    data = data.sort_values('articles_per_year', ascending=False, kind='stable')
+    return data.to_dict('records')
 
 
 # ============================================================================
-# GERAÇÃO DO RELATÓRIO
+# RESULTADOS ESTRUTURADOS
 # ============================================================================
 
-def generate_report(df):
-    """Gera relatório completo"""
-    
-    # Análises básicas
-    years_data = analyze_years(df)
-    manufacturers_data = analyze_manufacturers(df)
-    countries_data = analyze_countries(df)
-    tech_data = analyze_technology(df)
-    prices_data = analyze_prices(df)
-    channels_data = analyze_channels(df)
+def compute_results(df, source=os.path.basename(CSV_PATH), n_boot=0, n_perm=N_PERMUTATIONS, periods='default'):
+    """
+    Executa todas as análises e reúne os resultados em um único dict.
+
+    Os valores são tipos simples (dict, list, str, números), então o
+    resultado pode ir direto para JSON; os renderizadores (texto, JSON,
+    Markdown, CSV) só leem este dict.
+
+    Args:
+        df: Catálogo tipado (load_data)
+        source: Nome do CSV de origem, citado no cabeçalho
+        n_boot: Reamostragens dos ICs por bootstrap (0 = sem ICs; o custo é
+            O(n_boot x dispositivos))
+        n_perm: Permutações da matriz de correlações (0 = só teste t; grupos
+            grandes usam o teste t, ver correlation_matrix.PERMUTATION_BUDGET)
+        periods: Períodos das tendências ('default' = os do artigo, 'yearly'
+            ou 'rolling:N', ver trends.parse_periods)
+
+    Returns:
+        Dict com uma chave por análise, mais 'placeholders' (valores do abstract)
+    """
+    periods = parse_periods(periods, df['year'])
     studies_data = analyze_studies(df)
-    
-    # Análises avançadas (revisores)
-    articles_per_year = calculate_articles_per_year(df)
     lorenz, gini = calculate_lorenz_gini(studies_data['values'])
-    correlations = calculate_correlations(df)
-    temporal_trends = analyze_temporal_trends(df)
-    device_grades = classify_all_devices(df)
     
-    report = f"""
+    parts = {
+        # Análises básicas
+        'years': analyze_years(df),
+        'manufacturers': analyze_manufacturers(df),
+        'countries': analyze_countries(df),
+        'technology': analyze_technology(df),
+        'prices': analyze_prices(df),
+        'channels': analyze_channels(df),
+        'studies': studies_data,
+        # Análises avançadas (revisores)
+        'articles_per_year': calculate_articles_per_year(df),
+        'lorenz': {
+            'gini': gini,
+            'curve': lorenz,
+            # % das citações que vêm dos 20% de dispositivos mais citados
+            'top20_share_pct': int((1 - lorenz[int(len(lorenz) * 0.8)]) * 100) if lorenz else None
+        },
+        'correlations': calculate_correlations(df),
+        'temporal_trends': analyze_temporal_trends(df, periods),
+        'grades': classify_all_devices(df)
+    }
+    parts['intervals'] = None
+    if n_boot:
+        with stage('bootstrap_confidence_intervals', df):
+            parts['intervals'] = bootstrap_confidence_intervals(df, n_boot=n_boot, periods=periods)
+    with stage('compute_correlation_matrix', df):
+        parts['matrix'] = compute_correlation_matrix(df, n_perm=n_perm)
+    
+    return build_results(parts, len(df), source)
+
+
+def build_results(parts, n_devices, source):
+    """
+    Monta o dict de resultados a partir das saídas de cada análise.
+    Compartilhado pelo modo em memória (compute_results) e pelo modo em
+    blocos (chunked_analysis), que chega às mesmas saídas por agregadores.
+    Sem bootstrap (parts['intervals'] None) os ICs ficam None. Com
+    parts['sample'] ({'rows', 'devices'}), ICs e matriz vieram de uma amostra.
+    """
+    years_data = parts['years']
+    studies_data = parts['studies']
+    articles_per_year = parts['articles_per_year']
+    correlations = parts['correlations']
+    intervals = parts['intervals']
+    matrix = parts['matrix']
+    
+    years_data['year_counts'] = {int(year): int(count) for year, count in sorted(years_data['year_counts'].items())}
+    
+    # Correlações com adoção: estimativa, teste de permutação e ICs por bootstrap
+    for key, data in correlations.items():
+        # None quando a entrada da matriz (no modo em blocos, uma amostra)
+        # tem menos de 3 linhas completas para o par
+        test = pair_result(matrix, CORRELATION_PAIRS[key], 'studies')
+        strength = abs(data['correlation'])
+        cis = intervals['correlations'][key] if intervals else None
+        data.update({
+            'pearson_p': float(test['pearson_p']) if test else None,
+            'pearson_q': float(test['pearson_q']) if test else None,
+            'significant': bool(test['significant']) if test else False,
+            'strength': 'forte' if strength > 0.5 else 'moderada' if strength > 0.3 else 'fraca',
+            'pearson_ci': list(cis['pearson_ci']) if cis else None,
+            'spearman': round(float(test['spearman']), 4) if test else None,
+            'spearman_ci': list(cis['spearman_ci']) if cis else None
+        })
+    
+    pairs = matrix['pairs']
+    significant = pairs[pairs['significant']]
+    significant = significant.reindex(significant['pearson'].abs().sort_values(ascending=False).index)
+    
+    top5_studies = sum(d['studies'] for d in articles_per_year[:5])
+    
+    return {
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'source': source,
+        'total_devices': n_devices,
+        'years': years_data,
+        'manufacturers': parts['manufacturers'],
+        'countries': parts['countries'],
+        'technology': parts['technology'],
+        'prices': parts['prices'],
+        'channels': parts['channels'],
+        'studies': studies_data,
+        'articles_per_year': articles_per_year,
+        'lorenz': {
+            **parts['lorenz'],
+            'gini_ci': list(intervals['gini_ci']) if intervals else None,
+            'top5_studies': top5_studies,
+            'top5_pct': 100 * top5_studies / studies_data['total'] if studies_data['total'] else None
+        },
+        'bootstrap': {'confidence': intervals['confidence'], 'n_boot': intervals['n_boot']} if intervals else None,
+        # Amostra usada por ICs e matriz (None = todos os dispositivos)
+        'sample': parts.get('sample'),
+        'correlations': correlations,
+        'correlation_matrix': {
+            'variables': len(matrix['pearson']),
+            'n_pairs': len(pairs),
+            'n_perm': matrix['n_perm'],
+            'n_t_test': matrix['n_t_test'],
+            'n_reduced': matrix['n_reduced'],
+            'correction': matrix['correction'],
+            'alpha': matrix['alpha'],
+            'pairs': pairs.to_dict('records'),
+            'significant_pairs': significant.to_dict('records')
+        },
+        'temporal_trends': parts['temporal_trends'],
+        'trend_intervals': {period: {metric: list(ci) for metric, ci in cis.items()}
+                            for period, cis in intervals['trends'].items()} if intervals else None,
+        'grades': parts['grades'],
+        'placeholders': {
+            'X': n_devices,
+            'Y': parts['manufacturers']['total'],
+            'N': parts['countries']['total']
+        }
+    }
+
+
+# ============================================================================
+# RENDERIZADORES (escrevem direto no arquivo, sem montar o texto inteiro)
+# ============================================================================
+
+def _pvalue_method(matrix):
+    """Origem dos p-valores da matriz: permutações, teste t ou os dois"""
+    if matrix['n_t_test'] == matrix['n_pairs']:
+        return "teste t"
+    if matrix['n_t_test'] == 0 and matrix['n_reduced'] == 0:
+        return f"{matrix['n_perm']} permutações"
+    method = f"até {matrix['n_perm']} permutações"
+    return method + (f"; teste t em {matrix['n_t_test']} pares" if matrix['n_t_test'] else "")
+
+
+def _dash(value, spec=''):
+    """Número formatado ("-" quando o par ficou sem teste)"""
+    return "-" if value is None else format(value, spec)
+
+
+def _ci_range(ci, prefix, spec):
+    """Intervalo "a-b" ("-" quando o período não tem dados para a métrica)"""
+    if ci[0] is None:
+        return "-"
+    return f"{prefix}{ci[0]:{spec}}-{prefix}{ci[1]:{spec}}"
+
+
+def write_text(results, f):
+    """Relatório em texto (formato do RELATORIO_TABELA.txt)"""
+    w = f.write
+    years_data = results['years']
+    manufacturers_data = results['manufacturers']
+    countries_data = results['countries']
+    prices_data = results['prices']
+    channels_data = results['channels']
+    studies_data = results['studies']
+    articles_per_year = results['articles_per_year']
+    lorenz = results['lorenz']
+    gini = lorenz['gini']
+    matrix = results['correlation_matrix']
+    temporal_trends = results['temporal_trends']
+    device_grades = results['grades']
+    placeholders = results['placeholders']
+    bootstrap = results['bootstrap']
+    conf = bootstrap['confidence'] if bootstrap else None
+    gini_ci = (f" (IC {conf}%: {lorenz['gini_ci']}, bootstrap com {bootstrap['n_boot']} reamostragens)"
+               if bootstrap else "")
+    # Resumo: primeiro e último período (2008-2014 e 2023-2025 nos períodos do artigo)
+    trend_summary = "   ✅ Tendências: sem períodos com dispositivos\n"
+    if temporal_trends:
+        first, last = list(temporal_trends)[0], list(temporal_trends)[-1]
+        trend_summary = (
+            f"   ✅ Tendência canais: {temporal_trends[first]['avg_channels']:.0f} → "
+            f"{temporal_trends[last]['avg_channels']:.0f} ({first} → {last})\n"
+            f"   ✅ Wireless: {temporal_trends[last]['pct_bluetooth']:.0f}% Bluetooth em {last}\n"
+        )
+    
+    w(f"""
 ================================================================================
 RELATÓRIO DE ANÁLISE DA TABELA DE DISPOSITIVOS
 ================================================================================
-Gerado em: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-Arquivo fonte: Table1_v12 - Cópia de Página1.csv
-Total de dispositivos: {len(df)}
+Gerado em: {results['generated_at']}
+Arquivo fonte: {results['source']}
+Total de dispositivos: {results['total_devices']}
 
 ================================================================================
 PARTE 1: ANÁLISES BÁSICAS
@@ -443,27 +607,27 @@ Dispositivos sem ano: {years_data['total_without_year']}
 Período: {years_data['min_year']} - {years_data['max_year']}
 
 Distribuição por ano:
-"""
+""")
     
-    for year, count in sorted(years_data['year_counts'].items()):
-        report += f"  {int(year)}: {int(count)} dispositivos\n"
+    for year, count in years_data['year_counts'].items():
+        w(f"  {year}: {count} dispositivos\n")
     
-    report += f"""
+    w(f"""
 🏭 FABRICANTES: {manufacturers_data['total']} únicos
 🌍 PAÍSES: {countries_data['total']} países
 
 Principais países:
-"""
+""")
     for country, count in sorted(countries_data['counts'].items(), key=lambda x: -x[1])[:10]:
-        report += f"  {country}: {count} dispositivos\n"
+        w(f"  {country}: {count} dispositivos\n")
     
-    report += f"""
+    w(f"""
 🔬 TECNOLOGIAS
-"""
-    for tech, count in sorted(tech_data['counts'].items(), key=lambda x: -x[1]):
-        report += f"  {tech}: {count} dispositivos\n"
+""")
+    for tech, count in sorted(results['technology']['counts'].items(), key=lambda x: -x[1]):
+        w(f"  {tech}: {count} dispositivos\n")
     
-    report += f"""
+    w(f"""
 💰 PREÇOS (USD)
 ------------------------------------------
 Com preço: {prices_data['total_with_price']} | Sem preço: {prices_data['total_without_price']}
@@ -483,39 +647,63 @@ PARTE 2: MÉTRICAS DOS REVISORES
 
 📈 R1C1 + R3C5: ARTIGOS POR ANO (TOP 20)
 ------------------------------------------
-"""
+""")
     for i, item in enumerate(articles_per_year[:20], 1):
-        report += f"  {i:2}. {item['model']:<40} | {item['articles_per_year']:>6.2f} art/ano | ({item['studies']} / {item['years_active']} anos)\n"
+        w(f"  {i:2}. {item['model']:<40} | {item['articles_per_year']:>6.2f} art/ano | ({item['studies']} / {item['years_active']} anos)\n")
     
-    report += f"""
+    top20_share = lorenz['top20_share_pct'] if lorenz['top20_share_pct'] is not None else '?'
+    w(f"""
 📉 R3C3: CURVA DE LORENZ E COEFICIENTE DE GINI
 ------------------------------------------
-Coeficiente de Gini: {gini}
+Coeficiente de Gini: {gini}{gini_ci}
 Interpretação: {'Alta concentração (poucos dispositivos dominam)' if gini and gini > 0.5 else 'Distribuição mais equilibrada'}
 
 Pontos significativos:
-- 80% dos dispositivos contribuem com ~{int((1-lorenz[int(len(lorenz)*0.8)]) * 100) if lorenz else '?'}% das citações
-- Top 5 dispositivos: {sum(d['studies'] for d in articles_per_year[:5])} estudos ({100*sum(d['studies'] for d in articles_per_year[:5])/studies_data['total']:.1f}% do total)
+- 80% dos dispositivos contribuem com ~{top20_share}% das citações
+- Top 5 dispositivos: {lorenz['top5_studies']} estudos ({lorenz['top5_pct']:.1f}% do total)
 
 🔗 R3C3: CORRELAÇÕES
 ------------------------------------------
-"""
-    for key, data in correlations.items():
-        report += f"""  {key.replace('_', ' ').title()}:
-    r = {data['correlation']} (n={data['n']}) → Correlação {data['interpretation']}
-"""
-    
-    report += f"""
+""")
+    for key, data in results['correlations'].items():
+        significance = 'significativa' if data['significant'] else 'não significativa'
+        w(f"""  {key.replace('_', ' ').title()}:
+    r = {data['correlation']} (n={data['n']}, p={_dash(data['pearson_p'], '.4f')}, q={_dash(data['pearson_q'], '.4f')}) → Correlação {data['interpretation']} ({significance})
+""")
+        if bootstrap:
+            w(f"    IC {conf}% de r: {data['pearson_ci']} | Spearman ρ = {_dash(data['spearman'])} (IC {conf}%: {data['spearman_ci']})\n")
+        else:
+            w(f"    Spearman ρ = {_dash(data['spearman'])}\n")
+    
+    w(f"""
+Matriz completa: {matrix['variables']} variáveis, {matrix['n_pairs']} pares
+Pares significativos ({_pvalue_method(matrix)}, correção {matrix['correction']}, q de Pearson < {matrix['alpha']}): {len(matrix['significant_pairs'])}
+""")
+    if results['sample']:
+        w(f"Matriz, p-valores e ICs calculados sobre amostra aleatória de {results['sample']['rows']:,} "
+          f"de {results['sample']['devices']:,} dispositivos\n")
+    for row in matrix['significant_pairs']:
+        w(f"    {row['x']:<14} x {row['y']:<14} | r = {row['pearson']:+.3f} (q={row['pearson_q']:.4f}) | ρ = {row['spearman']:+.3f} (q={row['spearman_q']:.4f}) | n={row['n']}\n")
+    
+    w(f"""
 ⏳ R3C5: TENDÊNCIAS TEMPORAIS
 ------------------------------------------
-"""
-    report += f"{'Período':<15} | {'Disp.':<6} | {'Canais':<8} | {'Preço':<10} | {'$/Canal':<10} | {'BT%':<6} | {'WiFi%':<6}\n"
-    report += "-" * 85 + "\n"
+""")
+    w(f"{'Período':<15} | {'Disp.':<6} | {'Canais':<8} | {'Preço':<10} | {'$/Canal':<10} | {'BT%':<6} | {'WiFi%':<6}\n")
+    w("-" * 85 + "\n")
     
     for period, data in temporal_trends.items():
-        report += f"{period:<15} | {data['devices']:<6} | {data['avg_channels']:<8.1f} | ${data['avg_price']:<9.0f} | ${data['avg_cost_per_channel']:<9.0f} | {data['pct_bluetooth']:<5.1f}% | {data['pct_wifi']:<5.1f}%\n"
+        w(f"{period:<15} | {data['devices']:<6} | {data['avg_channels']:<8.1f} | ${data['avg_price']:<9.0f} | ${data['avg_cost_per_channel']:<9.0f} | {data['pct_bluetooth']:<5.1f}% | {data['pct_wifi']:<5.1f}%\n")
+    
+    if bootstrap:
+        w(f"\nIC {conf}% por bootstrap (canais | preço | $/canal):\n")
+    for period, ci in (results['trend_intervals'] or {}).items():
+        ch, pr, cpc = ci['avg_channels'], ci['avg_price'], ci['avg_cost_per_channel']
+        if ch[0] is None and pr[0] is None and cpc[0] is None:
+            continue
+        w(f"  {period:<13} | {_ci_range(ch, '', '.1f')} | {_ci_range(pr, '$', ',.0f')} | {_ci_range(cpc, '$', ',.0f')}\n")
     
-    report += f"""
+    w(f"""
 🏷️ R1C2 + R3C4: CLASSIFICAÇÃO POR GRADE
 ------------------------------------------
 Consumer-grade:  {device_grades['counts']['Consumer']:>3} dispositivos ({device_grades['percentages']['Consumer']}%)
@@ -527,49 +715,294 @@ Critérios utilizados:
 - Research: >$2000, >16 canais, eletrodos gel
 - Clinical: Certificação FDA/CE, uso médico declarado
 
+Sensibilidade aos limiares ({device_grades['sweep_size']} combinações de preço e canais):
+- Consumer: {device_grades['sensitivity']['Consumer'][0]}% a {device_grades['sensitivity']['Consumer'][1]}%
+- Research: {device_grades['sensitivity']['Research'][0]}% a {device_grades['sensitivity']['Research'][1]}%
+- Clinical: {device_grades['sensitivity']['Clinical'][0]}% a {device_grades['sensitivity']['Clinical'][1]}%
+
 ================================================================================
 PARTE 3: RESUMO PARA O ARTIGO
 ================================================================================
 
 📝 PLACEHOLDERS PARA ABSTRACT:
-   [X] dispositivos = {len(df)}
-   [Y] fabricantes = {manufacturers_data['total']}
-   [N] países = {countries_data['total']}
+   [X] dispositivos = {placeholders['X']}
+   [Y] fabricantes = {placeholders['Y']}
+   [N] países = {placeholders['N']}
 
 📝 MÉTRICAS PRONTAS PARA INSERIR:
    ✅ Gini = {gini} (distribuição concentrada)
    ✅ Top dispositivo: Epoc X com {articles_per_year[0]['articles_per_year']} art/ano
    ✅ Período analisado: {years_data['min_year']}-{years_data['max_year']}
-   ✅ Tendência canais: {temporal_trends['2008-2014']['avg_channels']:.0f} → {temporal_trends['2023-2025']['avg_channels']:.0f} (crescimento)
-   ✅ Wireless: {temporal_trends['2023-2025']['pct_bluetooth']:.0f}% Bluetooth em 2023-2025
-
+{trend_summary}
 📝 CORRELAÇÕES PARA DISCUSSION:
-"""
-    for key, data in correlations.items():
-        strength = "forte" if abs(data['correlation']) > 0.5 else "moderada" if abs(data['correlation']) > 0.3 else "fraca"
-        report += f"   - {key.replace('_', ' ')}: r={data['correlation']} ({strength})\n"
+""")
+    for key, data in results['correlations'].items():
+        w(f"   - {key.replace('_', ' ')}: r={data['correlation']} ({data['strength']})\n")
     
-    report += f"""
+    w(f"""
 ================================================================================
-"""
-    
-    return report
-
-
-def main():
-    print("Carregando dados...")
-    df = load_data()
-    print(f"Total de linhas: {len(df)}")
+""")
+    
+    if 'instrumentation' in results:
+        w("\n⏱️ INSTRUMENTAÇÃO POR ETAPA\n------------------------------------------\n")
+        w(format_summary(results['instrumentation']))
+        w(f"Trace JSON: {results['trace_path']}\n")
+
+
+def _json_ready(value):
+    """Tipos do numpy -> Python, NaN -> null, chaves -> str"""
+    if isinstance(value, dict):
+        return {str(k): _json_ready(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_ready(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def write_json(results, f):
+    """Resultados completos em JSON (json.dump grava em pedaços)"""
+    json.dump(_json_ready(results), f, ensure_ascii=False, indent=2)
+    f.write('\n')
+
+
+def _markdown_table(f, header, rows):
+    f.write('| ' + ' | '.join(header) + ' |\n')
+    f.write('|' + '|'.join('---' for _ in header) + '|\n')
+    for row in rows:
+        cells = ('' if v is None else str(v).replace('|', '\\|').replace('\n', ' ') for v in row)
+        f.write('| ' + ' | '.join(cells) + ' |\n')
+    f.write('\n')
+
+
+def _fmt(value, spec):
+    """Formata números, deixando None/NaN em branco"""
+    if value is None or value != value:
+        return ''
+    return format(value, spec)
+
+
+def write_markdown(results, f):
+    """Relatório em Markdown (resumo, tabelas e métricas do artigo)"""
+    lorenz = results['lorenz']
+    matrix = results['correlation_matrix']
+    bootstrap = results['bootstrap']
+    conf = bootstrap['confidence'] if bootstrap else None
+    
+    f.write("# Relatório de análise da tabela de dispositivos\n\n")
+    f.write(f"- Gerado em: {results['generated_at']}\n")
+    f.write(f"- Arquivo fonte: `{results['source']}`\n")
+    f.write(f"- Dispositivos: {results['total_devices']} | Fabricantes: {results['manufacturers']['total']} | "
+            f"Países: {results['countries']['total']}\n\n")
+    
+    f.write("## Análises básicas\n\n")
+    _markdown_table(f, ['Ano', 'Dispositivos'], results['years']['year_counts'].items())
+    _markdown_table(f, ['País', 'Dispositivos'],
+                    sorted(results['countries']['counts'].items(), key=lambda x: -x[1]))
+    _markdown_table(f, ['Tecnologia', 'Dispositivos'],
+                    sorted(results['technology']['counts'].items(), key=lambda x: -x[1]))
+    
+    f.write("## Artigos por ano (top 20)\n\n")
+    _markdown_table(f, ['#', 'Modelo', 'Art/ano', 'Estudos', 'Anos'], [
+        (i, item['model'], f"{item['articles_per_year']:.2f}", item['studies'], item['years_active'])
+        for i, item in enumerate(results['articles_per_year'][:20], 1)
+    ])
+    
+    f.write("## Gini e correlações\n\n")
+    if bootstrap:
+        f.write(f"Gini = {lorenz['gini']} (IC {conf}%: {lorenz['gini_ci']}, "
+                f"{bootstrap['n_boot']} reamostragens)\n\n")
+    else:
+        f.write(f"Gini = {lorenz['gini']}\n\n")
+    _markdown_table(f, ['Par', 'r', 'n', 'p', 'q', f'IC {conf}% de r' if bootstrap else 'IC de r', 'ρ',
+                        'Significativa'], [
+        (key.replace('_', ' '), data['correlation'], data['n'], _dash(data['pearson_p'], '.4f'),
+         _dash(data['pearson_q'], '.4f'), data['pearson_ci'], _dash(data['spearman']),
+         'sim' if data['significant'] else 'não')
+        for key, data in results['correlations'].items()
+    ])
+    f.write(f"Pares significativos da matriz ({_pvalue_method(matrix)}, "
+            f"{matrix['correction']}, q de Pearson < {matrix['alpha']}): {len(matrix['significant_pairs'])}\n\n")
+    if results['sample']:
+        f.write(f"Matriz, p-valores e ICs calculados sobre amostra aleatória de {results['sample']['rows']:,} "
+                f"de {results['sample']['devices']:,} dispositivos.\n\n")
+    _markdown_table(f, ['x', 'y', 'r', 'q (r)', 'ρ', 'q (ρ)', 'n'], [
+        (row['x'], row['y'], f"{row['pearson']:+.3f}", f"{row['pearson_q']:.4f}",
+         f"{row['spearman']:+.3f}", f"{row['spearman_q']:.4f}", row['n'])
+        for row in matrix['significant_pairs']
+    ])
+    
+    f.write("## Tendências temporais\n\n")
+    _markdown_table(f, ['Período', 'Disp.', 'Canais', 'Preço', '$/Canal', 'BT%', 'WiFi%'], [
+        (period, data['devices'], _fmt(data['avg_channels'], '.1f'), _fmt(data['avg_price'], ',.0f'),
+         _fmt(data['avg_cost_per_channel'], ',.0f'), _fmt(data['pct_bluetooth'], '.1f'),
+         _fmt(data['pct_wifi'], '.1f'))
+        for period, data in results['temporal_trends'].items()
+    ])
+    
+    f.write("## Classificação por grade\n\n")
+    grades = results['grades']
+    _markdown_table(f, ['Grade', 'Dispositivos', '%', 'Faixa na sensibilidade'], [
+        (grade, grades['counts'][grade], grades['percentages'][grade],
+         f"{grades['sensitivity'][grade][0]}% a {grades['sensitivity'][grade][1]}%")
+        for grade in GRADES
+    ])
+    
+    f.write("## Placeholders do abstract\n\n")
+    for key, value in results['placeholders'].items():
+        f.write(f"- [{key}] = {value}\n")
+    
+    if 'instrumentation' in results:
+        f.write("\n## Instrumentação por etapa\n\n```\n")
+        f.write(format_summary(results['instrumentation']))
+        f.write("```\n")
+
+
+# Tabelas exportadas em CSV: nome -> função que gera (cabeçalho, linhas)
+CSV_TABLES = {
+    'anos': lambda r: (['year', 'devices'], r['years']['year_counts'].items()),
+    'paises': lambda r: (['country', 'devices'], r['countries']['counts'].items()),
+    'tecnologias': lambda r: (['technology', 'devices'], r['technology']['counts'].items()),
+    'artigos_por_ano': lambda r: (
+        ['model', 'year', 'studies', 'years_active', 'articles_per_year'],
+        ([d['model'], d['year'], d['studies'], d['years_active'], d['articles_per_year']]
+         for d in r['articles_per_year'])
+    ),
+    'correlacoes': lambda r: (
+        ['pair', 'pearson', 'n', 'pearson_p', 'pearson_q', 'pearson_ci_low', 'pearson_ci_high',
+         'spearman', 'spearman_ci_low', 'spearman_ci_high', 'significant'],
+        ([key, d['correlation'], d['n'], d['pearson_p'], d['pearson_q'], *(d['pearson_ci'] or (None, None)),
+          d['spearman'], *(d['spearman_ci'] or (None, None)), d['significant']]
+         for key, d in r['correlations'].items())
+    ),
+    'matriz_pares': lambda r: (
+        ['x', 'y', 'n', 'pearson', 'pearson_p', 'pearson_q', 'spearman', 'spearman_p', 'spearman_q',
+         'significant'],
+        ([p['x'], p['y'], p['n'], p['pearson'], p['pearson_p'], p['pearson_q'], p['spearman'],
+          p['spearman_p'], p['spearman_q'], p['significant']] for p in r['correlation_matrix']['pairs'])
+    ),
+    'tendencias': lambda r: (
+        ['period', 'devices', 'avg_channels', 'avg_price', 'avg_cost_per_channel', 'pct_bluetooth', 'pct_wifi'],
+        ([period, d['devices'], d['avg_channels'], d['avg_price'], d['avg_cost_per_channel'],
+          d['pct_bluetooth'], d['pct_wifi']] for period, d in r['temporal_trends'].items())
+    ),
+    # Sem a lista por dispositivo (modo em blocos) a tabela não é gravada
+    'grades': lambda r: None if r['grades']['devices'] is None else (
+        ['model', 'grade'], ([d['model'], d['grade']] for d in r['grades']['devices'])
+    ),
+}
+
+
+def write_csv_tables(results, base_path):
+    """
+    Uma tabela CSV por análise: <base_path>_<tabela>.csv.
+
+    Returns:
+        Lista dos arquivos gravados
+    """
+    paths = []
+    for name, build in CSV_TABLES.items():
+        table = build(results)
+        if table is None:
+            continue
+        header, rows = table
+        path = f"{base_path}_{name}.csv"
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        paths.append(path)
+    return paths
+
+
+RENDERERS = {'txt': write_text, 'json': write_json, 'md': write_markdown}
+FORMATS = ('txt', 'json', 'md', 'csv')
+
+
+def generate_report(df, n_boot=0, n_perm=N_PERMUTATIONS, periods='default'):
+    """Gera relatório completo (texto)"""
+    buffer = io.StringIO()
+    write_text(compute_results(df, n_boot=n_boot, n_perm=n_perm, periods=periods), buffer)
+    return buffer.getvalue()
+
+
+def write_results(results, output_path, formats=('txt',)):
+    """
+    Grava os resultados em cada formato pedido. O texto vai para output_path;
+    os demais usam o mesmo nome com outra extensão (.json, .md) ou, no CSV,
+    um arquivo por tabela (<nome>_<tabela>.csv).
+
+    Returns:
+        Lista dos arquivos gravados
+    """
+    base = os.path.splitext(output_path)[0]
+    paths = []
+    for fmt in formats:
+        if fmt == 'csv':
+            paths.extend(write_csv_tables(results, base))
+            continue
+        path = output_path if fmt == 'txt' else f"{base}.{fmt}"
+        with open(path, 'w', encoding='utf-8') as f:
+            RENDERERS[fmt](results, f)
+        paths.append(path)
+    return paths
+
+
+def main(csv_path=CSV_PATH, output_path=OUTPUT_PATH, profile=False, formats=('txt',),
+         chunk_rows=None, workers=1, n_boot=0, n_perm=N_PERMUTATIONS, periods='default'):
+    """
+    Gera o relatório e grava em output_path (e nos outros formatos pedidos:
+    txt, json, md, csv).
+
+    Com chunk_rows, lê o CSV em blocos desse tamanho (chunked_analysis),
+    para catálogos maiores que a memória; o relatório é o mesmo (acima de
+    chunked_analysis.SAMPLE_ROWS dispositivos, ICs e matriz usam uma amostra).
+    
+    Com n_boot > 0, inclui os ICs por bootstrap com n_boot reamostragens
+    (desligados por padrão: custo O(n_boot x dispositivos)). n_perm é o
+    número de permutações da matriz de correlações (0 = só teste t).
+    periods escolhe os períodos das tendências (default, yearly ou rolling:N).
+
+    Com profile=True, mede cada etapa (instrumentation) e acrescenta o
+    resumo ao fim do relatório; o trace JSON vai para <relatório>_perfil.json.
+    A variável de ambiente BRAIN_DEVICES_TRACE=1 tem o mesmo efeito.
+    """
+    profile = profile or enabled()
+    if profile:
+        start_trace()
+    
+    if chunk_rows:
+        import chunked_analysis
+        print(f"Gerando relatório em blocos de {chunk_rows:,} linhas...")
+        results = chunked_analysis.compute_results_chunked(csv_path, chunk_rows, workers, n_boot, n_perm,
+                                                           periods)
+        print(f"Total de linhas: {results['total_devices']}")
+    else:
+        print("Carregando dados...")
+        with stage('load_data'):
+            df = load_data(csv_path)
+        print(f"Total de linhas: {len(df)}")
+        
+        print("Gerando relatório com métricas avançadas...")
+        with stage('compute_results', df):
+            results = compute_results(df, source=os.path.basename(csv_path), n_boot=n_boot, n_perm=n_perm,
+                                      periods=periods)
     
-    print("Gerando relatório com métricas avançadas...")
-    report = generate_report(df)
+    if profile:
+        records = stop_trace()
+        trace_path = os.path.splitext(output_path)[0] + TRACE_SUFFIX
+        write_trace(records, trace_path, csv=os.path.basename(csv_path), dispositivos=results['total_devices'])
+        results['instrumentation'] = records
+        results['trace_path'] = trace_path
     
-    with open(OUTPUT_PATH, 'w', encoding='utf-8') as f:
-        f.write(report)
+    paths = write_results(results, output_path, formats)
     
-    print(f"\n✅ Relatório salvo em: {OUTPUT_PATH}")
     print("\n" + "="*60)
-    print(report)
+    write_text(results, sys.stdout)
+    for path in paths:
+        print(f"✅ Salvo em: {path}")
 
 
 if __name__ == "__main__":
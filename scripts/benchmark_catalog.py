@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de escala das análises do catálogo
+Gera catálogos sintéticos (synthetic_catalog) de vários tamanhos e mede
+tempo e pico de memória de cada ponto de entrada das análises: a leitura
+do CSV (load_catalog sem cache), generate_report, os scripts analyze_* e
+cada figura do generate_timeline. Cada execução é acrescentada a um
+arquivo JSONL, e --compare mostra a variação em relação à execução
+anterior, marcando as regressões.
+
+Tempo e memória são medidos em execuções separadas: o tracemalloc deixa o
+código mais lento e distorceria o tempo.
+
+Uso:
+    python benchmark_catalog.py [--sizes 100 1000 10000 100000 1000000] [--entries ...] [--compare]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from catalog import PROJECT_DIR, cache_path_for, load_catalog
+from synthetic_catalog import write_catalog
+
+RESULTS_PATH = os.path.join(PROJECT_DIR, ".cache", "benchmarks", "catalogo.jsonl")
+
+DEFAULT_SIZES = (100, 1000, 10000, 100_000, 1_000_000)
+
+# Variação de tempo/memória acima da qual a comparação marca regressão
+REGRESSION_THRESHOLD = 0.20
+# Diferenças de tempo menores que isto são ruído, qualquer que seja a razão
+MIN_TIME_DELTA_S = 0.05
+
+# Resolução das figuras no benchmark (o custo de desenho não depende do dpi
+# final; a rasterização sim, e ela não muda com o tamanho do catálogo)
+FIGURE_DPI = 100
+
+
+# ============================================================================
+# PONTOS DE ENTRADA
+# ============================================================================
+
+def _load_catalog_cold(csv_path):
+    load_catalog(csv_path, use_cache=False)
+
+
+def _generate_report(csv_path):
+    # Sem reamostragem (bootstrap e permutações, teste t na matriz): o custo
+    # delas é reamostragens x linhas e esconderia o do relatório em si
+    import analyze_table
+    analyze_table.generate_report(analyze_table.load_data(csv_path), n_boot=0, n_perm=0)
+
+
+def _script(name):
+    def run(csv_path):
+        module = __import__(name)
+        module.main(csv_path=csv_path)
+    return run
+
+
+def _figure(name):
+    def run(csv_path):
+        import generate_timeline
+        builder, args = generate_timeline.figure_jobs(csv_path)[name]
+        fig = builder(*args)
+        # Desenha de verdade (Agg) sem gravar arquivo
+        fig.savefig(io.BytesIO(), format='png', dpi=FIGURE_DPI, bbox_inches='tight')
+        generate_timeline.plt.close(fig)
+    return run
+
+
+# Módulos importados antes das medições (o import não entra no tempo)
+ENTRY_MODULES = ['analyze_table', 'analyze_prices', 'analyze_clinical', 'analyze_industrial',
+                 'generate_timeline']
+
+ENTRY_POINTS = {
+    'load_catalog': _load_catalog_cold,
+    'generate_report': _generate_report,
+    'analyze_prices': _script('analyze_prices'),
+    'analyze_clinical': _script('analyze_clinical'),
+    'analyze_industrial': _script('analyze_industrial'),
+    'timeline_scatter': _figure('timeline_scatter'),
+    'timeline_bar': _figure('timeline_bar'),
+    'temporal_trends': _figure('temporal_trends'),
+}
+
+
+# ============================================================================
+# MEDIÇÃO
+# ============================================================================
+
+def _quiet(func, *args):
+    """Executa sem imprimir no terminal (os scripts imprimem o relatório)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def measure(func, csv_path, repeat=1, memory=True):
+    """
+    Tempo (melhor de `repeat`) e pico de memória Python de uma chamada.
+
+    Returns:
+        {'time_s', 'peak_mb'} (peak_mb None se memory=False)
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _quiet(func, csv_path)
+        best = min(best, time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        tracemalloc.start()
+        try:
+            _quiet(func, csv_path)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        finally:
+            tracemalloc.stop()
+    return {'time_s': best, 'peak_mb': peak_mb}
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, entries=None, repeat=1, memory=True, seed=42, work_dir=None):
+    """
+    Mede cada ponto de entrada em cada tamanho de catálogo.
+
+    Os CSVs sintéticos ficam em um diretório temporário e o cache do
+    catalog é aquecido antes das medições (exceto load_catalog, que mede a
+    leitura sem cache); os caches criados são apagados no fim.
+
+    Yields:
+        {'entry', 'rows', 'time_s', 'peak_mb'} (ou 'error'), um por medição
+    """
+    entries = list(ENTRY_POINTS) if entries is None else entries
+    unknown = [e for e in entries if e not in ENTRY_POINTS]
+    if unknown:
+        raise ValueError(f"Pontos de entrada desconhecidos: {unknown}")
+    for module in ENTRY_MODULES:
+        __import__(module)
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        for rows in sizes:
+            csv_path = os.path.join(tmp, f"Table1_{rows}.csv")
+            write_catalog(csv_path, rows, seed)
+            cache_path = cache_path_for(csv_path)
+            load_catalog(csv_path)
+            try:
+                for entry in entries:
+                    try:
+                        result = measure(ENTRY_POINTS[entry], csv_path, repeat, memory)
+                    except Exception as e:
+                        result = {'error': f"{type(e).__name__}: {e}"}
+                    yield dict(result, entry=entry, rows=rows)
+            finally:
+                if os.path.exists(cache_path):
+                    os.remove(cache_path)
+
+
+# ============================================================================
+# RESULTADOS
+# ============================================================================
+
+def _git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def save_run(results, results_path=RESULTS_PATH, **metadata):
+    """Acrescenta uma execução ao arquivo JSONL de resultados"""
+    run = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        **metadata,
+        'resultados': results
+    }
+    os.makedirs(os.path.dirname(results_path), exist_ok=True)
+    with open(results_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run, ensure_ascii=False) + '\n')
+    return run
+
+
+def load_runs(results_path=RESULTS_PATH):
+    """Execuções gravadas, da mais antiga para a mais recente"""
+    if not os.path.exists(results_path):
+        return []
+    with open(results_path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare_runs(previous, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Variação de cada (ponto de entrada, tamanho) presente nas duas execuções.
+
+    Returns:
+        Lista de {'entry', 'rows', 'time_ratio', 'memory_ratio', 'regression'}
+    """
+    before = {(r['entry'], r['rows']): r for r in previous['resultados'] if 'error' not in r}
+    rows = []
+    for r in current['resultados']:
+        old = before.get((r['entry'], r['rows']))
+        if old is None or 'error' in r:
+            continue
+        time_ratio = r['time_s'] / old['time_s'] if old['time_s'] else None
+        memory_ratio = None
+        if r.get('peak_mb') and old.get('peak_mb'):
+            memory_ratio = r['peak_mb'] / old['peak_mb']
+        slower = (time_ratio is not None and time_ratio > 1 + threshold
+                  and r['time_s'] - old['time_s'] > MIN_TIME_DELTA_S)
+        regression = slower or (memory_ratio is not None and memory_ratio > 1 + threshold)
+        rows.append({'entry': r['entry'], 'rows': r['rows'], 'time_ratio': time_ratio,
+                     'memory_ratio': memory_ratio, 'regression': regression})
+    return rows
+
+
+def _format_result(result):
+    if 'error' in result:
+        return f"{result['entry']:<20} {result['rows']:>10,}  ERRO: {result['error']}"
+    memory = f"{result['peak_mb']:>9.1f}" if result.get('peak_mb') is not None else f"{'-':>9}"
+    return f"{result['entry']:<20} {result['rows']:>10,} {result['time_s']:>9.3f}s {memory} MB"
+
+
+def _format_ratio(ratio):
+    return f"{ratio:>7.2f}x" if ratio is not None else f"{'-':>8}"
+
+
+def main(sizes=DEFAULT_SIZES, entries=None, repeat=1, memory=True, seed=42,
+         results_path=RESULTS_PATH, compare=False, save=True):
+    print(f"{'Ponto de entrada':<20} {'Linhas':>10} {'Tempo':>10} {'Pico':>12}")
+    results = []
+    for result in run_benchmark(sizes, entries, repeat, memory, seed):
+        print(_format_result(result))
+        sys.stdout.flush()
+        results.append(result)
+
+    previous = load_runs(results_path)
+    metadata = {'tamanhos': list(sizes), 'semente': seed, 'repeticoes': repeat}
+    if save:
+        current = save_run(results, results_path, **metadata)
+        print(f"\n✅ Resultados gravados em: {results_path}")
+    else:
+        current = dict(metadata, resultados=results)
+
+    if compare:
+        if not previous:
+            print("\nNenhuma execução anterior para comparar.")
+            return
+        base = previous[-1]
+        print(f"\nComparação com {base['data']} (commit {base.get('commit') or '?'}):")
+        print(f"{'Ponto de entrada':<20} {'Linhas':>10} {'Tempo':>8} {'Memória':>8}")
+        regressions = 0
+        for row in compare_runs(base, current):
+            flag = "  ⚠️ REGRESSÃO" if row['regression'] else ""
+            regressions += row['regression']
+            print(f"{row['entry']:<20} {row['rows']:>10,} {_format_ratio(row['time_ratio'])} "
+                  f"{_format_ratio(row['memory_ratio'])}{flag}")
+        print(f"\n{regressions} regressão(ões) acima de {REGRESSION_THRESHOLD:.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de escala das análises do catálogo")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="tamanhos de catálogo (linhas)")
+    parser.add_argument('--entries', nargs='+', choices=list(ENTRY_POINTS), default=None,
+                        help="pontos de entrada medidos (padrão: todos)")
+    parser.add_argument('--repeat', type=int, default=1, help="repetições de tempo (vale a melhor)")
+    parser.add_argument('--no-memory', action='store_true', help="não mede o pico de memória")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--results', default=RESULTS_PATH, help="arquivo JSONL de resultados")
+    parser.add_argument('--compare', action='store_true', help="compara com a execução anterior")
+    parser.add_argument('--no-save', action='store_true', help="não grava esta execução")
+    args = parser.parse_args()
+    main(args.sizes, args.entries, args.repeat, not args.no_memory, args.seed,
+         args.results, args.compare, not args.no_save)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark do divisor de comentários de revisores
+Gera cartas de decisão sintéticas (revisores, comentários RnCm, perguntas
+RnAQm e FINAL STATEMENT no mesmo layout do documento real, com menções a
+"Decision Letter" no meio do texto) e compara o tokenizador de uma passada
+(split_reviewer_comments) com os regexes DOTALL preguiçosos da versão
+anterior, conferindo que os recortes são iguais.
+
+Uso:
+    python benchmark_split_reviews.py [--comments 100 1000 10000] [--reviewers 3]
+"""
+
+import argparse
+import random
+import re
+import time
+
+from split_reviewer_comments import segment_document, tokenize_markers
+
+WORDS = ("device signal channel electrode sampling reviewer manuscript method "
+         "analysis table figure adoption price wireless clinical research").split()
+
+
+def synthetic_letter(n_comments, n_reviewers=3, questions_per_reviewer=3, seed=42):
+    """Carta sintética com `n_comments` comentários divididos entre os revisores"""
+    rng = random.Random(seed)
+
+    def paragraph(lines):
+        return "\n".join(" ".join(rng.choices(WORDS, k=14)) + " " for _ in range(lines))
+
+    parts = ["Decision Letter  -   Reviewers' Comments to Authors \n"
+             "IEEE Access - Initial Submission - Decision on Manuscript ID Access-0000-00000 \n \n"]
+    per_reviewer = [n_comments // n_reviewers + (r < n_comments % n_reviewers) for r in range(n_reviewers)]
+
+    for r, count in enumerate(per_reviewer, start=1):
+        parts.append(f"Reviewer {r} \n")
+        for c in range(count):
+            # Menção a um marcador no meio da linha (não abre seção)
+            mention = "See the Decision Letter above. " if c == 0 else ""
+            parts.append(f"R{r}C{c}. \nSTATUS - Encarregado \n{mention}{paragraph(rng.randint(2, 6))}\n"
+                         f"→ Onde: Results \n \nRESPONSE TO REVIEWERS \nText… \n \n \n \n")
+        parts.append(f"Additional Questions Reviewer {r} \n")
+        for q in range(1, questions_per_reviewer + 1):
+            parts.append(f"R{r}AQ{q}.  \nSTATUS - Encarregado \n{paragraph(rng.randint(1, 3))}\n \n \n")
+
+    parts.append("FINAL STATEMENT \n" + paragraph(4))
+    return "".join(parts)
+
+
+# ============================================================================
+# VERSÃO ANTERIOR (referência, só revisores 1 a 3)
+# ============================================================================
+
+def legacy_split(text):
+    """Recortes com os regexes da versão anterior do divisor"""
+    sections = []
+    header_match = re.search(r'^(Decision Letter.*?)(?=Reviewer 1)', text, re.DOTALL)
+    if header_match:
+        sections.append(('Decision_Letter', header_match.group(1).strip()))
+
+    reviewer_sections = [
+        (r'(Reviewer 1\s*\n.*?)(?=Reviewer 2|$)', 'Reviewer_1'),
+        (r'(Reviewer 2\s*\n.*?)(?=Reviewer 3|$)', 'Reviewer_2'),
+        (r'(Reviewer 3\s*\n.*?)(?=FINAL STATEMENT|$)', 'Reviewer_3'),
+        (r'(FINAL STATEMENT.*?)$', 'Final_Statement'),
+    ]
+    for pattern, name in reviewer_sections:
+        match = re.search(pattern, text, re.DOTALL)
+        if match:
+            sections.append((name, match.group(1).strip()))
+
+    comment_pattern = r'(R[123]C\d+\.?\s*\n.*?)(?=R[123]C\d+\.|R[123]AQ\d+\.|Additional Questions|Reviewer \d|FINAL STATEMENT|$)'
+    aq_pattern = r'(R[123]AQ\d+\.?\s*\n.*?)(?=R[123]C\d+\.|R[123]AQ\d+\.|Reviewer \d|FINAL STATEMENT|$)'
+    items = re.findall(comment_pattern, text, re.DOTALL) + re.findall(aq_pattern, text, re.DOTALL)
+
+    comments = {}
+    for item in items:
+        item = item.strip()
+        code_match = re.match(r'(R[123](?:C|AQ)\d+)', item)
+        if item and code_match:
+            comments[code_match.group(1)] = item
+    return sections, comments
+
+
+def tokenizer_split(text):
+    sections, comments = segment_document(text, tokenize_markers(text))
+    return sections, dict(comments)
+
+
+def _timed(func, text, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_benchmark(sizes=(100, 1000, 10000), n_reviewers=3, repeat=3, legacy_limit=10000):
+    """Tempos (melhor de `repeat`) das duas versões para cada número de comentários"""
+    rows = []
+    for n_comments in sizes:
+        text = synthetic_letter(n_comments, n_reviewers)
+        new_time, new_result = _timed(tokenizer_split, text, repeat)
+        row = {
+            'comments': n_comments,
+            'chars': len(text),
+            'tokenizer_s': new_time,
+            'legacy_s': None,
+            'same_output': None
+        }
+        # A versão anterior só reconhece R1 a R3
+        if n_reviewers <= 3 and n_comments <= legacy_limit:
+            row['legacy_s'], old_result = _timed(legacy_split, text, 1)
+            row['same_output'] = old_result == new_result
+        rows.append(row)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do divisor de comentários")
+    parser.add_argument('--comments', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--reviewers', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'Comentários':>12} {'Caracteres':>12} {'Tokenizador':>12} {'Anterior':>12} {'Iguais':>7}")
+    for row in run_benchmark(args.comments, args.reviewers, args.repeat):
+        legacy = f"{row['legacy_s']:.3f}s" if row['legacy_s'] is not None else '-'
+        same = '-' if row['same_output'] is None else ('sim' if row['same_output'] else 'NÃO')
+        print(f"{row['comments']:>12,} {row['chars']:>12,} {row['tokenizer_s']:>11.3f}s {legacy:>12} {same:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Faixas (histogramas) configuráveis para colunas numéricas do catálogo
+Cada faixa é definida por uma especificação (dict, ou JSON) com a coluna,
+os limites e os rótulos; todos os dispositivos são classificados de uma
+vez com np.searchsorted, então trocar os limites custa uma passada
+vetorizada, sem editar os scripts.
+
+Especificação:
+    {
+        "column": "max_fs_hz",               # coluna do catálogo tipado
+        "edges": [256, 500, 1000, 2000],     # limites internos (crescentes)
+        "closed": "left",                    # [a, b) ("left") ou (a, b] ("right"),
+                                             # ou uma lista, um por limite
+        "labels": ["< 256 Hz", ...],         # len(edges) + 1 (opcional)
+        "missing": "Not specified",          # rótulo dos ausentes (opcional;
+                                             # sem ele os ausentes ficam de fora)
+        "label_width": 20, "unit": ""        # formato das barras ASCII
+    }
+
+Em vez de "edges", "log": N gera N faixas em escala logarítmica entre o
+menor valor positivo e o maior, e "quantiles": N gera N faixas com o mesmo
+número de dispositivos (limites nos quantis dos dados).
+
+Uso:
+    python binning.py [--spec JSON] [--names price adc_bits] [--json]
+    python binning.py --column price --log 6
+    python binning.py --column studies --quantiles 4
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+from catalog import CSV_PATH, load_catalog
+
+# Faixas usadas pelos scripts de análise
+BIN_SPECS = {
+    'price': {
+        'column': 'price',
+        'edges': [200, 500, 1000, 2000, 5000, 10000],
+        'closed': 'left',
+        'labels': ['< $200', '$200 - $500', '$500 - $1000', '$1000 - $2000', '$2000 - $5000',
+                   '$5000 - $10000', '> $10000'],
+        'label_width': 15,
+        'unit': ' dispositivos'
+    },
+    'sampling_rate': {
+        'column': 'max_fs_hz',
+        'edges': [256, 500, 1000, 2000],
+        # "< 256 Hz", "256 - 500 Hz": 256 fica na segunda faixa, 500 também
+        'closed': ['left', 'right', 'right', 'right'],
+        'labels': ['< 256 Hz', '256 - 500 Hz', '500 - 1000 Hz', '1 - 2 kHz', '> 2 kHz'],
+        'missing': 'Not specified'
+    },
+    'adc_bits': {
+        'column': 'adc_bits',
+        'edges': [14, 16, 24],
+        'closed': 'right',
+        'labels': ['≤ 14-bit', '16-bit', '24-bit', '32-bit'],
+        'missing': 'Not specified'
+    }
+}
+
+LABEL_WIDTH = 20
+
+
+# ============================================================================
+# LIMITES
+# ============================================================================
+
+def log_edges(values, n_bins):
+    """Limites internos de `n_bins` faixas log-espaçadas (valores positivos)"""
+    positive = values[values > 0]
+    if len(positive) == 0 or positive.min() == positive.max():
+        return np.empty(0)
+    return np.geomspace(positive.min(), positive.max(), n_bins + 1)[1:-1]
+
+
+def quantile_edges(values, n_bins):
+    """
+    Limites internos de `n_bins` faixas com (quase) o mesmo número de valores.
+    Com empates, quantis iguais ao mínimo ou ao máximo abririam faixas
+    vazias; eles são descartados (pode sobrar menos de `n_bins` faixas).
+    """
+    if len(values) == 0:
+        return np.empty(0)
+    edges = np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1])
+    return np.unique(edges[(edges > values.min()) & (edges < values.max())])
+
+
+def resolve_edges(spec, values):
+    """
+    Limites internos e lado fechado de cada um.
+
+    Returns:
+        (edges, right) - right[i] True quando o limite i pertence à faixa de baixo
+    """
+    present = values[~np.isnan(values)]
+    if 'log' in spec:
+        edges = log_edges(present, spec['log'])
+    elif 'quantiles' in spec:
+        edges = quantile_edges(present, spec['quantiles'])
+    else:
+        edges = np.asarray(spec['edges'], dtype=float)
+    if len(edges) > 1 and np.any(np.diff(edges) <= 0):
+        raise ValueError(f"Limites de faixa não crescentes: {list(edges)}")
+
+    closed = spec.get('closed', 'left')
+    closed = [closed] * len(edges) if isinstance(closed, str) else list(closed)
+    if len(closed) != len(edges):
+        raise ValueError(f"'closed' precisa de um lado por limite ({len(edges)})")
+    return edges, np.array([side == 'right' for side in closed], dtype=bool)
+
+
+def default_labels(edges, right):
+    """Rótulos "< a", "a - b", "> b" a partir dos limites"""
+    edges = [format(e, ',.6g') for e in edges]
+    if not edges:
+        return ['todos']
+    labels = [f"{'≤' if right[0] else '<'} {edges[0]}"]
+    labels += [f"{low} - {high}" for low, high in zip(edges[:-1], edges[1:])]
+    labels.append(f"{'>' if right[-1] else '≥'} {edges[-1]}")
+    return labels
+
+
+# ============================================================================
+# CLASSIFICAÇÃO
+# ============================================================================
+
+def assign_bins(values, edges, right):
+    """
+    Índice da faixa de cada valor (-1 para NaN), em duas buscas binárias:
+    limites fechados à direita contam quando o valor é maior que eles e os
+    fechados à esquerda, quando é maior ou igual.
+    """
+    values = np.asarray(values, dtype=float)
+    codes = (np.searchsorted(edges[right], values, side='left')
+             + np.searchsorted(edges[~right], values, side='right'))
+    return np.where(np.isnan(values), -1, codes)
+
+
+def bin_counts(values, spec):
+    """
+    Contagem por faixa.
+
+    Args:
+        values: Valores numéricos (NaN = ausente)
+        spec: Especificação da faixa (ver docstring do módulo)
+
+    Returns:
+        {'column', 'edges', 'labels', 'counts', 'total'} - com 'missing', a
+        última faixa é a dos ausentes
+    """
+    values = np.asarray(values, dtype=float)
+    edges, right = resolve_edges(spec, values)
+    labels = list(spec.get('labels') or default_labels(edges, right))
+    if len(labels) != len(edges) + 1:
+        raise ValueError(f"São necessários {len(edges) + 1} rótulos, recebidos {len(labels)}")
+
+    codes = assign_bins(values, edges, right)
+    counts = np.bincount(codes[codes >= 0], minlength=len(edges) + 1).tolist()
+    if 'missing' in spec:
+        labels.append(spec['missing'])
+        counts.append(int((codes < 0).sum()))
+    return {
+        'column': spec.get('column'),
+        'edges': edges.tolist(),
+        'labels': labels,
+        'counts': counts,
+        'total': sum(counts)
+    }
+
+
+def catalog_bins(catalog, specs=None, names=None):
+    """Faixas de várias especificações sobre o catálogo tipado (uma passada cada)"""
+    specs = BIN_SPECS if specs is None else specs
+    names = list(specs) if names is None else names
+    unknown = [name for name in names if name not in specs]
+    if unknown:
+        raise ValueError(f"Faixas desconhecidas: {', '.join(unknown)} (disponíveis: {', '.join(specs)})")
+    for name in names:
+        column = specs[name]['column']
+        if column not in catalog.columns:
+            numeric = catalog.select_dtypes('number').columns
+            raise ValueError(f"Coluna desconhecida: {column} (numéricas: {', '.join(numeric)})")
+    return {name: bin_counts(catalog[specs[name]['column']].to_numpy(dtype=float), specs[name])
+            for name in names}
+
+
+def load_specs(path):
+    """Especificações de um arquivo JSON ({nome: especificação}) sobre as padrão"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return {**BIN_SPECS, **json.load(f)}
+
+
+# ============================================================================
+# SAÍDA
+# ============================================================================
+
+def format_bars(result, spec=None):
+    """Linhas "rótulo | contagem (pct%) ████" no estilo dos scripts de análise"""
+    spec = spec or {}
+    width = spec.get('label_width', LABEL_WIDTH)
+    unit = spec.get('unit', '')
+    lines = []
+    for label, count in zip(result['labels'], result['counts']):
+        pct = (count / result['total']) * 100 if result['total'] else 0
+        bar = '█' * int(pct / 2)
+        lines.append(f"{label:{width}} | {count:2}{unit} ({pct:5.1f}%) {bar}")
+    return "\n".join(lines)
+
+
+def to_json(results):
+    """Faixas em JSON (rótulo, limites e contagem de cada faixa)"""
+    return json.dumps(results, ensure_ascii=False, indent=2)
+
+
+def main(csv_path=CSV_PATH, spec_path=None, names=None, column=None, edges=None, log=None,
+         quantiles=None, as_json=False):
+    specs = load_specs(spec_path) if spec_path else dict(BIN_SPECS)
+    if column:
+        spec = {'column': column, 'missing': 'Not specified'}
+        if log:
+            spec['log'] = log
+        elif quantiles:
+            spec['quantiles'] = quantiles
+        else:
+            spec['edges'] = edges or []
+        specs = {column: spec}
+        names = [column]
+
+    try:
+        results = catalog_bins(load_catalog(csv_path), specs, names)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    if as_json:
+        print(to_json(results))
+        return
+    for name, result in results.items():
+        print("=" * 60)
+        print(f"{name} ({result['column']})")
+        print("=" * 60)
+        print(format_bars(result, specs[name]))
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Faixas configuráveis das colunas numéricas")
+    parser.add_argument('--csv', default=CSV_PATH, help="CSV da Table1")
+    parser.add_argument('--spec', default=None, help="JSON {nome: especificação} sobre as faixas padrão")
+    parser.add_argument('--names', nargs='+', default=None, help="faixas mostradas (padrão: todas)")
+    parser.add_argument('--column', default=None, help="faixa ad hoc de uma coluna do catálogo")
+    parser.add_argument('--edges', type=float, nargs='+', default=None, help="limites da faixa ad hoc")
+    parser.add_argument('--log', type=int, default=None, help="N faixas em escala log")
+    parser.add_argument('--quantiles', type=int, default=None, help="N faixas por quantis")
+    parser.add_argument('--json', action='store_true', help="saída em JSON")
+    args = parser.parse_args()
+    main(args.csv, args.spec, args.names, args.column, args.edges, args.log, args.quantiles, args.json)
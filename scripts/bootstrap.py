@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+Intervalos de confiança por bootstrap (R3C3)
+Todas as reamostragens da tabela de dispositivos são sorteadas de uma vez
+como uma matriz de índices (reamostragem x dispositivo). Gini, correlações
+de Pearson/Spearman e médias por período são calculados para todas as
+reamostragens juntas com sort, cumsum e bincount em lote; blocos de
+reamostragens podem ser distribuídos em um pool de processos.
+
+O custo é O(reamostragens x dispositivos): o relatório só calcula os ICs
+quando pedidos (analyze --ci). A memória é limitada pelo tamanho dos
+blocos (no máximo MAX_ELEMENTS índices por bloco), não pelo catálogo.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from trends import DEFAULT_PERIODS
+
+# Pares (variável, adoção) reportados em calculate_correlations
+CORRELATION_PAIRS = {
+    'price_vs_adoption': 'price',
+    'channels_vs_adoption': 'channels_max',
+    'open_api_vs_adoption': 'open_api',
+    'dry_electrode_vs_adoption': 'dry_electrode'
+}
+
+TREND_METRICS = ['avg_channels', 'avg_price', 'avg_cost_per_channel', 'pct_bluetooth', 'pct_wifi']
+
+N_BOOT = 10000
+
+# Abaixo deste volume (reamostragens x dispositivos) o pool não compensa
+POOL_THRESHOLD = 5_000_000
+CHUNK_SIZE = 1000
+# Índices (reamostragens x dispositivos) por bloco: limita a memória de cada
+# bloco (~8 bytes por índice, mais algumas matrizes do mesmo tamanho)
+MAX_ELEMENTS = 2_000_000
+
+
+# ============================================================================
+# ESTATÍSTICAS EM LOTE (uma linha por reamostragem)
+# ============================================================================
+
+def gini_batch(values, mask):
+    """Gini de cada linha, com a mesma fórmula de calculate_lorenz_gini"""
+    n = mask.sum(axis=1)
+    # Valores ausentes vão para o fim da ordenação e não entram na soma
+    ordered = np.sort(np.where(mask, values, np.inf), axis=1)
+    ordered[~np.isfinite(ordered)] = 0
+    cumulative = np.cumsum(ordered, axis=1)
+    total = cumulative[:, -1]
+
+    rows = np.arange(len(values))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        lorenz = cumulative / total[:, None]
+        valid = np.arange(values.shape[1])[None, :] < n[:, None]
+        # Trapézio com passo 1/n entre x = 1/n e x = 1
+        area = (np.where(valid, lorenz, 0).sum(axis=1)
+                - 0.5 * (lorenz[:, 0] + lorenz[rows, np.maximum(n - 1, 0)])) / n
+        gini = 1 - 2 * area
+    gini[(total == 0) | (n == 0)] = np.nan
+    return gini
+
+
+def pearson_batch(x, y, mask):
+    """Correlação de Pearson por linha considerando só os pares válidos"""
+    n = mask.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = np.where(mask, x, 0).sum(axis=1) / n
+        mean_y = np.where(mask, y, 0).sum(axis=1) / n
+        dx = np.where(mask, x - mean_x[:, None], 0)
+        dy = np.where(mask, y - mean_y[:, None], 0)
+        r = (dx * dy).sum(axis=1) / np.sqrt((dx * dx).sum(axis=1) * (dy * dy).sum(axis=1))
+    r[n < 3] = np.nan
+    return r
+
+
+def average_ranks(codes, n_codes):
+    """Postos médios por linha (empates recebem a média); o código n_codes é ignorado"""
+    n_rows = len(codes)
+    width = n_codes + 1
+    offsets = np.arange(n_rows)[:, None] * width
+    counts = np.bincount((codes + offsets).ravel(), minlength=n_rows * width).reshape(n_rows, width)
+    below = np.cumsum(counts, axis=1) - counts
+    rows = np.arange(n_rows)[:, None]
+    return below[rows, codes] + (counts[rows, codes] + 1) / 2
+
+
+def dense_codes(values):
+    """Códigos ordinais dos valores (ausentes recebem o maior código)"""
+    valid = ~np.isnan(values)
+    uniques, inverse = np.unique(values[valid], return_inverse=True)
+    codes = np.full(len(values), len(uniques), dtype=np.int64)
+    codes[valid] = inverse
+    return codes, len(uniques)
+
+
+def spearman_batch(x_codes, y_codes, n_x, n_y, mask):
+    """Correlação de Spearman por linha (Pearson sobre os postos dos pares válidos)"""
+    # Pares incompletos recebem o código ignorado nas duas variáveis
+    x_codes = np.where(mask, x_codes, n_x)
+    y_codes = np.where(mask, y_codes, n_y)
+    return pearson_batch(average_ranks(x_codes, n_x), average_ranks(y_codes, n_y), mask)
+
+
+def period_means_batch(period, values, mask, n_periods):
+    """Média por período em cada linha (bincount com deslocamento por linha)"""
+    n_rows = len(period)
+    width = n_periods + 1
+    keys = (np.where(period < 0, n_periods, period) + np.arange(n_rows)[:, None] * width).ravel()
+    sums = np.bincount(keys, weights=np.where(mask, values, 0).ravel(), minlength=n_rows * width)
+    counts = np.bincount(keys, weights=mask.ravel().astype(float), minlength=n_rows * width)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums.reshape(n_rows, width) / counts.reshape(n_rows, width)
+    return means[:, :n_periods]
+
+
+# ============================================================================
+# PREPARAÇÃO E EXECUÇÃO
+# ============================================================================
+
+def period_layers(periods):
+    """Divide os períodos em camadas sem sobreposição (janelas móveis se sobrepõem)"""
+    layers = []
+    for start, end, i in sorted((start, end, i) for i, (start, end) in enumerate(periods.values())):
+        for layer in layers:
+            if layer[-1][1] < start:
+                layer.append((start, end, i))
+                break
+        else:
+            layers.append([(start, end, i)])
+    return layers
+
+
+def assign_periods(years, periods):
+    """
+    Índice do período de cada ano (-1 fora de todos), uma linha por camada
+    de period_layers: com períodos não sobrepostos, uma linha só.
+    """
+    rows = []
+    for bounds in period_layers(periods):
+        starts = np.array([b[0] for b in bounds])
+        ends = np.array([b[1] for b in bounds])
+        order = np.array([b[2] for b in bounds])
+
+        pos = np.searchsorted(starts, years, side='right') - 1
+        inside = (pos >= 0) & ~np.isnan(years)
+        inside[inside] &= years[inside] <= ends[pos[inside]]
+        rows.append(np.where(inside, order[np.maximum(pos, 0)], -1))
+    return np.array(rows, dtype=int).reshape(len(rows), len(years))
+
+
+def prepare_arrays(df, periods=None):
+    """Arrays NumPy usados pelas estatísticas em lote"""
+    periods = DEFAULT_PERIODS if periods is None else periods
+    studies = df['studies'].to_numpy(dtype=float)
+    channels = df['channels_max'].where(df['channels_max'] != 0).to_numpy(dtype=float)
+    price = df['price'].where(df['price'] != 0).to_numpy(dtype=float)
+
+    arrays = {
+        'studies': studies,
+        'period': assign_periods(df['year'].to_numpy(dtype=float), periods),
+        'n_periods': len(periods),
+        'trend_channels': channels,
+        'trend_price': price,
+        'trend_cost': price / channels,
+        'trend_bluetooth': 100 * df['bluetooth'].to_numpy(dtype=float),
+        'trend_wifi': 100 * df['wifi'].to_numpy(dtype=float)
+    }
+    arrays['studies_codes'], arrays['studies_n_codes'] = dense_codes(studies)
+    for key, column in CORRELATION_PAIRS.items():
+        values = df[column].to_numpy(dtype=float)
+        arrays[key] = values
+        arrays[key + '_codes'], arrays[key + '_n_codes'] = dense_codes(values)
+    return arrays
+
+
+def _trend_inputs(arrays):
+    return {
+        'avg_channels': arrays['trend_channels'],
+        'avg_price': arrays['trend_price'],
+        'avg_cost_per_channel': arrays['trend_cost'],
+        'pct_bluetooth': arrays['trend_bluetooth'],
+        'pct_wifi': arrays['trend_wifi']
+    }
+
+
+def bootstrap_chunk(arrays, n_boot, seed):
+    """Estatísticas de `n_boot` reamostragens (executado em um processo do pool)"""
+    rng = np.random.default_rng(seed)
+    n = len(arrays['studies'])
+    idx = rng.integers(0, n, size=(n_boot, n))
+
+    studies = arrays['studies'][idx]
+    has_studies = ~np.isnan(studies)
+    results = {'gini': gini_batch(studies, has_studies)}
+
+    for key in CORRELATION_PAIRS:
+        x = arrays[key][idx]
+        mask = has_studies & ~np.isnan(x)
+        results[key + '_pearson'] = pearson_batch(x, studies, mask)
+        results[key + '_spearman'] = spearman_batch(
+            arrays[key + '_codes'][idx], arrays['studies_codes'][idx],
+            arrays[key + '_n_codes'], arrays['studies_n_codes'], mask
+        )
+
+    for metric, values in _trend_inputs(arrays).items():
+        resampled = values[idx]
+        mask = ~np.isnan(resampled)
+        # Cada período tem dados em uma única camada (NaN nas outras)
+        means = np.full((n_boot, arrays['n_periods']), np.nan)
+        for layer in arrays['period']:
+            means = np.fmax(means, period_means_batch(layer[idx], resampled, mask, arrays['n_periods']))
+        results[metric] = means
+
+    return results
+
+
+def run_bootstrap(arrays, n_boot=N_BOOT, seed=42, workers=None, chunk_size=CHUNK_SIZE):
+    """Executa as reamostragens em blocos, em paralelo quando compensa"""
+    # Catálogos grandes: menos reamostragens por bloco (memória constante)
+    chunk_size = max(1, min(chunk_size, MAX_ELEMENTS // max(len(arrays['studies']), 1)))
+    n_chunks = max(1, -(-n_boot // chunk_size))
+    sizes = [chunk_size] * (n_chunks - 1) + [n_boot - chunk_size * (n_chunks - 1)]
+    # Uma semente independente por bloco: resultado igual com ou sem pool
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+
+    if workers is None:
+        workers = os.cpu_count() if n_boot * len(arrays['studies']) >= POOL_THRESHOLD else 1
+
+    if workers > 1 and n_chunks > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(bootstrap_chunk, [arrays] * n_chunks, sizes, seeds))
+    else:
+        chunks = [bootstrap_chunk(arrays, size, s) for size, s in zip(sizes, seeds)]
+
+    return {key: np.concatenate([c[key] for c in chunks]) for key in chunks[0]}
+
+
+def _interval(samples, alpha):
+    """Intervalo percentil (ignorando reamostragens degeneradas)"""
+    samples = samples[~np.isnan(samples)]
+    if len(samples) == 0:
+        return None, None
+    low, high = np.percentile(samples, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+    return round(float(low), 4), round(float(high), 4)
+
+
+def bootstrap_confidence_intervals(df, n_boot=N_BOOT, alpha=0.05, seed=42, workers=None, periods=None):
+    """ICs por bootstrap para Gini, correlações e médias por período"""
+    periods = DEFAULT_PERIODS if periods is None else periods
+    arrays = prepare_arrays(df, periods)
+    samples = run_bootstrap(arrays, n_boot=n_boot, seed=seed, workers=workers)
+
+    # Estimativas pontuais (amostra original = índice identidade)
+    identity = {k: v[None, :] for k, v in arrays.items() if isinstance(v, np.ndarray)}
+    studies = identity['studies']
+    has_studies = ~np.isnan(studies)
+
+    correlations = {}
+    for key in CORRELATION_PAIRS:
+        x = identity[key]
+        mask = has_studies & ~np.isnan(x)
+        spearman = spearman_batch(
+            identity[key + '_codes'], identity['studies_codes'],
+            arrays[key + '_n_codes'], arrays['studies_n_codes'], mask
+        )[0]
+        correlations[key] = {
+            'pearson_ci': _interval(samples[key + '_pearson'], alpha),
+            'spearman': round(float(spearman), 4),
+            'spearman_ci': _interval(samples[key + '_spearman'], alpha)
+        }
+
+    trends = {}
+    for i, period in enumerate(periods):
+        trends[period] = {metric: _interval(samples[metric][:, i], alpha) for metric in TREND_METRICS}
+
+    return {
+        'n_boot': n_boot,
+        'confidence': round(100 * (1 - alpha)),
+        'gini_ci': _interval(samples['gini'], alpha),
+        'correlations': correlations,
+        'trends': trends
+    }
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""
+Ponto de entrada único das ferramentas do artigo (dispositivos EEG/fNIRS)
+
+Uso:
+    python brain_devices.py analyze [--csv CSV] [--output TXT] [--formats txt json md csv] [--profile]
+                                 [--chunk-rows N] [--workers N] [--ci [N]] [--permutations N]
+                                 [--periods default|yearly|rolling:N]
+    python brain_devices.py prices|clinical|industrial [--csv CSV]
+    python brain_devices.py timeline [--csv CSV] [--output-dir DIR] [--periods default|yearly|rolling:N]
+                                  [--scatter-mode auto|scatter|density] [--formats png pdf svg]
+                                  [--draft] [--workers N] [--force]
+    python brain_devices.py extract [--input-dir DIR] [--output-dir DIR] [--workers N] [--force]
+    python brain_devices.py split-article [--input JSON | --input-dir DIR] [--output-dir DIR] [--template T]
+    python brain_devices.py split-reviews [--input JSON] [--output-dir DIR]
+    python brain_devices.py crossref [--sections DIR...] [--top N]
+    python brain_devices.py diff [--old DOC] [--new DOC] [--output TXT] [--benchmark]
+    python brain_devices.py bins [--csv CSV] [--spec JSON] [--names N...] [--column C --edges E... | --log N | --quantiles N] [--json]
+    python brain_devices.py quantiles [--csv CSV] [--chunk-rows N] [--percentiles P...] [--exact]
+    python brain_devices.py query [EXPRESSÃO | --profile NOME] [--profiles JSON] [--list-profiles] [--limit N]
+    python brain_devices.py find TERMOS... [--csv CSV] [--limit N] [--rebuild] [--check]
+    python brain_devices.py synthetic --rows N [--output CSV] [--seed S]
+    python brain_devices.py benchmark [--sizes N...] [--entries E...] [--compare]
+    python brain_devices.py index
+    python brain_devices.py search TERMOS... [--top N] [--update]
+
+Só a biblioteca padrão é importada aqui: cada subcomando importa o seu
+módulo (e com ele pandas, matplotlib ou PyMuPDF) apenas quando é chamado.
+"""
+
+import argparse
+import os
+import re
+import sys
+
+# Configuração de caminhos (sem importar catalog, que carrega o pandas)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+CSV_PATH = os.path.join(PROJECT_DIR, "Table1_v12 - Cópia de Página1.csv")
+JSON_DIR = os.path.join(PROJECT_DIR, "textos_json")
+CHANGES_DIR = os.path.join(PROJECT_DIR, "Alterações")
+
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+
+# ============================================================================
+# SUBCOMANDOS (imports adiados)
+# ============================================================================
+
+def cmd_analyze(args):
+    import analyze_table
+    analyze_table.main(csv_path=args.csv, output_path=args.output, profile=args.profile,
+                       formats=args.formats, chunk_rows=args.chunk_rows, workers=args.workers,
+                       n_boot=args.ci, n_perm=args.permutations, periods=args.periods)
+
+
+def cmd_prices(args):
+    import analyze_prices
+    analyze_prices.main(csv_path=args.csv)
+
+
+def cmd_clinical(args):
+    import analyze_clinical
+    analyze_clinical.main(csv_path=args.csv)
+
+
+def cmd_industrial(args):
+    import analyze_industrial
+    analyze_industrial.main(csv_path=args.csv)
+
+
+def cmd_timeline(args):
+    import generate_timeline
+    generate_timeline.main(csv_path=args.csv, output_dir=args.output_dir, periods=args.periods,
+                           scatter_mode=args.scatter_mode, formats=args.formats, draft=args.draft,
+                           workers=args.workers, force=args.force)
+
+
+def cmd_extract(args):
+    import extract_pdf_to_json
+    extract_pdf_to_json.main(input_dir=args.input_dir, output_dir=args.output_dir,
+                             workers=args.workers, force=args.force)
+
+
+def cmd_split_article(args):
+    import split_article_sections
+    split_article_sections.main(json_path=args.input, output_dir=args.output_dir, template=args.template,
+                                input_dir=args.input_dir, workers=args.workers)
+
+
+def cmd_split_reviews(args):
+    import split_reviewer_comments
+    split_reviewer_comments.main(json_path=args.input, output_dir=args.output_dir)
+
+
+def cmd_crossref(args):
+    import cross_reference
+    cross_reference.main(comment_dirs=args.comments, section_dirs=args.sections,
+                         output_csv=args.output_csv, output_draft=args.draft, top=args.top)
+
+
+def cmd_diff(args):
+    import manuscript_diff
+    manuscript_diff.main(old_path=args.old, new_path=args.new, old_template=args.old_template,
+                         new_template=args.new_template, output_path=args.output,
+                         comment_dirs=args.comments, top=args.top, run_benchmark=args.benchmark)
+
+
+def cmd_bins(args):
+    import binning
+    binning.main(csv_path=args.csv, spec_path=args.spec, names=args.names, column=args.column,
+                 edges=args.edges, log=args.log, quantiles=args.quantiles, as_json=args.json)
+
+
+def cmd_quantiles(args):
+    import quantiles
+    quantiles.main(csv_path=args.csv, chunk_rows=args.chunk_rows, percentiles=args.percentiles, exact=args.exact)
+
+
+def cmd_query(args):
+    import device_query
+    device_query.main(args.expression, profile=args.profile, csv_path=args.csv, profiles_path=args.profiles,
+                      limit=args.limit, list_profiles=args.list_profiles)
+
+
+def cmd_find(args):
+    import text_index
+    if not args.terms and not args.check:
+        raise SystemExit("Informe os termos da busca ou --check")
+    if text_index.main(' '.join(args.terms), csv_path=args.csv, limit=args.limit, rebuild=args.rebuild,
+                       check=args.check):
+        raise SystemExit(1)
+
+
+def cmd_synthetic(args):
+    import synthetic_catalog
+    synthetic_catalog.main(n_rows=args.rows, output_path=args.output, seed=args.seed)
+
+
+def cmd_benchmark(args):
+    import benchmark_catalog
+    benchmark_catalog.main(sizes=args.sizes, entries=args.entries, repeat=args.repeat,
+                           memory=not args.no_memory, seed=args.seed, results_path=args.results,
+                           compare=args.compare, save=not args.no_save)
+
+
+def cmd_search_index(args):
+    import search_index
+    search_index.run_command(args)
+
+
+# ============================================================================
+# ARGUMENTOS
+# ============================================================================
+
+def _period_spec(value):
+    """Valida --periods (mesma gramática de trends.PERIOD_SPEC, sem importar o pandas)"""
+    if not re.fullmatch(r'default|yearly|rolling(?::[1-9]\d*)?', value):
+        raise argparse.ArgumentTypeError(f"especificação de período desconhecida: {value!r} "
+                                         "(use default, yearly ou rolling:N com N >= 1)")
+    return value
+
+
+def _add_csv(parser):
+    parser.add_argument('--csv', default=CSV_PATH, help="CSV da Table1 (padrão: raiz do projeto)")
+
+
+def build_parser():
+    """Parser com um subcomando por ferramenta"""
+    parser = argparse.ArgumentParser(
+        prog='brain-devices',
+        description="Análises e utilitários do artigo de dispositivos EEG/fNIRS"
+    )
+    commands = parser.add_subparsers(dest='command', metavar='COMANDO')
+    commands.required = True
+
+    analyze = commands.add_parser('analyze', help="relatório completo da tabela (RELATORIO_TABELA.txt)")
+    _add_csv(analyze)
+    analyze.add_argument('--output', default=os.path.join(CHANGES_DIR, "RELATORIO_TABELA.txt"),
+                         help="arquivo de saída do relatório")
+    analyze.add_argument('--formats', nargs='+', choices=('txt', 'json', 'md', 'csv'), default=['txt'],
+                         help="formatos gravados (json/md ao lado do relatório; csv: uma tabela por análise)")
+    analyze.add_argument('--profile', action='store_true',
+                         help="mede tempo, CPU e memória de cada etapa (resumo no relatório + trace JSON)")
+    analyze.add_argument('--chunk-rows', type=int, default=None,
+                         help="lê o CSV em blocos de N linhas (catálogos maiores que a memória)")
+    analyze.add_argument('--workers', type=int, default=1, help="processos do modo em blocos")
+    analyze.add_argument('--ci', type=int, nargs='?', const=10000, default=0, metavar='N',
+                         help="inclui ICs por bootstrap com N reamostragens (padrão 10000; custo N x dispositivos)")
+    analyze.add_argument('--permutations', type=int, default=10000, metavar='N',
+                         help="permutações da matriz de correlações (0 = só teste t; grupos grandes usam teste t)")
+    analyze.add_argument('--periods', type=_period_spec, default='default',
+                         help="períodos das tendências: default, yearly ou rolling:N")
+    analyze.set_defaults(func=cmd_analyze)
+
+    for name, func, text in [
+        ('prices', cmd_prices, "distribuição de preços"),
+        ('clinical', cmd_clinical, "dispositivos clínicos e certificações"),
+        ('industrial', cmd_industrial, "dispositivos para uso industrial"),
+    ]:
+        sub = commands.add_parser(name, help=text)
+        _add_csv(sub)
+        sub.set_defaults(func=func)
+
+    timeline = commands.add_parser('timeline', help="figuras de linha do tempo e tendências")
+    _add_csv(timeline)
+    timeline.add_argument('--output-dir', default=os.path.join(CHANGES_DIR, "Figuras"),
+                          help="diretório das figuras")
+    timeline.add_argument('--periods', type=_period_spec, default='default',
+                          help="períodos das tendências: default, yearly ou rolling:N")
+    timeline.add_argument('--scatter-mode', choices=('auto', 'scatter', 'density'), default='auto',
+                          help="dispersão: um ponto por dispositivo, densidade (hexbin) ou automático")
+    timeline.add_argument('--formats', nargs='+', choices=('png', 'pdf', 'svg'), default=['png'],
+                          help="formatos salvos de cada figura (uma renderização)")
+    timeline.add_argument('--draft', action='store_true', help="rascunho em baixa resolução (72 dpi, em <output-dir>/rascunho)")
+    timeline.add_argument('--workers', type=int, default=None, help="processos de renderização")
+    timeline.add_argument('--force', action='store_true', help="renderiza mesmo as figuras inalteradas")
+    timeline.set_defaults(func=cmd_timeline)
+
+    extract = commands.add_parser('extract', help="extrai o texto dos PDFs (página a página)")
+    extract.add_argument('--input-dir', default=PROJECT_DIR, help="diretório com os PDFs")
+    extract.add_argument('--output-dir', default=JSON_DIR, help="diretório dos documentos extraídos")
+    extract.add_argument('--workers', type=int, default=None,
+                         help="processos de extração (padrão: todos os núcleos quando compensa)")
+    extract.add_argument('--force', action='store_true', help="reextrai mesmo os PDFs inalterados")
+    extract.set_defaults(func=cmd_extract)
+
+    article = commands.add_parser('split-article', help="divide o artigo revisado em seções")
+    article.add_argument('--input', default=os.path.join(JSON_DIR, "Artigo-Revisado"),
+                         help="documento do artigo (.jsonl, .json ou sem extensão)")
+    article.add_argument('--input-dir', default=None,
+                         help="modo em lote: divide todos os documentos do diretório em paralelo")
+    article.add_argument('--output-dir', default=None,
+                         help="diretório das seções (padrão: Artigo-Partes; lote: Artigo-Partes-Lote)")
+    article.add_argument('--template', default='ieee_access',
+                         help="títulos de seção: ieee_access, imrad ou arquivo JSON [[regex, nome], ...]")
+    article.add_argument('--workers', type=int, default=None, help="processos do modo em lote")
+    article.set_defaults(func=cmd_split_article)
+
+    reviews = commands.add_parser('split-reviews', help="divide os comentários dos revisores")
+    reviews.add_argument('--input', default=os.path.join(JSON_DIR, "Altereções-necessárias"),
+                         help="documento das alterações necessárias (.jsonl, .json ou sem extensão)")
+    reviews.add_argument('--output-dir', default=CHANGES_DIR, help="diretório de saída")
+    reviews.set_defaults(func=cmd_split_reviews)
+
+    crossref = commands.add_parser('crossref', help="comentários x seções por similaridade TF-IDF")
+    crossref.add_argument('--comments', nargs='+', default=None,
+                          help="diretórios dos comentários individuais (R*.txt)")
+    crossref.add_argument('--sections', nargs='+', default=None,
+                          help="diretórios de seções (um por manuscrito/rodada)")
+    crossref.add_argument('--output-csv', default=os.path.join(CHANGES_DIR, "relevancia_comentarios_secoes.csv"),
+                          help="tabela comentário x seção")
+    crossref.add_argument('--draft', default=os.path.join(CHANGES_DIR, "Divisão_de_comentários_RASCUNHO.txt"),
+                          help="rascunho da divisão de comentários")
+    crossref.add_argument('--top', type=int, default=3, help="seções listadas por comentário")
+    crossref.set_defaults(func=cmd_crossref)
+
+    diff = commands.add_parser('diff', help="diferenças entre as versões do artigo (seção/parágrafo)")
+    diff.add_argument('--old', default=os.path.join(JSON_DIR, "Artigo-inicial"),
+                      help="versão antiga (.jsonl, .json ou sem extensão)")
+    diff.add_argument('--new', default=os.path.join(JSON_DIR, "Artigo-Revisado"), help="versão nova")
+    diff.add_argument('--old-template', default='ieee_submission', help="títulos de seção da versão antiga")
+    diff.add_argument('--new-template', default='ieee_access', help="títulos de seção da versão nova")
+    diff.add_argument('--output', default=os.path.join(CHANGES_DIR, "DIFF_ARTIGO.txt"), help="arquivo do resumo")
+    diff.add_argument('--comments', nargs='+', default=None,
+                      help="diretórios dos comentários individuais (R*.txt)")
+    diff.add_argument('--top', type=int, default=3, help="comentários sugeridos por parágrafo")
+    diff.add_argument('--benchmark', action='store_true', help="compara o tempo com difflib.ndiff")
+    diff.set_defaults(func=cmd_diff)
+
+    bins = commands.add_parser('bins', help="faixas configuráveis (preço, taxa de amostragem, ADC...)")
+    _add_csv(bins)
+    bins.add_argument('--spec', default=None, help="JSON {nome: especificação} sobre as faixas padrão")
+    bins.add_argument('--names', nargs='+', default=None, help="faixas mostradas (padrão: todas)")
+    bins.add_argument('--column', default=None, help="faixa ad hoc de uma coluna do catálogo tipado")
+    bins.add_argument('--edges', type=float, nargs='+', default=None, help="limites da faixa ad hoc")
+    bins.add_argument('--log', type=int, default=None, help="N faixas em escala logarítmica")
+    bins.add_argument('--quantiles', type=int, default=None, help="N faixas com o mesmo número de dispositivos")
+    bins.add_argument('--json', action='store_true', help="saída em JSON")
+    bins.set_defaults(func=cmd_bins)
+
+    quantiles = commands.add_parser('quantiles', help="percentis de preço, canais, taxa e estudos (em fluxo)")
+    _add_csv(quantiles)
+    quantiles.add_argument('--chunk-rows', type=int, default=50_000, help="linhas lidas por bloco")
+    quantiles.add_argument('--percentiles', type=float, nargs='+', default=[5, 10, 25, 50, 75, 90, 95],
+                           help="percentis (0-100)")
+    quantiles.add_argument('--exact', action='store_true', help="quantis exatos (guarda todos os valores)")
+    quantiles.set_defaults(func=cmd_quantiles)
+
+    query = commands.add_parser('query', help="filtra dispositivos por expressão ou perfil (clinical, industrial...)")
+    _add_csv(query)
+    query.add_argument('expression', nargs='?', default=None,
+                       help="ex.: \"adc_bits >= 24 and max_fs_hz >= 500 and raw == 'available'\"")
+    query.add_argument('--profile', default=None, help="perfil nomeado (ver --list-profiles)")
+    query.add_argument('--profiles', default=None, help="JSON {nome: expressão} com perfis extras")
+    query.add_argument('--list-profiles', action='store_true', help="lista os perfis disponíveis")
+    query.add_argument('--limit', type=int, default=20, help="dispositivos listados")
+    query.set_defaults(func=cmd_query)
+
+    find = commands.add_parser('find', help="busca nas colunas de texto (índice invertido: sync:lsl aux:imu)")
+    _add_csv(find)
+    find.add_argument('terms', nargs='*', help="termos, campo:termo, prefixo*, AND/OR/NOT e parênteses")
+    find.add_argument('--limit', type=int, default=20, help="dispositivos listados")
+    find.add_argument('--rebuild', action='store_true', help="reconstrói o índice do zero")
+    find.add_argument('--check', action='store_true', help="confere o índice com a varredura do texto")
+    find.set_defaults(func=cmd_find)
+
+    synthetic = commands.add_parser('synthetic', help="gera um catálogo sintético no formato da Table1")
+    synthetic.add_argument('--rows', type=int, default=1000, help="número de dispositivos")
+    synthetic.add_argument('--output', default=os.path.join(PROJECT_DIR, ".cache", "synthetic", "Table1_sintetica.csv"),
+                           help="CSV de saída")
+    synthetic.add_argument('--seed', type=int, default=42, help="semente do gerador")
+    synthetic.set_defaults(func=cmd_synthetic)
+
+    benchmark = commands.add_parser('benchmark', help="tempo e memória das análises em catálogos sintéticos")
+    benchmark.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 100_000, 1_000_000],
+                           help="tamanhos de catálogo (linhas)")
+    benchmark.add_argument('--entries', nargs='+', default=None,
+                           help="pontos de entrada: load_catalog, generate_report, analyze_prices, "
+                                "analyze_clinical, analyze_industrial, timeline_scatter, timeline_bar, "
+                                "temporal_trends (padrão: todos)")
+    benchmark.add_argument('--repeat', type=int, default=1, help="repetições de tempo (vale a melhor)")
+    benchmark.add_argument('--no-memory', action='store_true', help="não mede o pico de memória")
+    benchmark.add_argument('--seed', type=int, default=42, help="semente dos catálogos")
+    benchmark.add_argument('--results', default=os.path.join(PROJECT_DIR, ".cache", "benchmarks", "catalogo.jsonl"),
+                           help="arquivo JSONL de resultados")
+    benchmark.add_argument('--compare', action='store_true', help="compara com a execução anterior")
+    benchmark.add_argument('--no-save', action='store_true', help="não grava esta execução")
+    benchmark.set_defaults(func=cmd_benchmark)
+
+    # Argumentos definidos em search_index (só biblioteca padrão, import leve)
+    import search_index
+    for sub in search_index.add_arguments(commands):
+        sub.set_defaults(func=cmd_search_index)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+Catálogo tipado de dispositivos EEG/fNIRS
+Lê o CSV da Table1 uma única vez, converte as células de texto livre
+("4 | 8 | 16", ">1,000", "128 | 256 Hz", "24-bit") em colunas numéricas
+e booleanas e guarda o resultado em cache binário (pickle) indexado pelo
+hash do conteúdo do CSV. Todos os scripts de análise carregam daqui.
+"""
+
+import hashlib
+import os
+import pickle
+import re
+
+import numpy as np
+import pandas as pd
+
+from keywords import has_any, scan_features
+
+# Configuração de caminhos
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+CSV_PATH = os.path.join(PROJECT_DIR, "Table1_v12 - Cópia de Página1.csv")
+CACHE_DIR = os.path.join(PROJECT_DIR, ".cache")
+
+# Incrementar sempre que a lógica de parsing mudar (invalida caches antigos)
+CATALOG_VERSION = 3
+
+# Erros de um pickle truncado ou gravado por outra versão do pandas
+CACHE_ERRORS = (pickle.UnpicklingError, AttributeError, ImportError, ValueError, EOFError)
+
+# Colunas numéricas derivadas (float, NaN quando ausente)
+NUMERIC_COLUMNS = [
+    'price',
+    'channels_min',
+    'channels_max',
+    'max_fs_hz',
+    'adc_bits',
+    'studies',
+    'year',
+    'inclusion_pct',
+]
+
+# Colunas booleanas derivadas
+FEATURE_COLUMNS = [
+    'open_api',
+    'dry_electrode',
+    'bluetooth',
+    'wifi',
+    'raw_available',
+    'has_sync',
+]
+
+# Máscara de bits das features de texto (ver keywords.FEATURE_VOCABULARY)
+BITMASK_COLUMN = 'features'
+
+DERIVED_COLUMNS = NUMERIC_COLUMNS + FEATURE_COLUMNS + [BITMASK_COLUMN]
+
+MISSING_MARKERS = ['---', '-', '', 'nan']
+
+
+# ============================================================================
+# PARSERS VETORIZADOS (uma passada por coluna)
+# ============================================================================
+
+def _as_text(series):
+    """Coluna como texto (vazio quando ausente)"""
+    return series.astype(object).where(series.notna(), '').astype(str)
+
+
+def _parse_unique(series, parser):
+    """Aplica um parser vetorizado só aos valores distintos e expande o resultado"""
+    codes, uniques = pd.factorize(series)
+    parsed = parser(pd.Series(uniques, dtype=object)).to_numpy(dtype=float)
+    # Código -1 = célula ausente
+    values = np.append(parsed, np.nan)[codes]
+    return pd.Series(values, index=series.index, dtype=float)
+
+
+def _max_number(text, get_max):
+    nums = pd.to_numeric(text.str.findall(r'\d+').explode(), errors='coerce')
+    grouped = nums.groupby(level=0)
+    parsed = grouped.max() if get_max else grouped.min()
+    return parsed.reindex(text.index)
+
+
+def _price(text):
+    text = text.str.strip()
+    cleaned = text.str.replace(r'[<>,$]', '', regex=True).str.strip()
+    cleaned = cleaned.where(~text.isin(MISSING_MARKERS))
+    return pd.to_numeric(cleaned, errors='coerce')
+
+
+def _sampling_rate(text):
+    matches = text.str.extractall(r'(\d+(?:\.\d+)?)\s*(k?Hz)', flags=re.IGNORECASE)
+    rates = matches[0].astype(float)
+    rates = rates.where(matches[1].str.lower() != 'khz', rates * 1000)
+    return rates.groupby(level=0).max().reindex(text.index)
+
+
+def _adc_bits(text):
+    bits = text.str.extract(r'(\d+)-?bit', flags=re.IGNORECASE)[0]
+    return pd.to_numeric(bits, errors='coerce')
+
+
+def _percentage(text):
+    cleaned = text.str.replace('%', '', regex=False)
+    cleaned = cleaned.str.replace(',', '.', regex=False).str.strip()
+    return pd.to_numeric(cleaned, errors='coerce')
+
+
+def parse_number(series, get_max=True):
+    """Maior (ou menor) inteiro encontrado em cada célula ("4 | 8 | 16" -> 16)"""
+    return _parse_unique(_as_text(series), lambda text: _max_number(text, get_max))
+
+
+def parse_price(series):
+    """Preço em USD (">1,000" -> 1000.0; "---" -> NaN)"""
+    return _parse_unique(_as_text(series), _price)
+
+
+def parse_sampling_rate(series):
+    """Maior taxa de amostragem em Hz ("500 Hz | 1 kHz" -> 1000.0)"""
+    return _parse_unique(_as_text(series), _sampling_rate)
+
+
+def parse_adc_bits(series):
+    """Resolução do ADC em bits (primeiro valor seguido de "bit")"""
+    return _parse_unique(_as_text(series), _adc_bits)
+
+
+def parse_percentage(series):
+    """Porcentagem com vírgula decimal ("19,30%" -> 19.3)"""
+    return _parse_unique(_as_text(series), _percentage)
+
+
+def _lower_text(df, column):
+    """Texto em minúsculas de uma coluna (vazio quando ausente)"""
+    return df[column].fillna('').astype(str).str.lower()
+
+
+def short_model_names(df, width=40):
+    """Primeira linha do nome do modelo, truncada"""
+    return df['Model'].astype(str).str.split('\n').str[0].str[:width]
+
+
+# ============================================================================
+# CONSTRUÇÃO DO CATÁLOGO
+# ============================================================================
+
+def build_catalog(df):
+    """Acrescenta as colunas tipadas ao DataFrame bruto do CSV"""
+    catalog = df.copy()
+
+    catalog['price'] = parse_price(df['Price (USD)'])
+    catalog['channels_min'] = parse_number(df['Channels'], get_max=False)
+    catalog['channels_max'] = parse_number(df['Channels'])
+    catalog['max_fs_hz'] = parse_sampling_rate(df['Sampling Rate'])
+    catalog['adc_bits'] = parse_adc_bits(df['ADC resolution'])
+    catalog['studies'] = parse_number(df['Studies Found'])
+    catalog['year'] = parse_number(df['Year of first appearance'])
+    catalog['inclusion_pct'] = parse_percentage(df['Inclusion (%)'])
+
+    # Uma varredura por coluna de texto para todas as palavras-chave
+    features = scan_features(df)
+    catalog[BITMASK_COLUMN] = features
+
+    catalog['open_api'] = has_any(features, 'open_api')
+    catalog['dry_electrode'] = has_any(features, 'sensor_dry')
+    catalog['bluetooth'] = has_any(features, 'bluetooth')
+    catalog['wifi'] = has_any(features, 'wifi')
+    catalog['raw_available'] = has_any(features, 'raw_available')
+    catalog['has_sync'] = ~_lower_text(df, 'Data Synchronization').str.strip().isin(MISSING_MARKERS)
+
+    return catalog
+
+
+def csv_hash(csv_path):
+    """Hash SHA-256 do conteúdo do CSV"""
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path_for(csv_path, cache_dir=CACHE_DIR):
+    """Caminho do cache correspondente ao conteúdo atual do CSV"""
+    key = f"{csv_hash(csv_path)[:16]}_v{CATALOG_VERSION}_pd{pd.__version__}"
+    return os.path.join(cache_dir, f"catalog_{key}.pkl")
+
+
+def read_cache(path):
+    """Lê um pickle do cache; None se ausente ou ilegível (é então reconstruído)"""
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_pickle(path)
+    except CACHE_ERRORS:
+        return None
+
+
+def load_catalog(csv_path=CSV_PATH, cache_dir=CACHE_DIR, use_cache=True):
+    """Carrega o catálogo tipado, usando o cache quando o CSV não mudou"""
+    cache_path = cache_path_for(csv_path, cache_dir)
+
+    if use_cache:
+        catalog = read_cache(cache_path)
+        if catalog is not None:
+            return catalog
+
+    df = pd.read_csv(csv_path, encoding='utf-8')
+    catalog = build_catalog(df)
+
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Escrita atômica (temporário por processo) para não deixar cache corrompido
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        catalog.to_pickle(tmp_path)
+        os.replace(tmp_path, cache_path)
+
+    return catalog
+
+
+def raw_columns(catalog):
+    """Colunas originais do CSV (sem as colunas derivadas)"""
+    return [c for c in catalog.columns if c not in DERIVED_COLUMNS]
+
+
+def as_records(catalog):
+    """Converte o catálogo em lista de dicts (texto bruto como str, NaN tipado como None)"""
+    text_cols = raw_columns(catalog)
+    raw = catalog[text_cols].astype(object).where(catalog[text_cols].notna(), '')
+    raw = raw.astype(str)
+    typed = catalog[NUMERIC_COLUMNS].astype(object).where(catalog[NUMERIC_COLUMNS].notna(), None)
+
+    records = []
+    for raw_row, typed_row, feature_row in zip(
+        raw.to_dict('records'),
+        typed.to_dict('records'),
+        catalog[FEATURE_COLUMNS + [BITMASK_COLUMN]].to_dict('records'),
+    ):
+        raw_row.update(typed_row)
+        raw_row.update(feature_row)
+        records.append(raw_row)
+    return records
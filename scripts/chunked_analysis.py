@@ -0,0 +1,566 @@
+# -*- coding: utf-8 -*-
+"""
+Relatório da tabela em blocos (catálogos maiores que a memória)
+Lê o CSV em blocos (pd.read_csv com chunksize) e alimenta, bloco a bloco,
+um agregador por análise do analyze_table. Cada agregador tem quatro
+funções:
+
+- init() -> estado vazio
+- update(estado, bloco) -> estado com o bloco (catálogo tipado do bloco)
+- merge(a, b) -> estado de a seguido de b (blocos ou processos)
+- finalize(estado, n_dispositivos) -> a mesma saída da análise em memória
+
+Os estados são contagens, somas, mínimos/máximos, value_counts (na ordem
+de primeira ocorrência, para desempatar como o value_counts do pandas),
+histogramas e co-momentos (correlação de Pearson por Chan et al.), então
+os blocos podem ser processados em paralelo e combinados em ordem.
+
+As estatísticas por reamostragem (ICs por bootstrap e a matriz de
+correlação com testes de permutação) não são mergeáveis: elas usam uma
+amostra aleatória uniforme de até SAMPLE_ROWS linhas (colunas tipadas),
+mantida como as SAMPLE_ROWS menores chaves aleatórias por linha. A chave
+depende só da semente e da posição da linha, então a amostra não depende
+dos blocos nem do número de processos, e a memória fica limitada. Até
+SAMPLE_ROWS dispositivos a amostra é o catálogo inteiro e o relatório é o
+mesmo do caminho em memória; acima disso o relatório indica o tamanho da
+amostra. As listas por dispositivo do JSON (preços, valores de
+canais/estudos, curva de Lorenz, grade de cada dispositivo) ficam vazias
+(None) e artigos por ano guarda só os ARTICLES_TOP primeiros.
+
+Uso:
+    python chunked_analysis.py [--csv CSV] [--chunk-rows N] [--workers N] [--ci [N]] [--permutations N]
+"""
+
+import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+
+import numpy as np
+import pandas as pd
+
+import analyze_table as at
+from catalog import CSV_PATH, DERIVED_COLUMNS, build_catalog, short_model_names
+from instrumentation import stage
+from trends import parse_periods, period_spec, trends_from_yearly, yearly_aggregates
+
+CHUNK_ROWS = 50_000
+
+# Blocos enviados ao pool além dos que estão sendo processados (limita a memória)
+PREFETCH_PER_WORKER = 2
+
+# Artigos por ano: o relatório lista os 20 primeiros
+ARTICLES_TOP = 20
+
+# Linhas da amostra usada pelo bootstrap e pela matriz de correlação
+SAMPLE_ROWS = 50_000
+SAMPLE_SEED = 42
+
+
+# ============================================================================
+# BLOCOS DE CONSTRUÇÃO
+# ============================================================================
+
+def _counts_update(counts, values):
+    """Soma um value_counts ao dict de contagens (mantém a primeira ocorrência)"""
+    for key, count in values.value_counts(sort=False).items():
+        counts[key] = counts.get(key, 0) + int(count)
+    return counts
+
+
+def _counts_merge(a, b):
+    merged = dict(a)
+    for key, count in b.items():
+        merged[key] = merged.get(key, 0) + count
+    return merged
+
+
+def _sorted_counts(counts):
+    """Contagens em ordem decrescente, como Series.value_counts()"""
+    return pd.Series(counts, dtype='int64').sort_values(ascending=False).to_dict()
+
+
+def _stats_init():
+    return {'n': 0, 'sum': 0, 'min': None, 'max': None}
+
+
+def _stats_update(state, values):
+    """Contagem, soma (sequencial, como sum(lista)), mínimo e máximo"""
+    if not values:
+        return state
+    state['n'] += len(values)
+    state['sum'] = sum(values, state['sum'])
+    low, high = min(values), max(values)
+    state['min'] = low if state['min'] is None else min(state['min'], low)
+    state['max'] = high if state['max'] is None else max(state['max'], high)
+    return state
+
+
+def _stats_merge(a, b):
+    merged = dict(a)
+    merged['n'] = a['n'] + b['n']
+    merged['sum'] = a['sum'] + b['sum']
+    for key, pick in (('min', min), ('max', max)):
+        values = [v for v in (a[key], b[key]) if v is not None]
+        merged[key] = pick(values) if values else None
+    return merged
+
+
+def _moments(x, y):
+    """Co-momentos de um bloco: n, médias, somas de quadrados e de produtos dos desvios"""
+    n = len(x)
+    if n == 0:
+        return (0, 0.0, 0.0, 0.0, 0.0, 0.0)
+    mx, my = x.mean(), y.mean()
+    dx, dy = x - mx, y - my
+    return (n, mx, my, float(dx @ dx), float(dy @ dy), float(dx @ dy))
+
+
+def _moments_merge(a, b):
+    """Combinação de co-momentos de duas partes (Chan, Golub e LeVeque)"""
+    na, nb = a[0], b[0]
+    if na == 0:
+        return b
+    if nb == 0:
+        return a
+    n = na + nb
+    dx, dy = b[1] - a[1], b[2] - a[2]
+    return (
+        n,
+        a[1] + dx * nb / n,
+        a[2] + dy * nb / n,
+        a[3] + b[3] + dx * dx * na * nb / n,
+        a[4] + b[4] + dy * dy * na * nb / n,
+        a[5] + b[5] + dx * dy * na * nb / n
+    )
+
+
+def _moments_corr(m):
+    """Pearson a partir dos co-momentos (NaN com variância nula, como o pandas)"""
+    _, _, _, sxx, syy, sxy = m
+    if sxx <= 0 or syy <= 0:
+        return np.nan
+    return float(np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0))
+
+
+def _sample_keys(rows):
+    """
+    Chave uniforme em [0, 1) de cada linha, função só da semente e da
+    posição (splitmix64): a mesma linha recebe a mesma chave em qualquer bloco.
+    """
+    z = np.uint64(SAMPLE_SEED) + (rows.astype(np.uint64) + np.uint64(1)) * np.uint64(0x9E3779B97F4A7C15)
+    with np.errstate(over='ignore'):
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+def _sample_update(state, df):
+    """Amostra: as SAMPLE_ROWS linhas de menor chave (colunas tipadas)"""
+    block = df[DERIVED_COLUMNS].copy()
+    block['_row'] = df.index.to_numpy()
+    block['_key'] = _sample_keys(block['_row'].to_numpy())
+    return _sample_merge(state, block.nsmallest(SAMPLE_ROWS, '_key'))
+
+
+def _sample_merge(a, b):
+    if a is None or b is None:
+        return b if a is None else a
+    merged = pd.concat([a, b], ignore_index=True)
+    return merged if len(merged) <= SAMPLE_ROWS else merged.nsmallest(SAMPLE_ROWS, '_key')
+
+
+def _sample_finalize(state, n_devices):
+    """Amostra na ordem original das linhas (todas, quando cabem)"""
+    return state.sort_values('_row').drop(columns=['_row', '_key']).reset_index(drop=True)
+
+
+# ============================================================================
+# AGREGADORES (um por análise do analyze_table)
+# ============================================================================
+
+def _years_update(state, df):
+    years = pd.to_numeric(df['Year of first appearance'].dropna(), errors='coerce').dropna()
+    return _counts_update(state, years)
+
+
+def _years_finalize(counts, n_devices):
+    total = sum(counts.values())
+    return {
+        'total_with_year': total,
+        'total_without_year': n_devices - total,
+        'min_year': int(min(counts)) if counts else None,
+        'max_year': int(max(counts)) if counts else None,
+        'year_counts': dict(sorted(counts.items()))
+    }
+
+
+def _manufacturers_update(state, df):
+    manufacturers = df['Manufacturer'].dropna().str.strip()
+    state.update(manufacturers.str.replace('\n', ' ', regex=False).unique())
+    return state
+
+
+def _countries_finalize(counts, n_devices):
+    return {
+        'total': len(counts),
+        'list': sorted(counts),
+        'counts': _sorted_counts(counts)
+    }
+
+
+def _prices_update(state, df):
+    has_cell = df['Price (USD)'].notna()
+    prices = df.loc[has_cell, 'price']
+    state['cells'] += int(has_cell.sum())
+    _stats_update(state['stats'], prices[prices.notna() & (prices != 0)].tolist())
+    return state
+
+
+def _prices_merge(a, b):
+    return {'cells': a['cells'] + b['cells'], 'stats': _stats_merge(a['stats'], b['stats'])}
+
+
+def _prices_finalize(state, n_devices):
+    stats = state['stats']
+    return {
+        'total_with_price': stats['n'],
+        'total_without_price': state['cells'] - stats['n'],
+        'min_price': stats['min'],
+        'max_price': stats['max'],
+        'avg_price': stats['sum'] / stats['n'] if stats['n'] else None,
+        'prices': None
+    }
+
+
+def _channels_finalize(stats, n_devices):
+    return {
+        'min': stats['min'],
+        'max': stats['max'],
+        'avg': stats['sum'] / stats['n'] if stats['n'] else None,
+        'values': None
+    }
+
+
+def _studies_update(state, df):
+    values = df['studies'].dropna().astype(int)
+    _stats_update(state['stats'], values.tolist())
+    _counts_update(state['histogram'], values)
+    return state
+
+
+def _studies_merge(a, b):
+    return {'stats': _stats_merge(a['stats'], b['stats']),
+            'histogram': _counts_merge(a['histogram'], b['histogram'])}
+
+
+def _studies_finalize(state, n_devices):
+    stats = state['stats']
+    return {
+        'total': stats['sum'],
+        'max': stats['max'] if stats['n'] else 0,
+        'min': stats['min'] if stats['n'] else 0,
+        'avg': stats['sum'] / stats['n'] if stats['n'] else 0,
+        'values': None
+    }
+
+
+def lorenz_from_histogram(histogram):
+    """
+    Gini e participação dos 20% mais citados a partir do histograma de
+    estudos (valor -> dispositivos), sem expandir os valores.
+
+    A área sob a curva de Lorenz (regra do trapézio com passo 1/n) é
+    (soma das somas acumuladas / total - (y0 + 1) / 2) / n, calculada com
+    inteiros e frações (exata).
+    """
+    if not histogram:
+        return {'gini': None, 'curve': None, 'top20_share_pct': None}
+    values = sorted(histogram)
+    n = sum(histogram.values())
+    total = sum(v * histogram[v] for v in values)
+    if total == 0:
+        return {'gini': None, 'curve': None, 'top20_share_pct': None}
+
+    # Posição (0-based) onde a curva é lida para os 80% menos citados
+    k = int(n * 0.8)
+    cumulative_sum = 0
+    position = 0
+    top20_cumulative = None
+    for v in values:
+        count = histogram[v]
+        # Soma de (n - j) para as posições j do grupo
+        cumulative_sum += v * (count * n - (count * position + count * (count - 1) // 2))
+        if top20_cumulative is None and k < position + count:
+            top20_cumulative = sum(u * histogram[u] for u in values if u < v) + v * (k - position + 1)
+        position += count
+
+    area = (Fraction(cumulative_sum, total) - (Fraction(values[0], total) + 1) / 2) / n
+    return {
+        'gini': round(float(1 - 2 * area), 4),
+        'curve': None,
+        'top20_share_pct': int((1 - top20_cumulative / total) * 100)
+    }
+
+
+def _articles_update(top, df):
+    valid = df['year'].notna() & df['studies'].notna() & (df['studies'] != 0)
+    data = pd.DataFrame({
+        'model': short_model_names(df[valid]),
+        'year': df.loc[valid, 'year'].astype(int),
+        'studies': df.loc[valid, 'studies'].astype(int)
+    })
+    data['years_active'] = at.CURRENT_YEAR - data['year']
+    data = data[data['years_active'] > 0]
+    data['articles_per_year'] = (data['studies'] / data['years_active']).round(2)
+    # Linha global desempata como o sort estável do caminho em memória
+    data['row'] = data.index
+    data = data.sort_values(['articles_per_year', 'row'], ascending=[False, True]).head(ARTICLES_TOP)
+    return _articles_merge(top, data.to_dict('records'))
+
+
+def _articles_merge(a, b):
+    return sorted(a + b, key=lambda d: (-d['articles_per_year'], d['row']))[:ARTICLES_TOP]
+
+
+def _articles_finalize(top, n_devices):
+    return [{k: v for k, v in d.items() if k != 'row'} for d in top]
+
+
+# Pares de calculate_correlations: (chave, coluna x, descarta NaN em x)
+CORRELATION_INPUTS = [
+    ('price_vs_adoption', 'price', True),
+    ('channels_vs_adoption', 'channels_max', True),
+    ('open_api_vs_adoption', 'open_api', False),
+    ('dry_electrode_vs_adoption', 'dry_electrode', False)
+]
+
+
+def _correlations_update(state, df):
+    with_studies = df[df['studies'].notna()]
+    studies = with_studies['studies'].to_numpy(dtype=float)
+    for key, column, dropna in CORRELATION_INPUTS:
+        x = with_studies[column].astype(float).to_numpy()
+        keep = ~np.isnan(x) if dropna else np.ones(len(x), dtype=bool)
+        state[key] = _moments_merge(state[key], _moments(x[keep], studies[keep]))
+    return state
+
+
+def _correlations_merge(a, b):
+    return {key: _moments_merge(a[key], b[key]) for key in a}
+
+
+def _correlations_finalize(state, n_devices):
+    correlations = {}
+    for key, _, _ in CORRELATION_INPUTS:
+        moments = state[key]
+        if moments[0] > 2:
+            corr = _moments_corr(moments)
+            correlations[key] = {
+                'correlation': round(corr, 4),
+                'n': moments[0],
+                'interpretation': 'negativa' if corr < 0 else 'positiva'
+            }
+    return correlations
+
+
+def _yearly_merge(a, b):
+    if a is None:
+        return b
+    return a.add(b, fill_value=0)
+
+
+def _grades_update(state, df):
+    grade = at.classify_grade(df, **at.GRADE_THRESHOLDS)
+    counts = grade.value_counts().reindex(at.GRADES).to_numpy()
+    sweep = at.sweep_grade_thresholds(df)
+    return _grades_merge(state, {'counts': counts, 'sweep': sweep})
+
+
+def _grades_merge(a, b):
+    if a is None:
+        return b
+    sweep = a['sweep'].copy()
+    sweep[at.GRADES] = a['sweep'][at.GRADES] + b['sweep'][at.GRADES]
+    return {'counts': a['counts'] + b['counts'], 'sweep': sweep}
+
+
+def _grades_finalize(state, n_devices):
+    grades = {k: int(v) for k, v in zip(at.GRADES, state['counts'])}
+    return at.grade_summary(grades, state['sweep'], n_devices)
+
+
+AGGREGATORS = {
+    'devices': {
+        'init': lambda: 0,
+        'update': lambda state, df: state + len(df),
+        'merge': lambda a, b: a + b,
+        'finalize': lambda state, n_devices: state
+    },
+    'years': {
+        'init': dict, 'update': _years_update, 'merge': _counts_merge, 'finalize': _years_finalize
+    },
+    'manufacturers': {
+        'init': set,
+        'update': _manufacturers_update,
+        'merge': lambda a, b: a | b,
+        'finalize': lambda state, n_devices: {'total': len(state), 'list': sorted(state)}
+    },
+    'countries': {
+        'init': dict,
+        'update': lambda state, df: _counts_update(state, df['Origin'].dropna().str.strip()),
+        'merge': _counts_merge,
+        'finalize': _countries_finalize
+    },
+    'technology': {
+        'init': dict,
+        'update': lambda state, df: _counts_update(state, df['Technology'].dropna().str.strip()),
+        'merge': _counts_merge,
+        'finalize': lambda state, n_devices: {'counts': _sorted_counts(state)}
+    },
+    'prices': {
+        'init': lambda: {'cells': 0, 'stats': _stats_init()},
+        'update': _prices_update,
+        'merge': _prices_merge,
+        'finalize': _prices_finalize
+    },
+    'channels': {
+        'init': _stats_init,
+        'update': lambda state, df: _stats_update(state, df['channels_max'].dropna().astype(int).tolist()),
+        'merge': _stats_merge,
+        'finalize': _channels_finalize
+    },
+    'studies': {
+        'init': lambda: {'stats': _stats_init(), 'histogram': {}},
+        'update': _studies_update,
+        'merge': _studies_merge,
+        'finalize': _studies_finalize
+    },
+    'articles_per_year': {
+        'init': list, 'update': _articles_update, 'merge': _articles_merge, 'finalize': _articles_finalize
+    },
+    'correlations': {
+        'init': lambda: {key: _moments(np.empty(0), np.empty(0)) for key, _, _ in CORRELATION_INPUTS},
+        'update': _correlations_update,
+        'merge': _correlations_merge,
+        'finalize': _correlations_finalize
+    },
+    'temporal_trends': {
+        'init': lambda: None,
+        'update': lambda state, df: _yearly_merge(state, yearly_aggregates(df)),
+        'merge': _yearly_merge,
+        'finalize': lambda state, n_devices: trends_from_yearly(state).to_dict('index')
+    },
+    'grades': {
+        'init': lambda: None, 'update': _grades_update, 'merge': _grades_merge, 'finalize': _grades_finalize
+    },
+    # Amostra das colunas tipadas para o bootstrap e as permutações
+    'sample': {
+        'init': lambda: None, 'update': _sample_update, 'merge': _sample_merge, 'finalize': _sample_finalize
+    }
+}
+
+
+# ============================================================================
+# EXECUÇÃO
+# ============================================================================
+
+def aggregate_chunk(raw):
+    """Estados de todos os agregadores para um bloco do CSV (executado no pool)"""
+    df = build_catalog(raw)
+    return {name: spec['update'](spec['init'](), df) for name, spec in AGGREGATORS.items()}
+
+
+def merge_states(a, b):
+    """Estados de a seguidos dos de b"""
+    return {name: spec['merge'](a[name], b[name]) for name, spec in AGGREGATORS.items()}
+
+
+def read_chunks(csv_path=CSV_PATH, chunk_rows=CHUNK_ROWS):
+    """
+    Blocos do CSV bruto. Tudo é lido como texto: a inferência de tipos do
+    pandas mudaria de bloco para bloco, e os parsers do catalog tratam o
+    texto igual aos números.
+    """
+    return pd.read_csv(csv_path, encoding='utf-8', dtype=str, chunksize=chunk_rows)
+
+
+def _partials(chunks, workers):
+    """Estados parciais na ordem dos blocos, com no máximo alguns blocos em trânsito"""
+    if workers <= 1:
+        for raw in chunks:
+            yield aggregate_chunk(raw)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for raw in chunks:
+            pending.append(pool.submit(aggregate_chunk, raw))
+            if len(pending) >= workers * PREFETCH_PER_WORKER:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def run_chunked(csv_path=CSV_PATH, chunk_rows=CHUNK_ROWS, workers=1):
+    """
+    Estados finais de todos os agregadores, bloco a bloco.
+
+    Args:
+        csv_path: CSV no formato da Table1
+        chunk_rows: Linhas por bloco
+        workers: Processos (os parciais são combinados na ordem dos blocos,
+            então o resultado não depende do número de processos)
+    """
+    state = None
+    for partial in _partials(read_chunks(csv_path, chunk_rows), workers):
+        state = partial if state is None else merge_states(state, partial)
+    if state is None:
+        raise ValueError(f"CSV sem linhas: {csv_path}")
+    return state
+
+
+def compute_results_chunked(csv_path=CSV_PATH, chunk_rows=CHUNK_ROWS, workers=1, n_boot=0,
+                            n_perm=at.N_PERMUTATIONS, periods='default'):
+    """Mesmo dict de analyze_table.compute_results, calculado em blocos"""
+    with stage('aggregate_chunks'):
+        state = run_chunked(csv_path, chunk_rows, workers)
+
+    n_devices = state['devices']
+    parts = {name: spec['finalize'](state[name], n_devices) for name, spec in AGGREGATORS.items()}
+    parts['lorenz'] = lorenz_from_histogram(state['studies']['histogram'])
+    # Períodos resolvidos com os anos de todo o catálogo (não só da amostra)
+    yearly = state['temporal_trends']
+    periods = parse_periods(periods, None if yearly is None else yearly.index)
+    if yearly is not None:
+        parts['temporal_trends'] = trends_from_yearly(yearly, periods).to_dict('index')
+
+    typed = parts.pop('sample')
+    parts['sample'] = {'rows': len(typed), 'devices': n_devices} if len(typed) < n_devices else None
+    parts['intervals'] = None
+    if n_boot:
+        with stage('bootstrap_confidence_intervals', typed):
+            parts['intervals'] = at.bootstrap_confidence_intervals(typed, n_boot=n_boot, periods=periods)
+    with stage('compute_correlation_matrix', typed):
+        parts['matrix'] = at.compute_correlation_matrix(typed, n_perm=n_perm)
+
+    return at.build_results(parts, n_devices, os.path.basename(csv_path))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Relatório da tabela calculado em blocos")
+    parser.add_argument('--csv', default=CSV_PATH, help="CSV da Table1")
+    parser.add_argument('--output', default=at.OUTPUT_PATH, help="arquivo de saída do relatório")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help="linhas por bloco")
+    parser.add_argument('--workers', type=int, default=1, help="processos")
+    parser.add_argument('--ci', type=int, nargs='?', const=10000, default=0, metavar='N',
+                        help="ICs por bootstrap com N reamostragens")
+    parser.add_argument('--permutations', type=int, default=at.N_PERMUTATIONS,
+                        help="permutações da matriz de correlações (0 = só teste t)")
+    parser.add_argument('--periods', type=period_spec, default='default',
+                        help="períodos das tendências: default, yearly ou rolling:N")
+    args = parser.parse_args()
+    at.main(csv_path=args.csv, output_path=args.output, chunk_rows=args.chunk_rows, workers=args.workers,
+            n_boot=args.ci, n_perm=args.permutations, periods=args.periods)
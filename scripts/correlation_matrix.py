@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+Matriz de correlações com testes de permutação (R3C3)
+Calcula as matrizes de Pearson e Spearman entre todas as variáveis
+numéricas e booleanas derivadas do catálogo, usando apenas os pares
+completos de cada combinação. Os p-valores vêm de permutações em lote
+(matriz de permutações x dispositivos, multiplicação de matrizes), que
+podem ser divididas entre processos, e são corrigidos para comparações
+múltiplas (Benjamini-Hochberg ou Bonferroni).
+
+O custo das permutações é O(permutações x linhas) por grupo de pares,
+limitado a PERMUTATION_BUDGET: grupos grandes recebem menos permutações
+(p-valor mínimo maior) e, quando nem MIN_PERMUTATIONS cabem (ou com
+n_perm=0), usam o p-valor assintótico do teste t (r * sqrt((n-2)/(1-r²)),
+n-2 graus de liberdade), adequado a muitas linhas.
+"""
+
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from keywords import has_any
+
+NUMERIC_FEATURES = [
+    'price',
+    'channels_min',
+    'channels_max',
+    'max_fs_hz',
+    'adc_bits',
+    'studies',
+    'year',
+]
+
+BOOLEAN_FEATURES = [
+    'open_api',
+    'dry_electrode',
+    'bluetooth',
+    'wifi',
+    'raw_available',
+    'has_sync',
+]
+
+# Features extraídas da máscara de bits (ver keywords.FEATURE_VOCABULARY)
+BITMASK_FEATURES = [
+    'sync_lsl',
+    'aux_imu',
+    'aux_hr',
+    'aux_eog',
+    'medical_cert',
+    'sensor_gel',
+    'sensor_optode',
+]
+
+N_PERMUTATIONS = 10000
+ALPHA = 0.05
+
+# Linhas x permutações por grupo de pares (limita o tempo em catálogos grandes)
+PERMUTATION_BUDGET = 2_000_000
+# Abaixo disto as permutações não resolvem p-valores pequenos: teste t
+MIN_PERMUTATIONS = 1000
+
+# Elementos (permutações x linhas) por bloco, para limitar a memória
+CHUNK_ELEMENTS = 2_000_000
+# Permutações por bloco de trabalho (fixo: resultado não depende do nº de processos)
+PERMUTATION_CHUNK = 1000
+# Abaixo deste volume (permutações x linhas x pares) o pool não compensa
+POOL_THRESHOLD = 50_000_000
+
+
+def feature_matrix(df):
+    """Variáveis numéricas e booleanas (0/1) usadas na matriz de correlações"""
+    features = df['features'].to_numpy()
+    data = {column: df[column].astype(float) for column in NUMERIC_FEATURES + BOOLEAN_FEATURES}
+    for name in BITMASK_FEATURES:
+        data[name] = pd.Series(has_any(features, name).astype(float), index=df.index)
+    return pd.DataFrame(data)
+
+
+def _standardize(values):
+    """Centraliza e normaliza cada coluna (produto interno = correlação)"""
+    centered = values - values.mean(axis=0)
+    norm = np.sqrt((centered * centered).sum(axis=0))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return centered / norm
+
+
+def adjust_pvalues(pvalues, method='fdr_bh'):
+    """Correção para comparações múltiplas ('fdr_bh' ou 'bonferroni')"""
+    pvalues = np.asarray(pvalues, dtype=float)
+    adjusted = np.full(len(pvalues), np.nan)
+    valid = ~np.isnan(pvalues)
+    m = int(valid.sum())
+    if m == 0:
+        return adjusted
+
+    p = pvalues[valid]
+    if method == 'bonferroni':
+        adjusted[valid] = np.minimum(p * m, 1.0)
+    elif method == 'fdr_bh':
+        order = np.argsort(p)
+        ranked = p[order] * m / np.arange(1, m + 1)
+        # Monotonicidade: q_(i) = min_{j >= i} p_(j) * m / j
+        ranked = np.minimum.accumulate(ranked[::-1])[::-1]
+        q = np.empty(m)
+        q[order] = np.minimum(ranked, 1.0)
+        adjusted[valid] = q
+    else:
+        raise ValueError(f"Método de correção desconhecido: {method!r}")
+    return adjusted
+
+
+# ============================================================================
+# GRUPOS DE PARES COMPLETOS
+# ============================================================================
+
+def pair_groups(values):
+    """Agrupa os pares de variáveis que têm o mesmo conjunto de linhas completas"""
+    valid = ~np.isnan(values)
+    n_features = values.shape[1]
+
+    # Uma máscara de linhas por grupo (não por par)
+    by_rows, masks = defaultdict(list), {}
+    for i in range(n_features):
+        for j in range(i + 1, n_features):
+            rows = valid[:, i] & valid[:, j]
+            key = np.packbits(rows).tobytes()
+            masks.setdefault(key, rows)
+            by_rows[key].append((i, j))
+
+    groups = []
+    for key, pairs in by_rows.items():
+        rows = np.flatnonzero(masks[key])
+        if len(rows) < 3:
+            continue
+        columns = sorted({i for i, _ in pairs} | {j for _, j in pairs})
+        local = {c: k for k, c in enumerate(columns)}
+        subset = values[np.ix_(rows, columns)]
+
+        groups.append({
+            'pairs': pairs,
+            'ii': np.array([local[i] for i, _ in pairs]),
+            'jj': np.array([local[j] for _, j in pairs]),
+            'pearson': _standardize(subset),
+            # Spearman = Pearson sobre os postos médios dentro das linhas completas
+            'spearman': _standardize(pd.DataFrame(subset).rank().to_numpy())
+        })
+    return groups
+
+
+def observed_correlations(group):
+    """Correlações observadas dos pares de um grupo"""
+    result = {}
+    for method in ('pearson', 'spearman'):
+        z = group[method]
+        # Matriz q x q (como nas permutações), sem cópias linhas x pares
+        result[method] = (z.T @ z)[group['ii'], group['jj']]
+    return result
+
+
+def permutation_chunk(groups, n_perm, seed):
+    """Contagem de |r permutado| >= |r observado| para `n_perm` permutações"""
+    rng = np.random.default_rng(seed)
+    counts = []
+
+    for group in groups:
+        n_rows = len(group['pearson'])
+        observed = observed_correlations(group)
+        exceed = {method: np.zeros(len(group['pairs']), dtype=np.int64) for method in observed}
+        step = max(1, CHUNK_ELEMENTS // n_rows)
+
+        done = 0
+        while done < n_perm:
+            k = min(step, n_perm - done)
+            # Uma permutação independente das linhas por reamostragem
+            perms = np.argsort(rng.random((k, n_rows)), axis=1)
+            for method, obs in observed.items():
+                z = group[method]
+                # (k, q, q): correlação de cada coluna com cada coluna permutada
+                permuted = z.T[None, :, :] @ z[perms]
+                r = permuted[:, group['ii'], group['jj']]
+                # Tolerância para empates numéricos com o valor observado
+                exceed[method] += (np.abs(r) >= np.abs(obs) - 1e-12).sum(axis=0)
+            done += k
+
+        counts.append(exceed)
+    return counts
+
+
+def run_permutations(groups, n_perm=N_PERMUTATIONS, seed=42, workers=None):
+    """Distribui as permutações em blocos (pool de processos quando compensa)"""
+    work = n_perm * sum(len(g['pearson']) * len(g['pairs']) for g in groups)
+    if workers is None:
+        workers = os.cpu_count() if work >= POOL_THRESHOLD else 1
+
+    n_chunks = max(1, -(-n_perm // PERMUTATION_CHUNK))
+    sizes = [PERMUTATION_CHUNK] * (n_chunks - 1) + [n_perm - PERMUTATION_CHUNK * (n_chunks - 1)]
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+
+    if workers > 1 and n_chunks > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(permutation_chunk, [groups] * n_chunks, sizes, seeds))
+    else:
+        chunks = [permutation_chunk(groups, size, s) for size, s in zip(sizes, seeds)]
+
+    totals = []
+    for g, group in enumerate(groups):
+        totals.append({
+            method: sum(chunk[g][method] for chunk in chunks)
+            for method in ('pearson', 'spearman')
+        })
+    return totals
+
+
+def t_test_pvalues(r, n):
+    """p-valor bilateral assintótico de correlações r com n linhas (teste t)"""
+    # Import tardio: o relatório principal não depende do scipy
+    from scipy import stats
+
+    r = np.clip(np.asarray(r, dtype=float), -1.0, 1.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = np.abs(r) * np.sqrt((n - 2) / (1 - r * r))
+    return np.where(np.isnan(r), np.nan, 2 * stats.t.sf(t, n - 2))
+
+
+# ============================================================================
+# MATRIZ COMPLETA
+# ============================================================================
+
+def compute_correlation_matrix(df, n_perm=N_PERMUTATIONS, seed=42, workers=None,
+                               correction='fdr_bh', alpha=ALPHA, budget=PERMUTATION_BUDGET):
+    """
+    Matrizes de Pearson/Spearman, p-valores e pares significativos
+    (q de Pearson < alpha).
+
+    Args:
+        n_perm: Permutações por par (0 = só o teste t)
+        budget: Linhas x permutações máximas de um grupo de pares (None = sem
+            limite); grupos maiores recebem budget // linhas permutações, ou
+            o teste t quando isso fica abaixo de MIN_PERMUTATIONS
+    """
+    data = feature_matrix(df)
+    names = list(data.columns)
+    values = data.to_numpy(dtype=float)
+
+    groups = pair_groups(values)
+    group_perms = []
+    for group in groups:
+        k = n_perm if budget is None else min(n_perm, budget // len(group['pearson']))
+        group_perms.append(k if k >= min(n_perm, MIN_PERMUTATIONS) and k > 0 else 0)
+
+    # Uma execução por número de permutações (o caso comum é uma só)
+    counts = {}
+    for k in sorted(set(group_perms) - {0}, reverse=True):
+        members = [g for g, perms in enumerate(group_perms) if perms == k]
+        totals = run_permutations([groups[g] for g in members], n_perm=k, seed=seed, workers=workers)
+        counts.update(zip(members, totals))
+
+    rows = []
+    for g, group in enumerate(groups):
+        observed = observed_correlations(group)
+        n, k = len(group['pearson']), group_perms[g]
+        for p, (i, j) in enumerate(group['pairs']):
+            row = {'x': names[i], 'y': names[j], 'n': n, 'n_perm': k}
+            for method in ('pearson', 'spearman'):
+                r = observed[method][p]
+                row[method] = r
+                if k == 0:
+                    row[method + '_p'] = float(t_test_pvalues(r, n))
+                else:
+                    # p-valor bilateral com correção +1 (nunca zero)
+                    row[method + '_p'] = np.nan if np.isnan(r) else (counts[g][method][p] + 1) / (k + 1)
+            rows.append(row)
+
+    pairs = pd.DataFrame(rows, columns=['x', 'y', 'n', 'n_perm', 'pearson', 'pearson_p', 'spearman',
+                                        'spearman_p'])
+    for method in ('pearson', 'spearman'):
+        pairs[method + '_q'] = adjust_pvalues(pairs[method + '_p'].to_numpy(), correction)
+    # Critério único: q de Pearson (o de Spearman é só informativo)
+    pairs['significant'] = pairs['pearson_q'] < alpha
+
+    matrices = {}
+    for method in ('pearson', 'spearman'):
+        matrix = pd.DataFrame(np.nan, index=names, columns=names)
+        np.fill_diagonal(matrix.values, 1.0)
+        for row in pairs.itertuples(index=False):
+            value = getattr(row, method)
+            matrix.loc[row.x, row.y] = value
+            matrix.loc[row.y, row.x] = value
+        matrices[method] = matrix
+
+    return {
+        'pearson': matrices['pearson'],
+        'spearman': matrices['spearman'],
+        'pairs': pairs,
+        'n_perm': n_perm,
+        # Pares com p-valor do teste t e com menos permutações que n_perm
+        'n_t_test': int((pairs['n_perm'] == 0).sum()),
+        'n_reduced': int(((pairs['n_perm'] > 0) & (pairs['n_perm'] < n_perm)).sum()),
+        'correction': correction,
+        'alpha': alpha
+    }
+
+
+def pair_result(result, x, y):
+    """Linha de `pairs` para o par (x, y), em qualquer ordem"""
+    pairs = result['pairs']
+    match = pairs[((pairs['x'] == x) & (pairs['y'] == y)) | ((pairs['x'] == y) & (pairs['y'] == x))]
+    return None if match.empty else match.iloc[0].to_dict()
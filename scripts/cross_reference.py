@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+Mapeamento comentários dos revisores x seções do artigo (TF-IDF)
+Monta uma matriz esparsa TF-IDF com todos os comentários individuais e
+todas as seções (de um ou mais manuscritos), normaliza as linhas e obtém a
+similaridade de cosseno de todos os pares com um único produto de matrizes
+esparsas. O resultado é a tabela comentário x seção e um rascunho da
+Divisão_de_comentários.txt agrupando os comentários pela seção mais
+provável.
+
+Uso:
+    python cross_reference.py [--top 3]
+"""
+
+import argparse
+import os
+import re
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from search_index import PROJECT_DIR, tokenize
+
+COMMENT_DIRS = [
+    os.path.join(PROJECT_DIR, "Comentarios_Individuais"),
+    os.path.join(PROJECT_DIR, "Alterações", "Comentarios_Individuais"),
+]
+SECTION_DIRS = [os.path.join(PROJECT_DIR, "Artigo-Partes")]
+
+OUTPUT_CSV = os.path.join(PROJECT_DIR, "Alterações", "relevancia_comentarios_secoes.csv")
+# Rascunho separado: a Divisão_de_comentários.txt é editada à mão
+OUTPUT_DRAFT = os.path.join(PROJECT_DIR, "Alterações", "Divisão_de_comentários_RASCUNHO.txt")
+
+# Seções sem conteúdo a discutir (título, palavras-chave, referências)
+EXCLUDED_SECTIONS = ('Title', 'Keywords', 'Acknowledgment', 'Bibliography')
+
+# Similaridade mínima para um comentário entrar no grupo de uma seção
+MIN_SCORE = 0.05
+
+CODE_PATTERN = re.compile(r'R(\d+)(C|AQ)(\d+)')
+# Linha de andamento ("STATUS - Encarregado", "PARCIALMENTE RESOLVIDO - claudio")
+STATUS_PATTERN = re.compile(r'^[A-ZÀ-Ú ]{4,}\s+-\s')
+
+
+# ============================================================================
+# LEITURA DOS TEXTOS
+# ============================================================================
+
+def comment_text(raw):
+    """
+    Partes do comentário usadas na similaridade.
+
+    Remove a linha de andamento (STATUS/RESOLVIDO), a dica "→ Onde" (nomes
+    de seção, não conteúdo) e a resposta dos autores (depois de RESPONSE TO
+    REVIEWERS).
+    """
+    body = raw.split('RESPONSE TO REVIEWERS')[0]
+    lines = [
+        line for line in body.splitlines()
+        if not STATUS_PATTERN.match(line.strip()) and not line.strip().startswith('→ Onde')
+    ]
+    return '\n'.join(lines)
+
+
+def declared_sections(raw):
+    """Seções indicadas na linha "→ Onde:" do comentário"""
+    match = re.search(r'→ Onde:\s*(.+)', raw)
+    return match.group(1).strip() if match else ''
+
+
+def _code_key(code):
+    match = CODE_PATTERN.match(code)
+    if not match:
+        return (999, 9, 999, code)
+    reviewer, kind, number = match.groups()
+    return (int(reviewer), 0 if kind == 'C' else 1, int(number), code)
+
+
+def load_comments(dirs=None):
+    """
+    Comentários individuais {código: texto bruto}, em ordem R1C0, R1C1, ...
+
+    Os dois diretórios padrão guardam a mesma carta (o primeiro vence nos
+    códigos repetidos). Com vários diretórios informados (manuscritos ou
+    rodadas diferentes), o nome do diretório entra no rótulo
+    (rodadaA/R1C1), como em load_sections.
+    """
+    defaults = dirs is None or [os.path.abspath(d) for d in dirs] == [os.path.abspath(d) for d in COMMENT_DIRS]
+    dirs = COMMENT_DIRS if dirs is None else dirs
+    comments, keys = {}, {}
+    for position, directory in enumerate(dirs):
+        if not os.path.isdir(directory):
+            continue
+        for path in Path(directory).glob('R*.txt'):
+            if defaults or len(dirs) == 1:
+                label, key = path.stem, _code_key(path.stem)
+            else:
+                label, key = f"{Path(directory).name}/{path.stem}", (position, *_code_key(path.stem))
+            if label not in comments:
+                comments[label] = path.read_text(encoding='utf-8')
+                keys[label] = key
+    return {label: comments[label] for label in sorted(comments, key=keys.get)}
+
+
+def load_sections(dirs=None, excluded=EXCLUDED_SECTIONS):
+    """
+    Seções do(s) artigo(s) {rótulo: texto}.
+
+    Com um diretório o rótulo é o nome do arquivo (06_Results); com vários,
+    o nome do diretório entra no rótulo (Artigo-Partes/06_Results).
+    """
+    dirs = SECTION_DIRS if dirs is None else dirs
+    sections = {}
+    for directory in dirs:
+        for path in sorted(Path(directory).glob('*.txt')):
+            name = path.stem.split('_', 1)[-1]
+            if name in excluded:
+                continue
+            label = path.stem if len(dirs) == 1 else f"{Path(directory).name}/{path.stem}"
+            sections[label] = path.read_text(encoding='utf-8')
+    return sections
+
+
+# ============================================================================
+# TF-IDF ESPARSO
+# ============================================================================
+
+def tfidf_matrix(texts):
+    """
+    Matriz TF-IDF esparsa (CSR) com linhas normalizadas (norma L2).
+
+    tf sublinear (1 + log tf) e idf suavizado log((1 + N) / (1 + df)) + 1.
+
+    Returns:
+        (matriz documentos x termos, vocabulário {termo: coluna})
+    """
+    vocabulary = {}
+    rows, cols, counts = [], [], []
+    for i, text in enumerate(texts):
+        tokens = tokenize(text)
+        if not tokens:
+            continue
+        ids = np.fromiter((vocabulary.setdefault(t, len(vocabulary)) for t in tokens),
+                          dtype=np.int64, count=len(tokens))
+        terms, tf = np.unique(ids, return_counts=True)
+        rows.append(np.full(len(terms), i))
+        cols.append(terms)
+        counts.append(tf)
+
+    shape = (len(texts), len(vocabulary))
+    if not rows:
+        return sparse.csr_matrix(shape), vocabulary
+
+    rows, cols, counts = np.concatenate(rows), np.concatenate(cols), np.concatenate(counts)
+    df = np.bincount(cols, minlength=len(vocabulary))
+    idf = np.log((1 + len(texts)) / (1 + df)) + 1
+
+    weights = (1 + np.log(counts)) * idf[cols]
+    matrix = sparse.csr_matrix((weights, (rows, cols)), shape=shape)
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix, vocabulary
+
+
+def relevance_table(comments, sections):
+    """
+    Similaridade de cosseno comentário x seção.
+
+    Comentários e seções compartilham o mesmo vocabulário e o mesmo idf; a
+    tabela inteira sai de um único produto esparso C @ S.T.
+    """
+    codes = list(comments)
+    labels = list(sections)
+    texts = [comment_text(comments[c]) for c in codes] + [sections[s] for s in labels]
+
+    matrix, _ = tfidf_matrix(texts)
+    c_matrix = matrix[:len(codes)]
+    s_matrix = matrix[len(codes):]
+    scores = (c_matrix @ s_matrix.T).toarray()
+
+    table = pd.DataFrame(scores, index=codes, columns=labels)
+    table.index.name = 'comentario'
+    return table
+
+
+def top_sections(table, top=3):
+    """Seções mais prováveis de cada comentário: {código: [(seção, score)]}"""
+    values = table.to_numpy()
+    # argsort decrescente de todas as linhas de uma vez
+    order = np.argsort(-values, axis=1, kind='stable')[:, :top]
+    labels = np.asarray(table.columns)
+    return {
+        code: [(labels[j], float(values[i, j])) for j in order[i]]
+        for i, code in enumerate(table.index)
+    }
+
+
+# ============================================================================
+# RASCUNHO DA DIVISÃO DE COMENTÁRIOS
+# ============================================================================
+
+def _summary(raw, width=58):
+    """Primeira linha de conteúdo do comentário"""
+    for line in comment_text(raw).splitlines()[1:]:
+        line = line.strip()
+        if line:
+            return line if len(line) <= width else line[:width - 1] + '…'
+    return ''
+
+
+def draft_division(table, comments, top=3, min_score=MIN_SCORE):
+    """Texto do rascunho: comentários agrupados pela seção mais provável"""
+    ranking = top_sections(table, top)
+    width = 79
+
+    lines = [
+        "=" * 80,
+        f"RASCUNHO - DIVISÃO DE COMENTÁRIOS POR SEÇÃO ({len(comments)} COMENTÁRIOS)",
+        "=" * 80,
+        f"Gerado: {date.today().isoformat()} (similaridade TF-IDF, revisar antes de usar)",
+        "",
+        "=" * 80,
+        "MAPEAMENTO POR SEÇÃO (SEÇÃO MAIS PROVÁVEL DE CADA COMENTÁRIO)",
+        "=" * 80,
+        ""
+    ]
+
+    best = {code: ranked[0] for code, ranked in ranking.items()}
+    for section in table.columns:
+        members = [(code, score) for code, (label, score) in best.items()
+                   if label == section and score >= min_score]
+        if not members:
+            continue
+        members.sort(key=lambda item: -item[1])
+
+        lines.append("┌" + "─" * (width - 2) + "┐")
+        lines.append(f"│ SEÇÃO: {section}".ljust(width - 1) + "│")
+        lines.append("├" + "─" * (width - 2) + "┤")
+        for code, score in members:
+            text = f"│ {code:<6} │ {score:.2f} │ {_summary(comments[code])}"
+            lines.append(text.ljust(width - 1) + "│")
+        lines.append("└" + "─" * (width - 2) + "┘")
+        lines.append("")
+
+    unmatched = [code for code, (_, score) in best.items() if score < min_score]
+    if unmatched:
+        lines.append(f"Sem seção provável (score < {min_score}): {', '.join(unmatched)}")
+        lines.append("")
+
+    lines += [
+        "=" * 80,
+        f"TOP {top} SEÇÕES POR COMENTÁRIO",
+        "=" * 80,
+        ""
+    ]
+    for code, ranked in ranking.items():
+        ranked_text = ", ".join(f"{label} ({score:.2f})" for label, score in ranked)
+        lines.append(f"{code:<6} → {ranked_text}")
+        declared = declared_sections(comments[code])
+        if declared:
+            lines.append(f"{'':<6}   Onde (revisor): {declared}")
+
+    return "\n".join(lines) + "\n"
+
+
+def main(comment_dirs=None, section_dirs=None, output_csv=OUTPUT_CSV, output_draft=OUTPUT_DRAFT, top=3):
+    comments = load_comments(comment_dirs)
+    sections = load_sections(section_dirs)
+    if not sections:
+        searched = ', '.join(str(d) for d in (SECTION_DIRS if section_dirs is None else section_dirs))
+        raise SystemExit(f"Nenhuma seção encontrada em {searched} (rode split-article ou informe --sections)")
+    print(f"Comentários: {len(comments)} | Seções: {len(sections)}")
+
+    table = relevance_table(comments, sections)
+
+    table.round(4).to_csv(output_csv, encoding='utf-8')
+    print(f"✅ Tabela comentário x seção: {output_csv}")
+
+    with open(output_draft, 'w', encoding='utf-8') as f:
+        f.write(draft_division(table, comments, top))
+    print(f"✅ Rascunho: {output_draft}")
+
+    for code, ranked in top_sections(table, top).items():
+        print(f"   {code:<6} → " + ", ".join(f"{label} ({score:.2f})" for label, score in ranked))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comentários dos revisores x seções do artigo")
+    parser.add_argument('--top', type=int, default=3, help="seções listadas por comentário")
+    args = parser.parse_args()
+    main(top=args.top)
@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+"""
+Consultas declarativas sobre o catálogo tipado
+Filtros escritos como expressões, por exemplo:
+
+    adc_bits >= 24 and max_fs_hz >= 500 and raw == 'available' and has_sync
+    (sensor_dry or sensor_semi) and (bluetooth or wifi)
+    technology == 'eeg' and 8 <= channels_max < 64 and not medical_cert
+
+A expressão é lida com o módulo ast (sem eval) e respondida por índices
+montados uma vez por catálogo:
+
+- colunas numéricas (catalog.NUMERIC_COLUMNS): índice ordenado (linhas em
+  ordem de valor); cada comparação é um intervalo achado com
+  np.searchsorted, O(log n), e as k linhas do intervalo viram bitmap em
+  O(k) sobre um bitmap zerado de n/8 bytes;
+- colunas categóricas (CATEGORICAL_COLUMNS, texto normalizado): códigos
+  ordenados, cada valor é um intervalo do índice;
+- features (keywords.FEATURE_BITS e catalog.FEATURE_COLUMNS): bitmaps
+  compactados (np.packbits), combinados com & | ~ sobre n/8 bytes.
+
+Valores ausentes nunca satisfazem uma comparação; "not" é o complemento
+sobre todos os dispositivos. Os perfis de dispositivo (PROFILES) são
+expressões nomeadas e podem vir de um arquivo JSON.
+
+Uso:
+    python device_query.py "adc_bits >= 24 and raw == 'available'"
+    python device_query.py --profile clinical [--profiles JSON]
+"""
+
+import argparse
+import ast
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from catalog import (CACHE_DIR, CSV_PATH, FEATURE_COLUMNS, NUMERIC_COLUMNS, csv_hash, load_catalog,
+                     read_cache, short_model_names)
+from keywords import FEATURE_BITS, has_any
+
+INDEX_VERSION = 1
+
+# Perfis de dispositivo (nome -> expressão)
+PROFILES = {
+    # 24-bit + >=500 Hz + Raw Data + Sincronização
+    'clinical': "adc_bits >= 24 and max_fs_hz >= 500 and raw == 'available' and has_sync",
+    # Dry/Semi-Dry + Wireless + (IMU ou HR ou formato vestível)
+    'industrial': ("(sensor_dry or sensor_semi) and (bluetooth or wifi) and "
+                   "(aux_imu or aux_hr or type_headset or type_headband or type_earphone)"),
+}
+
+# Colunas categóricas: nome na consulta -> coluna do CSV
+CATEGORICAL_COLUMNS = {
+    'technology': 'Technology',
+    'type': 'Type',
+    'origin': 'Origin',
+    'manufacturer': 'Manufacturer',
+    'sensor': 'Sensor Type',
+}
+
+# Acesso a dados brutos como categoria única (mesma prioridade do analyze_clinical)
+RAW_ACCESS_LABELS = [
+    ('available', 'raw_available'),
+    ('partial', 'raw_partial'),
+    ('requires license', 'raw_license'),
+]
+
+OPERATORS = {
+    ast.Eq: '==', ast.NotEq: '!=', ast.Lt: '<', ast.LtE: '<=', ast.Gt: '>', ast.GtE: '>=',
+    ast.In: 'in', ast.NotIn: 'not in'
+}
+# a op b  <=>  b MIRRORED[op] a
+MIRRORED = {'==': '==', '!=': '!=', '<': '>', '<=': '>=', '>': '<', '>=': '<='}
+
+
+# ============================================================================
+# ÍNDICES
+# ============================================================================
+
+def _normalize(series):
+    """Texto em minúsculas, primeira linha, sem espaços sobrando ('' quando ausente)"""
+    text = series.fillna('').astype(str).str.split('\n').str[0]
+    return text.str.strip().str.lower()
+
+
+def raw_access(catalog):
+    """Categoria do acesso a dados brutos: available, partial, requires license, not specified, other"""
+    features = catalog['features'].to_numpy()
+    access = catalog['Raw data access'].fillna('').astype(str).str.strip()
+    return pd.Series(np.select(
+        [has_any(features, feature) for _, feature in RAW_ACCESS_LABELS]
+        + [access.isin(['', '---']).to_numpy()],
+        [label for label, _ in RAW_ACCESS_LABELS] + ['not specified'],
+        default='other'
+    ), index=catalog.index)
+
+
+def _sorted_index(values):
+    """Linhas não ausentes em ordem de valor e os valores ordenados"""
+    present = np.flatnonzero(~np.isnan(values))
+    order = present[np.argsort(values[present], kind='stable')]
+    return {'order': order.astype(np.int64), 'values': values[order]}
+
+
+def _categorical_index(text):
+    """Linhas agrupadas por valor: valor -> (início, fim) em 'order'"""
+    codes, uniques = pd.factorize(text, sort=True)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    return {
+        'order': order.astype(np.int64),
+        'values': {value: (int(bounds[i]), int(bounds[i + 1])) for i, value in enumerate(uniques)}
+    }
+
+
+def build_index(catalog):
+    """
+    Índices de consulta de um catálogo tipado.
+
+    Returns:
+        {'n', 'numeric', 'categorical', 'bitmaps'}
+    """
+    n = len(catalog)
+    features = catalog['features'].to_numpy()
+    bitmaps = {name: np.packbits(has_any(features, name)) for name in FEATURE_BITS}
+    bitmaps.update({column: np.packbits(catalog[column].to_numpy(dtype=bool)) for column in FEATURE_COLUMNS})
+
+    categorical = {name: _categorical_index(_normalize(catalog[column]))
+                   for name, column in CATEGORICAL_COLUMNS.items()}
+    categorical['raw'] = _categorical_index(raw_access(catalog))
+
+    return {
+        'n': n,
+        'numeric': {column: _sorted_index(catalog[column].to_numpy(dtype=float)) for column in NUMERIC_COLUMNS},
+        'categorical': categorical,
+        'bitmaps': bitmaps
+    }
+
+
+def index_path_for(csv_path, cache_dir=CACHE_DIR):
+    """Caminho do índice correspondente ao conteúdo atual do CSV"""
+    return os.path.join(cache_dir, f"query_index_{csv_hash(csv_path)[:16]}_v{INDEX_VERSION}_pd{pd.__version__}.pkl")
+
+
+def load_index(csv_path=CSV_PATH, cache_dir=CACHE_DIR, use_cache=True):
+    """Índice do catálogo, reaproveitado do cache enquanto o CSV não muda"""
+    index_path = index_path_for(csv_path, cache_dir)
+    if use_cache:
+        index = read_cache(index_path)
+        if index is not None:
+            return index
+
+    index = build_index(load_catalog(csv_path, cache_dir, use_cache))
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        pd.to_pickle(index, tmp_path)
+        os.replace(tmp_path, index_path)
+    return index
+
+
+# ============================================================================
+# AVALIAÇÃO
+# ============================================================================
+
+def _rows_bitmap(index, rows):
+    """Bitmap compactado (ordem de np.packbits) com os bits de `rows` ligados"""
+    bitmap = np.zeros((index['n'] + 7) // 8, dtype=np.uint8)
+    np.bitwise_or.at(bitmap, rows >> 3, (0x80 >> (rows & 7)).astype(np.uint8))
+    return bitmap
+
+
+def _all_bitmap(index):
+    bitmap = np.full((index['n'] + 7) // 8, 0xFF, dtype=np.uint8)
+    if index['n'] % 8:
+        # Bits de preenchimento do último byte ficam desligados, como no np.packbits
+        bitmap[-1] = (0xFF << (8 - index['n'] % 8)) & 0xFF
+    return bitmap
+
+
+def _numeric(index, column, op, value):
+    """Bitmap de `column op value` pelo índice ordenado"""
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        raise ValueError(f"'{column}' é numérica: compare com um número, não {value!r}")
+    entry = index['numeric'][column]
+    values, order = entry['values'], entry['order']
+    left = np.searchsorted(values, value, side='left')
+    right = np.searchsorted(values, value, side='right')
+    ranges = {
+        '==': [(left, right)],
+        '!=': [(0, left), (right, len(values))],
+        '<': [(0, left)],
+        '<=': [(0, right)],
+        '>': [(right, len(values))],
+        '>=': [(left, len(values))]
+    }
+    if op not in ranges:
+        raise ValueError(f"Operador {op!r} não se aplica à coluna numérica '{column}'")
+    return _rows_bitmap(index, np.concatenate([order[lo:hi] for lo, hi in ranges[op]]))
+
+
+def _categorical(index, name, op, value):
+    """Bitmap de `name op value` (==, !=, in, not in) pelo índice categórico"""
+    entry = index['categorical'][name]
+    if op in ('==', '!='):
+        wanted = [value]
+    elif op in ('in', 'not in'):
+        wanted = list(value) if isinstance(value, (list, tuple)) else [value]
+    else:
+        raise ValueError(f"Operador {op!r} não se aplica à coluna categórica '{name}'")
+    if not all(isinstance(v, str) for v in wanted):
+        raise ValueError(f"'{name}' é categórica: compare com texto")
+
+    slices = [entry['values'][v.strip().lower()] for v in wanted if v.strip().lower() in entry['values']]
+    rows = np.concatenate([entry['order'][lo:hi] for lo, hi in slices]) if slices else np.empty(0, np.int64)
+    bitmap = _rows_bitmap(index, rows)
+    return ~bitmap & _all_bitmap(index) if op in ('!=', 'not in') else bitmap
+
+
+def _constant(node):
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, (ast.Tuple, ast.List, ast.Set)):
+        return [_constant(item) for item in node.elts]
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        value = _constant(node.operand)
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise ValueError(f"Sinal negativo só se aplica a números: {ast.unparse(node)}")
+        return -value
+    raise ValueError(f"Valor não suportado: {ast.unparse(node)}")
+
+
+def _comparison(index, left, op, right):
+    """Uma comparação coluna x constante (em qualquer lado)"""
+    if isinstance(right, ast.Name) and not isinstance(left, ast.Name):
+        if op not in MIRRORED:
+            raise ValueError(f"'{op}' exige a coluna à esquerda")
+        left, op, right = right, MIRRORED[op], left
+    if not isinstance(left, ast.Name):
+        raise ValueError(f"Comparação sem coluna: {ast.unparse(left)} {op} {ast.unparse(right)}")
+
+    name, value = left.id, _constant(right)
+    if name in index['numeric']:
+        return _numeric(index, name, op, value)
+    if name in index['categorical']:
+        return _categorical(index, name, op, value)
+    if name in index['bitmaps'] and op in ('==', '!=') and isinstance(value, bool):
+        bitmap = index['bitmaps'][name]
+        return bitmap if (op == '==') == value else ~bitmap & _all_bitmap(index)
+    raise ValueError(f"Coluna desconhecida ou comparação inválida: {name} {op} {value!r}")
+
+
+def _evaluate(index, node):
+    if isinstance(node, ast.Expression):
+        return _evaluate(index, node.body)
+    if isinstance(node, ast.BoolOp):
+        bitmaps = [_evaluate(index, value) for value in node.values]
+        combine = np.bitwise_and if isinstance(node.op, ast.And) else np.bitwise_or
+        return combine.reduce(bitmaps)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        return ~_evaluate(index, node.operand) & _all_bitmap(index)
+    if isinstance(node, ast.Compare):
+        # Comparações encadeadas (8 <= canais < 64) viram um "and"
+        operands = [node.left] + node.comparators
+        bitmaps = [_comparison(index, operands[i], OPERATORS[type(op)], operands[i + 1])
+                   for i, op in enumerate(node.ops)]
+        return np.bitwise_and.reduce(bitmaps)
+    if isinstance(node, ast.Name):
+        if node.id not in index['bitmaps']:
+            raise ValueError(f"Feature desconhecida: {node.id}")
+        return index['bitmaps'][node.id]
+    raise ValueError(f"Expressão não suportada: {ast.unparse(node)}")
+
+
+def compile_query(expression):
+    """Árvore da expressão (erros de sintaxe aparecem aqui, antes de consultar)"""
+    try:
+        return ast.parse(expression.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Consulta inválida: {expression!r} ({e.msg})") from None
+
+
+def query(index, expression):
+    """
+    Linhas (posições no catálogo, em ordem crescente) que satisfazem a expressão.
+
+    Args:
+        index: Índice do catálogo (build_index / load_index)
+        expression: Texto da consulta ou árvore de compile_query
+    """
+    tree = compile_query(expression) if isinstance(expression, str) else expression
+    bits = np.unpackbits(_evaluate(index, tree), count=index['n'])
+    return np.flatnonzero(bits)
+
+
+def load_profiles(path=None):
+    """Perfis padrão, mais os de um arquivo JSON ({nome: expressão}) quando indicado"""
+    if path is None:
+        return dict(PROFILES)
+    with open(path, 'r', encoding='utf-8') as f:
+        return {**PROFILES, **json.load(f)}
+
+
+def profile_rows(index, name, profiles=None):
+    """Linhas de um perfil nomeado"""
+    profiles = PROFILES if profiles is None else profiles
+    if name not in profiles:
+        raise ValueError(f"Perfil desconhecido: {name} (disponíveis: {', '.join(profiles)})")
+    return query(index, profiles[name])
+
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def main(expression=None, profile=None, csv_path=CSV_PATH, profiles_path=None, limit=20, list_profiles=False):
+    profiles = load_profiles(profiles_path)
+    if list_profiles:
+        for name, text in profiles.items():
+            print(f"{name:<14} {text}")
+        return
+    if profile:
+        if profile not in profiles:
+            raise SystemExit(f"Perfil desconhecido: {profile} (disponíveis: {', '.join(profiles)})")
+        expression = profiles[profile]
+    if not expression:
+        raise SystemExit("Informe uma expressão ou --profile")
+
+    index = load_index(csv_path)
+    try:
+        tree = compile_query(expression)
+        start = time.perf_counter()
+        rows = query(index, tree)
+        elapsed = time.perf_counter() - start
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    print(f"Consulta: {expression}")
+    print(f"{len(rows):,} de {index['n']:,} dispositivos ({elapsed * 1e6:,.0f} µs)\n")
+    if len(rows) and limit:
+        catalog = load_catalog(csv_path).iloc[rows[:limit]]
+        for model, fs, bits, price in zip(short_model_names(catalog, 30), catalog['max_fs_hz'],
+                                          catalog['adc_bits'], catalog['Price (USD)'].fillna('---')):
+            fs = f"{int(fs)}Hz" if fs == fs else '-'
+            bits = f"{int(bits)}-bit" if bits == bits else '-'
+            print(f"  {model:30} | {fs:8} | {bits:6} | {price}")
+        if len(rows) > limit:
+            print(f"  ... e mais {len(rows) - limit:,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consultas declarativas sobre o catálogo")
+    parser.add_argument('expression', nargs='?', default=None, help="expressão de filtro")
+    parser.add_argument('--profile', default=None, help="perfil nomeado (ver --list-profiles)")
+    parser.add_argument('--profiles', default=None, help="JSON {nome: expressão} com perfis extras")
+    parser.add_argument('--list-profiles', action='store_true', help="lista os perfis")
+    parser.add_argument('--csv', default=CSV_PATH, help="CSV da Table1")
+    parser.add_argument('--limit', type=int, default=20, help="dispositivos listados")
+    args = parser.parse_args()
+    main(args.expression, args.profile, args.csv, args.profiles, args.limit, args.list_profiles)
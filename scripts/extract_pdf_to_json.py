@@ -1,16 +1,27 @@
 """
-Script para extrair texto de arquivos PDF e salvar em formato JSON.
+Script para extrair texto de arquivos PDF e salvar por página.
+
+Cada PDF vira <nome>.jsonl (cabeçalho e offsets de cada página) e <nome>.txt
+(texto completo), gravados página a página (ver page_store.py).
 
 Dependências:
     pip install PyMuPDF
 
 Uso:
     python extract_pdf_to_json.py
+
+Os PDFs pendentes são extraídos em paralelo (faixas de páginas em um pool
+de processos). O resumo _resumo_extracao.json funciona como manifesto:
+guarda tamanho, mtime e SHA-256 de cada PDF, e os inalterados são pulados.
 """
 
 import os
 import json
 import sys
+import hashlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
 from datetime import datetime
 
@@ -21,10 +32,62 @@ except ImportError:
     print("   Execute: pip install PyMuPDF")
     sys.exit(1)
 
+from page_store import PAGE_SEPARATOR, store_paths, write_page_store
+
+
+# Páginas por tarefa do pool (PDFs grandes são divididos em faixas de páginas)
+PAGES_PER_TASK = 16
+# Abaixo deste total de páginas o pool de processos não compensa
+POOL_MIN_PAGES = 64
+
+SUMMARY_NAME = "_resumo_extracao.json"
+
+
+# ============================================================================
+# EXTRAÇÃO
+# ============================================================================
+
+def extract_pages(pdf_path: str, start: int, stop: int) -> list:
+    """
+    Extrai o texto das páginas [start, stop) de um PDF.
+    
+    Executado em um processo do pool: cada tarefa abre o documento e lê
+    apenas a sua faixa de páginas.
+    """
+    pages = []
+    with fitz.open(pdf_path) as doc:
+        for page_num in range(start, stop):
+            text = doc[page_num].get_text("text")
+            pages.append({
+                "numero": page_num + 1,
+                "texto": text.strip(),
+                "caracteres": len(text)
+            })
+    return pages
+
+
+def _pdf_info(pdf_path: str) -> dict:
+    """Cabeçalho do documento (sem as páginas)"""
+    with fitz.open(pdf_path) as doc:
+        return {
+            "arquivo": os.path.basename(pdf_path),
+            "caminho_original": str(pdf_path),
+            "data_extracao": datetime.now().isoformat(),
+            "total_paginas": len(doc),
+            "metadados": doc.metadata
+        }
+
+
+def _page_ranges(total_pages: int) -> list:
+    return [
+        (start, min(start + PAGES_PER_TASK, total_pages))
+        for start in range(0, total_pages, PAGES_PER_TASK)
+    ]
+
 
 def extract_text_from_pdf(pdf_path: str) -> dict:
     """
-    Extrai texto de um arquivo PDF.
+    Extrai texto de um arquivo PDF (tudo em memória, no formato JSON antigo).
     
     Args:
         pdf_path: Caminho para o arquivo PDF
@@ -32,52 +95,173 @@ def extract_text_from_pdf(pdf_path: str) -> dict:
     Returns:
         Dicionário com metadados e texto extraído por página
     """
-    doc = fitz.open(pdf_path)
-    
-    result = {
-        "arquivo": os.path.basename(pdf_path),
-        "caminho_original": str(pdf_path),
-        "data_extracao": datetime.now().isoformat(),
-        "total_paginas": len(doc),
-        "metadados": doc.metadata,
-        "paginas": []
-    }
-    
-    for page_num, page in enumerate(doc, start=1):
-        text = page.get_text("text")
-        result["paginas"].append({
-            "numero": page_num,
-            "texto": text.strip(),
-            "caracteres": len(text)
-        })
+    result = _pdf_info(pdf_path)
+    result["paginas"] = extract_pages(pdf_path, 0, result["total_paginas"])
     
     # Texto completo concatenado
-    result["texto_completo"] = "\n\n".join(
+    result["texto_completo"] = PAGE_SEPARATOR.join(
         [p["texto"] for p in result["paginas"]]
     )
     result["total_caracteres"] = len(result["texto_completo"])
-    
-    doc.close()
     return result
 
 
-def process_all_pdfs(input_dir: str, output_dir: str) -> list:
+def _extract_ranges(tasks, workers: int):
+    """
+    Resultados das faixas (pdf, páginas ou exceção) na ordem das tarefas.
+    
+    No pool, no máximo 2 x workers faixas ficam em voo: a memória não cresce
+    com o número de páginas.
+    """
+    if workers <= 1:
+        for pdf_path, start, stop in tasks:
+            try:
+                yield pdf_path, extract_pages(pdf_path, start, stop)
+            except Exception as e:
+                yield pdf_path, e
+        return
+    
+    tasks = iter(tasks)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque(
+            (task[0], pool.submit(extract_pages, *task))
+            for task in islice(tasks, 2 * workers)
+        )
+        while pending:
+            pdf_path, future = pending.popleft()
+            try:
+                result = future.result()
+            except Exception as e:
+                result = e
+            task = next(tasks, None)
+            if task is not None:
+                pending.append((task[0], pool.submit(extract_pages, *task)))
+            yield pdf_path, result
+
+
+def _pages(ranges):
+    for _, result in ranges:
+        if isinstance(result, Exception):
+            raise result
+        yield from result
+
+
+def extract_documents(pdf_paths: list, workers: int = None):
+    """
+    Extrai vários PDFs dividindo as páginas de todos eles entre processos.
+    
+    Args:
+        pdf_paths: Caminhos dos PDFs
+        workers: Número de processos (None = todos os núcleos; 1 = sem pool)
+        
+    Yields:
+        (caminho, cabeçalho, páginas) em ordem; `páginas` é um iterador que
+        deve ser consumido antes do próximo item. Se o PDF não abrir, o
+        cabeçalho é a exceção e `páginas` é None.
+    """
+    headers = {}
+    for pdf_path in pdf_paths:
+        try:
+            headers[pdf_path] = _pdf_info(pdf_path)
+        except Exception as e:
+            headers[pdf_path] = e
+    
+    ranges = {
+        pdf_path: _page_ranges(header["total_paginas"])
+        for pdf_path, header in headers.items() if isinstance(header, dict)
+    }
+    total_pages = sum(header["total_paginas"] for header in headers.values() if isinstance(header, dict))
+    if workers is None:
+        workers = os.cpu_count() if total_pages >= POOL_MIN_PAGES else 1
+    
+    # Todas as faixas de todos os PDFs em uma única fila
+    tasks = [(pdf_path, start, stop) for pdf_path, pdf_ranges in ranges.items() for start, stop in pdf_ranges]
+    stream = _extract_ranges(tasks, workers)
+    
+    for pdf_path, header in headers.items():
+        if not isinstance(header, dict):
+            yield pdf_path, header, None
+            continue
+        pdf_ranges = islice(stream, len(ranges[pdf_path]))
+        yield pdf_path, header, _pages(pdf_ranges)
+        # Descarta as faixas que sobraram se a gravação parou no meio (erro)
+        for _ in pdf_ranges:
+            pass
+
+
+# ============================================================================
+# MANIFESTO (processamento incremental)
+# ============================================================================
+
+def file_sha256(path: str) -> str:
+    """Hash SHA-256 do conteúdo do arquivo"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(output_dir: str) -> dict:
+    """Entradas do resumo anterior, indexadas pelo nome do PDF"""
+    summary_path = Path(output_dir) / SUMMARY_NAME
+    if not summary_path.exists():
+        return {}
+    try:
+        with open(summary_path, "r", encoding="utf-8") as f:
+            summary = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {entry["pdf"]: entry for entry in summary.get("arquivos", [])}
+
+
+def is_unchanged(pdf_file: Path, entry: dict, output_path: Path) -> tuple:
+    """
+    Verifica se o PDF é o mesmo registrado no manifesto.
+    
+    Tamanho e mtime iguais bastam; se só o mtime mudou, o hash decide.
+    
+    Returns:
+        (inalterado, sha256 calculado ou None)
+    """
+    if not entry or not all(
+        (output_path / entry[key]).exists() for key in ("json", "texto") if key in entry
+    ):
+        return False, None
+    
+    stat = pdf_file.stat()
+    if entry.get("tamanho_bytes") != stat.st_size:
+        return False, None
+    if entry.get("mtime") == stat.st_mtime:
+        return True, None
+    
+    sha256 = file_sha256(str(pdf_file))
+    return sha256 == entry.get("sha256"), sha256
+
+
+def process_all_pdfs(input_dir: str, output_dir: str, workers: int = None, force: bool = False) -> list:
     """
     Processa todos os PDFs em um diretório.
     
+    PDFs já registrados no manifesto (_resumo_extracao.json) com o mesmo
+    tamanho, mtime ou hash são pulados; os demais são extraídos em paralelo.
+    
     Args:
         input_dir: Diretório com os PDFs
-        output_dir: Diretório para salvar os JSONs
+        output_dir: Diretório para salvar os documentos (.jsonl + .txt)
+        workers: Número de processos (None = automático)
+        force: Reextrai todos os PDFs, ignorando o manifesto
         
     Returns:
-        Lista de arquivos processados
+        Entradas do manifesto, com "status" ("extraido", "inalterado" ou
+        "ausente" quando só o JSON de uma execução anterior existe)
     """
     input_path = Path(input_dir)
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
     
     processed = []
-    pdf_files = list(input_path.glob("*.pdf"))
+    pdf_files = sorted(input_path.glob("*.pdf"))
     
     if not pdf_files:
         print(f"⚠️  Nenhum arquivo PDF encontrado em: {input_dir}")
@@ -85,42 +269,70 @@ def process_all_pdfs(input_dir: str, output_dir: str) -> list:
     
     print(f"📂 Encontrados {len(pdf_files)} arquivo(s) PDF\n")
     
+    manifest = {} if force else load_manifest(output_dir)
+    pending = {}
     for pdf_file in pdf_files:
+        entry = manifest.get(pdf_file.name)
+        unchanged, sha256 = is_unchanged(pdf_file, entry, output_path)
+        if unchanged:
+            print(f"⏭️  Inalterado: {pdf_file.name}")
+            stat = pdf_file.stat()
+            processed.append(dict(entry, mtime=stat.st_mtime, status="inalterado"))
+        else:
+            pending[pdf_file] = sha256
+    
+    # JSONs de PDFs que saíram do diretório continuam registrados
+    present = {pdf_file.name for pdf_file in pdf_files}
+    for name, entry in manifest.items():
+        if name not in present and (output_path / entry["json"]).exists():
+            processed.append(dict(entry, status="ausente"))
+    
+    if pending:
+        print(f"\n📄 Extraindo {len(pending)} arquivo(s)...\n")
+    documents = extract_documents([str(pdf_file) for pdf_file in pending], workers=workers)
+    
+    for (pdf_path, header, pages), (pdf_file, sha256) in zip(documents, pending.items()):
         print(f"📄 Processando: {pdf_file.name}")
         
+        # Mesmo nome do PDF: <nome>.jsonl (índice) e <nome>.txt (texto)
+        index_path, text_path = store_paths(output_path / pdf_file.stem)
         try:
-            data = extract_text_from_pdf(str(pdf_file))
-            
-            # Nome do arquivo JSON (mesmo nome, extensão diferente)
-            json_filename = pdf_file.stem + ".json"
-            json_path = output_path / json_filename
-            
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            print(f"   ✅ Salvo: {json_filename}")
-            print(f"   📊 {data['total_paginas']} páginas, {data['total_caracteres']:,} caracteres\n")
-            
-            processed.append({
-                "pdf": pdf_file.name,
-                "json": json_filename,
-                "paginas": data["total_paginas"],
-                "caracteres": data["total_caracteres"]
-            })
-            
+            if isinstance(header, Exception):
+                raise header
+            # Páginas gravadas conforme chegam do pool
+            totals = write_page_store(output_path / pdf_file.stem, header, pages)
         except Exception as e:
             print(f"   ❌ Erro: {e}\n")
+            continue
+        
+        print(f"   ✅ Salvo: {index_path.name} + {text_path.name}")
+        print(f"   📊 {totals['total_paginas']} páginas, {totals['total_caracteres']:,} caracteres\n")
+        
+        stat = pdf_file.stat()
+        processed.append({
+            "pdf": pdf_file.name,
+            "json": index_path.name,
+            "texto": text_path.name,
+            "paginas": totals["total_paginas"],
+            "caracteres": totals["total_caracteres"],
+            "tamanho_bytes": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha256": sha256 or file_sha256(str(pdf_file)),
+            "status": "extraido"
+        })
     
+    processed.sort(key=lambda entry: entry["pdf"])
     return processed
 
 
-def main():
+def main(input_dir=None, output_dir=None, workers=None, force=False):
     # Diretórios padrão (relativos ao script)
     script_dir = Path(__file__).parent
     project_dir = script_dir.parent
     
-    input_dir = project_dir  # PDFs estão na raiz do projeto
-    output_dir = project_dir / "textos_json"
+    # PDFs estão na raiz do projeto
+    input_dir = Path(input_dir) if input_dir else project_dir
+    output_dir = Path(output_dir) if output_dir else project_dir / "textos_json"
     
     print("=" * 60)
     print("🔄 EXTRATOR DE PDF PARA JSON")
@@ -129,19 +341,25 @@ def main():
     print(f"📤 Saída:   {output_dir}\n")
     print("-" * 60 + "\n")
     
-    processed = process_all_pdfs(str(input_dir), str(output_dir))
+    processed = process_all_pdfs(str(input_dir), str(output_dir), workers=workers, force=force)
+    extracted = [entry for entry in processed if entry["status"] == "extraido"]
+    unchanged = [entry for entry in processed if entry["status"] == "inalterado"]
     
     print("-" * 60)
     print(f"\n✨ Processamento concluído!")
-    print(f"   Total: {len(processed)} arquivo(s) convertido(s)")
+    print(f"   Total: {len(extracted)} arquivo(s) convertido(s), "
+          f"{len(unchanged)} inalterado(s)")
     
-    # Salvar resumo
+    # Salvar resumo (manifesto da próxima execução)
     if processed:
-        summary_path = output_dir / "_resumo_extracao.json"
+        summary_path = output_dir / SUMMARY_NAME
         summary = {
             "data_processamento": datetime.now().isoformat(),
             "total_arquivos": len(processed),
-            "arquivos": processed
+            "arquivos": [
+                {key: value for key, value in entry.items() if key != "status"}
+                for entry in processed
+            ]
         }
         with open(summary_path, "w", encoding="utf-8") as f:
             json.dump(summary, f, ensure_ascii=False, indent=2)
@@ -2,133 +2,259 @@
 """
 Gerador de Figura Timeline - Dispositivos EEG/fNIRS
 Para resposta ao revisor R3C5
+
+As figuras são renderizadas em processos separados (backend Agg). O
+manifesto _figuras.json guarda, para cada figura, o hash dos dados e dos
+parâmetros do gráfico; figuras com o mesmo hash e arquivos presentes não
+são renderizadas de novo. Rascunhos (--draft, 72 dpi) vão para o
+subdiretório rascunho/, com manifesto próprio, e nunca substituem as
+figuras finais.
 """
 
-import pandas as pd
+import hashlib
+import inspect
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import matplotlib
+matplotlib.use('Agg')  # só gera arquivos; necessário nos processos do pool
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import numpy as np
-import os
-import re
+import pandas as pd
+
+from catalog import CSV_PATH, PROJECT_DIR, load_catalog, short_model_names
+from trends import compute_trends, parse_periods
 
 # Configuração de caminhos
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
-CSV_PATH = os.path.join(PROJECT_DIR, "Table1_v12 - Cópia de Página1.csv")
 OUTPUT_DIR = os.path.join(PROJECT_DIR, "Alterações", "Figuras")
+MANIFEST_NAME = "_figuras.json"
 
-# Criar diretório de saída se não existir
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+# Resolução final e do modo rascunho (iteração rápida)
+FINAL_DPI = 300
+DRAFT_DPI = 72
+# Subdiretório (de output_dir) dos rascunhos
+DRAFT_SUBDIR = "rascunho"
+FORMATS = ('png', 'pdf', 'svg')
 
 
-def extract_number(value):
-    """Extrai número de uma string"""
-    if pd.isna(value):
-        return None
-    nums = re.findall(r'\d+', str(value))
-    return int(nums[0]) if nums else None
+def load_and_prepare_data(csv_path=CSV_PATH):
+    """Carrega e prepara dados para visualização"""
+    return prepare_data(load_catalog(csv_path))
 
 
-def load_and_prepare_data():
-    """Carrega e prepara dados para visualização"""
-    df = pd.read_csv(CSV_PATH, encoding='utf-8')
-    
-    data = []
-    for _, row in df.iterrows():
-        year = extract_number(row.get('Year of first appearance'))
-        if year is None:
-            continue
-        
-        model = str(row.get('Model', 'Unknown')).split('\n')[0][:30]
-        tech = str(row.get('Technology', 'EEG')).split('+')[0].strip()
-        studies = extract_number(row.get('Studies Found')) or 0
+def prepare_data(catalog):
+    """Dados da visualização a partir do catálogo tipado (dispositivos com ano)"""
+    df = catalog[catalog['year'].notna()]
+    
+    return pd.DataFrame({
+        'model': short_model_names(df, width=30),
+        'year': df['year'].astype(int),
+        'technology': df['Technology'].astype(str).str.split('+').str[0].str.strip(),
+        'studies': df['studies'].fillna(0).astype(int)
+    }).reset_index(drop=True)
+
+
+# Cores por tecnologia (substring da tecnologia principal, nesta ordem)
+TECH_COLORS = {
+    'EEG': '#3498db',
+    'fNIRS': '#e74c3c',
+    'VR ': '#9b59b6',
+    'AR ': '#1abc9c'
+}
+OTHER_COLOR = '#95a5a6'
+
+# Dispositivos com mais estudos que isto recebem rótulo
+LABEL_MIN_STUDIES = 50
+# Só os N dispositivos mais citados disputam posição de rótulo
+MAX_LABEL_CANDIDATES = 500
+LABEL_FONTSIZE = 7
+
+# Acima deste número de dispositivos o modo 'auto' usa densidade (hexbin)
+DENSITY_THRESHOLD = 5000
+# No modo densidade só os mais citados são rotulados
+DENSITY_LABELS = 15
+
+
+def timeline_positions(df):
+    """
+    Posição vertical de cada dispositivo: os do mesmo ano são distribuídos
+    entre 0.1 e 0.9 (np.linspace por ano), sem laço por grupo.
+    
+    Returns:
+        Array alinhado com df (ordem original das linhas)
+    """
+    rank = df.groupby('year').cumcount().to_numpy()
+    count = df.groupby('year')['year'].transform('size').to_numpy()
+    # linspace(0.1, 0.9, 1) == [0.1]
+    step = np.where(count > 1, 0.8 / np.maximum(count - 1, 1), 0.0)
+    return 0.1 + rank * step
+
+
+def technology_colors(technology):
+    """Cor de cada dispositivo (primeira chave de TECH_COLORS contida na tecnologia)"""
+    technology = technology.astype(str)
+    conditions = [technology.str.contains(key, regex=False).to_numpy() for key in TECH_COLORS]
+    return np.select(conditions, list(TECH_COLORS.values()), default=OTHER_COLOR)
+
+
+def _label_box(x, y, dx, dy, width, height):
+    return (x + dx, y + dy, x + dx + width, y + dy + height)
+
+
+def place_labels(points, texts, fontsize=LABEL_FONTSIZE, offset=5, cell=None, bounds=None):
+    """
+    Escolhe posições de rótulo sem sobreposição (coordenadas de tela, pontos).
+    
+    Os rótulos são tentados na ordem recebida (prioridade); cada um testa
+    quatro posições em volta do ponto e fica na primeira que não colide com
+    um rótulo já colocado. As caixas ficam num índice espacial de grade
+    (dict célula -> caixas), então cada teste olha só as células vizinhas.
+    Rótulos sem posição livre são descartados.
+    
+    Args:
+        points: Array (n, 2) com as posições dos pontos em pontos tipográficos
+        texts: Textos dos rótulos
+        fontsize: Tamanho da fonte (estimativa da caixa do texto)
+        offset: Distância do rótulo ao ponto
+        cell: Lado da célula da grade (padrão: altura de uma linha x 4)
+        bounds: (x0, y0, x1, y1) que os rótulos não podem ultrapassar
         
-        data.append({
-            'model': model,
-            'year': year,
-            'technology': tech,
-            'studies': studies
-        })
-    
-    return pd.DataFrame(data)
+    Returns:
+        Lista de (índice, (dx, dy)) dos rótulos colocados
+    """
+    height = fontsize * 1.2
+    cell = cell or height * 4
+    grid = {}
+    placed = []
+    
+    for i, ((x, y), text) in enumerate(zip(points, texts)):
+        width = len(text) * fontsize * 0.6
+        candidates = [(offset, offset), (offset, -offset - height),
+                      (-offset - width, offset), (-offset - width, -offset - height)]
+        for dx, dy in candidates:
+            box = _label_box(x, y, dx, dy, width, height)
+            if bounds and (box[0] < bounds[0] or box[1] < bounds[1] or box[2] > bounds[2] or box[3] > bounds[3]):
+                continue
+            cells = [(cx, cy)
+                     for cx in range(int(box[0] // cell), int(box[2] // cell) + 1)
+                     for cy in range(int(box[1] // cell), int(box[3] // cell) + 1)]
+            collides = any(
+                box[0] < other[2] and other[0] < box[2] and box[1] < other[3] and other[1] < box[3]
+                for c in cells for other in grid.get(c, ())
+            )
+            if not collides:
+                for c in cells:
+                    grid.setdefault(c, []).append(box)
+                placed.append((i, (dx, dy)))
+                break
+    return placed
 
 
-def create_timeline_scatter(df):
-    """Cria gráfico de dispersão temporal"""
-    fig, ax = plt.subplots(figsize=(14, 8))
-    
-    # Cores por tecnologia
-    tech_colors = {
-        'EEG': '#3498db',
-        'fNIRS': '#e74c3c',
-        'VR ': '#9b59b6',
-        'AR ': '#1abc9c'
-    }
+def _annotate_devices(ax, fig, df, x, y, limit=MAX_LABEL_CANDIDATES):
+    """Rótulos dos dispositivos mais citados, sem sobreposição"""
+    candidates = np.flatnonzero(df['studies'].to_numpy() > LABEL_MIN_STUDIES)
+    if len(candidates) == 0:
+        return 0
+    # Mais citados primeiro: são os que ficam quando há colisão
+    order = np.argsort(-df['studies'].to_numpy()[candidates], kind='stable')
+    candidates = candidates[order[:limit]]
+    
+    # Coordenadas de dados -> pontos tipográficos (independe do dpi)
+    to_points = 72 / fig.dpi
+    display = ax.transData.transform(np.column_stack([x[candidates], y[candidates]])) * to_points
+    x0, y0, x1, y1 = np.asarray(ax.bbox.extents) * to_points
+    
+    models = df['model'].to_numpy()
+    texts = [str(models[i]) for i in candidates]
+    placed = place_labels(display, texts, bounds=(x0, y0, x1, y1))
+    for k, (dx, dy) in placed:
+        i = candidates[k]
+        ax.annotate(texts[k], (x[i], y[i]), xytext=(dx, dy), textcoords='offset points',
+                    fontsize=LABEL_FONTSIZE, alpha=0.8)
+    return len(placed)
+
+
+def build_timeline_scatter(df, mode='auto'):
+    """
+    Cria gráfico de dispersão temporal
+    
+    Args:
+        df: Saída de load_and_prepare_data
+        mode: 'scatter' (um ponto por dispositivo), 'density' (hexbin ano x
+              estudos, para catálogos grandes) ou 'auto' (density acima de
+              DENSITY_THRESHOLD dispositivos)
+    """
+    if mode == 'auto':
+        mode = 'density' if len(df) > DENSITY_THRESHOLD else 'scatter'
+    if mode not in ('scatter', 'density'):
+        raise ValueError(f"Modo desconhecido: {mode!r} (use auto, scatter ou density)")
     
-    def get_color(tech):
-        for key, color in tech_colors.items():
-            if key in tech:
-                return color
-        return '#95a5a6'
+    fig, ax = plt.subplots(figsize=(14, 8))
+    ax.set_xlim(2007, 2026)
     
-    # Agrupar por ano para evitar sobreposição
-    year_groups = df.groupby('year')
+    # Mesma ordem de desenho da versão com groupby (ano, depois linha)
+    df = df.sort_values('year', kind='stable').reset_index(drop=True)
+    x = df['year'].to_numpy(dtype=float)
     
-    for year, group in year_groups:
-        n = len(group)
-        # Distribuir verticalmente os dispositivos do mesmo ano
-        y_positions = np.linspace(0.1, 0.9, n)
+    if mode == 'scatter':
+        y = timeline_positions(df)
+        ax.set_ylim(0, 1)
+        ax.set_yticks([])
+        
+        # Um único scatter com cor e tamanho por ponto
+        sizes = np.clip(df['studies'].to_numpy() * 0.5, 30, 200)
+        ax.scatter(x, y, s=sizes, c=technology_colors(df['technology']),
+                   alpha=0.7, edgecolors='white', linewidth=0.5)
+        
+        ax.set_ylabel('Device Distribution', fontsize=12, fontweight='bold')
+        ax.set_title('Timeline of Wireless Brain Monitoring Devices (2008-2025)\n'
+                     'Bubble size proportional to number of studies', 
+                     fontsize=14, fontweight='bold')
+        ax.axhline(y=0.5, color='gray', linestyle='--', alpha=0.3)
         
-        for i, (_, device) in enumerate(group.iterrows()):
-            color = get_color(device['technology'])
-            size = max(30, min(200, device['studies'] * 0.5))
-            
-            ax.scatter(device['year'], y_positions[i], 
-                      s=size, c=color, alpha=0.7, edgecolors='white', linewidth=0.5)
-            
-            # Adicionar label para dispositivos com muitos estudos
-            if device['studies'] > 50:
-                ax.annotate(device['model'], 
-                           (device['year'], y_positions[i]),
-                           xytext=(5, 5), textcoords='offset points',
-                           fontsize=7, alpha=0.8)
+        # Legenda
+        legend_elements = [
+            mpatches.Patch(color='#3498db', label='EEG'),
+            mpatches.Patch(color='#e74c3c', label='fNIRS'),
+            mpatches.Patch(color='#9b59b6', label='VR + EEG'),
+            mpatches.Patch(color='#1abc9c', label='AR + EEG'),
+        ]
+        ax.legend(handles=legend_elements, loc='upper left', title='Technology')
+    else:
+        # Densidade: o custo depende do nº de hexágonos, não de dispositivos
+        y = np.log10(1 + df['studies'].to_numpy(dtype=float))
+        # Uma coluna de hexágonos por ano (centros nos anos inteiros)
+        hexes = ax.hexbin(x, y, gridsize=(18, 12), extent=(2007.5, 2025.5, 0, max(y.max(), 1)),
+                          mincnt=1, bins='log', cmap='viridis')
+        fig.colorbar(hexes, ax=ax, label='Devices (log scale)')
+        
+        ax.set_ylabel('Number of Studies (log10(1 + n))', fontsize=12, fontweight='bold')
+        ax.set_title(f'Timeline of Wireless Brain Monitoring Devices ({len(df):,} devices)\n'
+                     'Hexagon colour proportional to number of devices', 
+                     fontsize=14, fontweight='bold')
     
     # Configurações do gráfico
     ax.set_xlabel('Year of Market Entry', fontsize=12, fontweight='bold')
-    ax.set_ylabel('Device Distribution', fontsize=12, fontweight='bold')
-    ax.set_title('Timeline of Wireless Brain Monitoring Devices (2008-2025)\n'
-                 'Bubble size proportional to number of studies', 
-                 fontsize=14, fontweight='bold')
-    
-    ax.set_xlim(2007, 2026)
-    ax.set_ylim(0, 1)
-    ax.set_yticks([])
     ax.set_xticks(range(2008, 2026, 2))
-    
-    # Grid
     ax.grid(True, axis='x', alpha=0.3)
-    ax.axhline(y=0.5, color='gray', linestyle='--', alpha=0.3)
-    
-    # Legenda
-    legend_elements = [
-        mpatches.Patch(color='#3498db', label='EEG'),
-        mpatches.Patch(color='#e74c3c', label='fNIRS'),
-        mpatches.Patch(color='#9b59b6', label='VR + EEG'),
-        mpatches.Patch(color='#1abc9c', label='AR + EEG'),
-    ]
-    ax.legend(handles=legend_elements, loc='upper left', title='Technology')
     
     plt.tight_layout()
     
-    # Salvar
-    output_path = os.path.join(OUTPUT_DIR, 'timeline_scatter.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    print(f"✅ Salvo: {output_path}")
+    # Rótulos depois do layout final (posições de tela estáveis)
+    _annotate_devices(ax, fig, df, x, y, MAX_LABEL_CANDIDATES if mode == 'scatter' else DENSITY_LABELS)
     
-    return output_path
+    return fig
+
+
+def create_timeline_scatter(df, output_dir=OUTPUT_DIR, mode='auto'):
+    """Cria e salva o gráfico de dispersão temporal (PNG)"""
+    return save_figure(build_timeline_scatter(df, mode), output_dir, 'timeline_scatter')[0]
 
 
-def create_timeline_bar(df):
+def build_timeline_bar(df):
     """Cria gráfico de barras por ano"""
     fig, ax = plt.subplots(figsize=(12, 6))
     
@@ -171,51 +297,18 @@ def create_timeline_bar(df):
     
     plt.tight_layout()
     
-    output_path = os.path.join(OUTPUT_DIR, 'timeline_bar.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    print(f"✅ Salvo: {output_path}")
-    
-    return output_path
+    return fig
 
 
-def create_trends_figure(df):
-    """Cria figura com tendências temporais"""
-    # Carregar dados originais para análise completa
-    df_full = pd.read_csv(CSV_PATH, encoding='utf-8')
-    
-    # Agrupar por período
-    periods = [(2008, 2014), (2015, 2018), (2019, 2022), (2023, 2025)]
-    period_labels = ['2008-2014', '2015-2018', '2019-2022', '2023-2025']
-    
-    data = {
-        'devices': [],
-        'avg_channels': [],
-        'pct_bluetooth': [],
-        'pct_wifi': []
-    }
-    
-    for start, end in periods:
-        mask = df['year'].between(start, end)
-        period_df = df[mask]
-        
-        data['devices'].append(len(period_df))
-        
-        # Para canais e wireless, precisamos dos dados originais
-        full_mask = pd.to_numeric(df_full['Year of first appearance'], errors='coerce').between(start, end)
-        period_full = df_full[full_mask]
-        
-        # Canais
-        channels = [extract_number(c) for c in period_full['Channels'].dropna()]
-        channels = [c for c in channels if c is not None]
-        data['avg_channels'].append(np.mean(channels) if channels else 0)
-        
-        # Wireless
-        wireless = period_full['Wireless Connectivity'].dropna()
-        bt_count = sum(1 for w in wireless if 'bluetooth' in str(w).lower() or 'ble' in str(w).lower())
-        wifi_count = sum(1 for w in wireless if 'wi-fi' in str(w).lower() or 'wifi' in str(w).lower())
-        total = len(period_full)
-        data['pct_bluetooth'].append(100 * bt_count / total if total > 0 else 0)
-        data['pct_wifi'].append(100 * wifi_count / total if total > 0 else 0)
+def create_timeline_bar(df, output_dir=OUTPUT_DIR):
+    """Cria e salva o gráfico de barras por ano (PNG)"""
+    return save_figure(build_timeline_bar(df), output_dir, 'timeline_bar')[0]
+
+
+def build_trends_figure(trends):
+    """Cria figura com tendências temporais (saída de trends.compute_trends)"""
+    period_labels = list(trends.index)
+    data = {column: trends[column].tolist() for column in trends.columns}
     
     # Criar figura com 2x2 subplots
     fig, axes = plt.subplots(2, 2, figsize=(12, 10))
@@ -260,40 +353,183 @@ def create_trends_figure(df):
         ax4.annotate(f'{v:.0f}%', (period_labels[i], v), textcoords='offset points', 
                     xytext=(0, 10), ha='center')
     
+    # Períodos anuais ou janelas móveis geram muitos rótulos
+    if len(period_labels) > 6:
+        for ax in axes.flat:
+            ax.tick_params(axis='x', labelrotation=45)
+    
     plt.suptitle('Temporal Trends in Wireless Brain Monitoring Devices (2008-2025)', 
                  fontsize=14, fontweight='bold', y=1.02)
     plt.tight_layout()
     
-    output_path = os.path.join(OUTPUT_DIR, 'temporal_trends.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    print(f"✅ Salvo: {output_path}")
-    
-    return output_path
+    return fig
+
+
+def create_trends_figure(trends, output_dir=OUTPUT_DIR):
+    """Cria e salva a figura de tendências temporais (PNG)"""
+    return save_figure(build_trends_figure(trends), output_dir, 'temporal_trends')[0]
+
+
+# ============================================================================
+# RENDERIZAÇÃO (PARALELA, COM CACHE POR HASH)
+# ============================================================================
 
+def save_figure(fig, output_dir, name, dpi=FINAL_DPI, formats=('png',), verbose=True):
+    """
+    Salva uma figura já desenhada em um ou mais formatos e a fecha.
+    
+    Returns:
+        Lista de caminhos criados (um por formato)
+    """
+    paths = []
+    for fmt in formats:
+        output_path = os.path.join(output_dir, f'{name}.{fmt}')
+        fig.savefig(output_path, dpi=dpi, bbox_inches='tight', facecolor='white')
+        paths.append(output_path)
+        if verbose:
+            print(f"✅ Salvo: {output_path}")
+    plt.close(fig)
+    return paths
 
-def main():
+
+def _update_hash(digest, value):
+    """Acrescenta ao hash um argumento de figura (DataFrame ou valor simples)"""
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr(list(value.columns)).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    else:
+        digest.update(repr(value).encode('utf-8'))
+
+
+def figure_hash(name, builder, args, dpi, formats):
+    """
+    Hash dos dados, dos parâmetros e do código que desenha a figura.
+    
+    O código é o módulo inteiro da função (inclui cores, rótulos e demais
+    auxiliares usados no desenho).
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{name}|{dpi}|{','.join(formats)}".encode('utf-8'))
+    digest.update(inspect.getsource(inspect.getmodule(builder)).encode('utf-8'))
+    for value in args:
+        _update_hash(digest, value)
+    return digest.hexdigest()
+
+
+def figure_jobs(csv_path=CSV_PATH, periods='default', scatter_mode='auto'):
+    """Figuras a gerar: {nome do arquivo: (função que desenha, argumentos)}"""
+    # Uma leitura do catálogo (hash do CSV + cache) para todas as figuras
+    catalog = load_catalog(csv_path)
+    df = prepare_data(catalog)
+    trends = compute_trends(catalog, parse_periods(periods, catalog['year']))
+    return {
+        'timeline_scatter': (build_timeline_scatter, (df, scatter_mode)),
+        'timeline_bar': (build_timeline_bar, (df,)),
+        'temporal_trends': (build_trends_figure, (trends,)),
+    }
+
+
+def _render(name, builder, args, output_dir, dpi, formats):
+    """Executado em um processo do pool: desenha uma vez e salva todos os formatos"""
+    return save_figure(builder(*args), output_dir, name, dpi, formats, verbose=False)
+
+
+def load_figure_manifest(output_dir):
+    """Entradas do manifesto de figuras {nome: {'hash', 'arquivos', ...}}"""
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('figuras', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_figure_manifest(output_dir, entries):
+    """Grava o manifesto de forma atômica"""
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'data_geracao': datetime.now().isoformat(), 'figuras': entries},
+                  f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def render_figures(jobs, output_dir=OUTPUT_DIR, dpi=FINAL_DPI, formats=('png',), workers=None, force=False):
+    """
+    Renderiza as figuras cujo hash mudou, uma por processo.
+    
+    Args:
+        jobs: Saída de figure_jobs
+        output_dir: Diretório das figuras (e do manifesto)
+        dpi: Resolução das imagens
+        formats: Formatos salvos de uma mesma renderização (png, pdf, svg)
+        workers: Número de processos (None = todos os núcleos)
+        force: Renderiza todas, ignorando o manifesto
+        
+    Returns:
+        {nome: entrada do manifesto com "status" ("gerada" ou "inalterada")}
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {} if force else load_figure_manifest(output_dir)
+    
+    results, pending = {}, {}
+    for name, (builder, args) in jobs.items():
+        digest = figure_hash(name, builder, args, dpi, formats)
+        entry = manifest.get(name)
+        if (entry and entry.get('hash') == digest
+                and all(os.path.exists(os.path.join(output_dir, f)) for f in entry['arquivos'])):
+            results[name] = dict(entry, status='inalterada')
+        else:
+            pending[name] = (builder, args, digest)
+    
+    names = list(pending)
+    calls = [(name, pending[name][0], pending[name][1], output_dir, dpi, formats) for name in names]
+    workers = min(workers or os.cpu_count() or 1, len(calls)) if calls else 1
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = list(pool.map(_render, *zip(*calls)))
+    else:
+        rendered = [_render(*call) for call in calls]
+    
+    for name, paths in zip(names, rendered):
+        results[name] = {
+            'hash': pending[name][2],
+            'arquivos': [os.path.basename(p) for p in paths],
+            'dpi': dpi,
+            'status': 'gerada'
+        }
+    
+    # Mantém entradas de figuras que não fizeram parte desta execução
+    entries = dict(manifest)
+    entries.update({name: {k: v for k, v in entry.items() if k != 'status'} for name, entry in results.items()})
+    if pending or not os.path.exists(os.path.join(output_dir, MANIFEST_NAME)):
+        save_figure_manifest(output_dir, entries)
+    
+    return {name: results[name] for name in jobs}
+
+
+def main(csv_path=CSV_PATH, output_dir=OUTPUT_DIR, periods='default', scatter_mode='auto',
+         formats=('png',), draft=False, workers=None, force=False):
     print("Carregando dados...")
-    df = load_and_prepare_data()
-    print(f"Total de dispositivos com ano: {len(df)}")
-    
-    print("\nGerando figuras...")
-    
-    # Figura 1: Timeline scatter
-    path1 = create_timeline_scatter(df)
-    
-    # Figura 2: Bar chart por ano
-    path2 = create_timeline_bar(df)
+    jobs = figure_jobs(csv_path, periods, scatter_mode)
+    print(f"Total de dispositivos com ano: {len(jobs['timeline_bar'][1][0])}")
     
-    # Figura 3: Tendências
-    path3 = create_trends_figure(df)
+    dpi = DRAFT_DPI if draft else FINAL_DPI
+    if draft:
+        output_dir = os.path.join(output_dir, DRAFT_SUBDIR)
+    print(f"\nGerando figuras ({dpi} dpi{', rascunho' if draft else ''}: {', '.join(formats)})...")
+    results = render_figures(jobs, output_dir, dpi, formats, workers, force)
     
     print("\n" + "="*60)
     print("FIGURAS GERADAS:")
     print("="*60)
-    print(f"1. {path1}")
-    print(f"2. {path2}")
-    print(f"3. {path3}")
-    print("\n✅ Todas as figuras foram salvas em:", OUTPUT_DIR)
+    for i, (name, entry) in enumerate(results.items(), start=1):
+        marker = "⏭️  inalterada" if entry['status'] == 'inalterada' else "✅ gerada"
+        files = ', '.join(os.path.join(output_dir, f) for f in entry['arquivos'])
+        print(f"{i}. {files} ({marker})")
+    print("\n✅ Todas as figuras foram salvas em:", output_dir)
 
 
 if __name__ == "__main__":
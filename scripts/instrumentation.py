@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentação por etapa (tempo, CPU, memória e linhas)
+Um decorador (@instrumented) para as funções de análise e um gerenciador
+de contexto (stage) para as etapas dos scripts. Desligada por padrão:
+cada chamada custa só a verificação de um global. Ligada (start_trace ou
+a variável de ambiente BRAIN_DEVICES_TRACE=1), registra para cada etapa:
+
+- tempo de parede (perf_counter) e de CPU do processo (process_time);
+- pico de memória Python acima do início da etapa (tracemalloc);
+- linhas do DataFrame recebido, quando houver.
+
+As etapas podem ser aninhadas (o pico de uma etapa inclui o das
+internas). O CPU dos processos filhos (bootstrap e permutações em
+paralelo) não entra em process_time; a diferença para o tempo de parede
+aparece no resumo.
+
+Só a biblioteca padrão é usada (o brain_devices pode importar este
+módulo sem carregar pandas).
+"""
+
+import contextlib
+import functools
+import json
+import os
+import time
+import tracemalloc
+from datetime import datetime
+
+ENV_VAR = "BRAIN_DEVICES_TRACE"
+
+# Registros da medição atual (None = instrumentação desligada)
+_TRACE = None
+# Etapas abertas: [nome, pico das etapas internas]
+_STACK = []
+
+
+# ============================================================================
+# LIGA / DESLIGA
+# ============================================================================
+
+def enabled():
+    return _TRACE is not None
+
+
+def start_trace():
+    """Liga a instrumentação e começa uma medição nova"""
+    global _TRACE
+    _TRACE = []
+    _STACK.clear()
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def stop_trace():
+    """
+    Desliga a instrumentação.
+
+    Returns:
+        Lista de registros na ordem em que as etapas terminaram
+    """
+    global _TRACE
+    records, _TRACE = _TRACE or [], None
+    _STACK.clear()
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return records
+
+
+if os.environ.get(ENV_VAR, '') not in ('', '0'):
+    start_trace()
+
+
+# ============================================================================
+# MEDIÇÃO
+# ============================================================================
+
+def _rows(obj):
+    """Linhas de um DataFrame/Series/lista (None para o resto)"""
+    if obj is None or isinstance(obj, (str, bytes, dict)):
+        return None
+    try:
+        return len(obj)
+    except TypeError:
+        return None
+
+
+@contextlib.contextmanager
+def _measure(name, rows):
+    depth = len(_STACK)
+    frame = [name, 0]
+    _STACK.append(frame)
+    # O pico global até aqui pertence à etapa de fora
+    current, peak = tracemalloc.get_traced_memory()
+    if depth:
+        _STACK[depth - 1][1] = max(_STACK[depth - 1][1], peak)
+    tracemalloc.reset_peak()
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall
+        cpu = time.process_time() - cpu
+        stage_peak = max(tracemalloc.get_traced_memory()[1], frame[1])
+        _STACK.pop()
+        if depth:
+            _STACK[depth - 1][1] = max(_STACK[depth - 1][1], stage_peak)
+        _TRACE.append({
+            'stage': name,
+            'depth': depth,
+            'parent': _STACK[depth - 1][0] if depth else None,
+            'wall_s': round(wall, 6),
+            'cpu_s': round(cpu, 6),
+            'peak_mb': round(max(stage_peak - current, 0) / 1e6, 3),
+            'rows': rows
+        })
+
+
+def stage(name, data=None):
+    """
+    Gerenciador de contexto de uma etapa.
+
+    Args:
+        name: Nome da etapa no registro
+        data: DataFrame/lista processado (para contar linhas) ou o número de linhas
+    """
+    if _TRACE is None:
+        return contextlib.nullcontext()
+    return _measure(name, data if isinstance(data, int) else _rows(data))
+
+
+def instrumented(func=None, *, name=None):
+    """
+    Decorador: mede cada chamada da função como uma etapa. As linhas vêm do
+    primeiro argumento (o DataFrame das análises).
+
+    Uso: @instrumented ou @instrumented(name='etapa')
+    """
+    if func is None:
+        return functools.partial(instrumented, name=name)
+    label = name or func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _TRACE is None:
+            return func(*args, **kwargs)
+        with _measure(label, _rows(args[0]) if args else None):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+# ============================================================================
+# SAÍDA
+# ============================================================================
+
+def write_trace(records, path, **metadata):
+    """Grava o trace em JSON (escrita atômica)"""
+    trace = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        **metadata,
+        'etapas': records
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(trace, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _tree_order(records):
+    """Etapas na ordem de início (pais antes dos filhos)"""
+    ordered, pending = [], []
+    # Os registros saem na ordem de término: um pai vem depois dos seus filhos
+    for record in records:
+        children = []
+        while pending and pending[-1]['depth'] > record['depth']:
+            children.append(pending.pop())
+        pending.append(dict(record, _children=children[::-1]))
+
+    def walk(nodes):
+        for node in nodes:
+            ordered.append(node)
+            walk(node['_children'])
+    walk(pending)
+    return ordered
+
+
+def format_summary(records):
+    """Resumo em texto: uma linha por etapa, indentada pelo aninhamento"""
+    if not records:
+        return "Instrumentação: nenhuma etapa registrada.\n"
+    top_wall = sum(r['wall_s'] for r in records if r['depth'] == 0) or 1.0
+
+    lines = [
+        f"{'Etapa':<40} {'Parede':>9} {'CPU':>9} {'%':>6} {'Pico MB':>9} {'Linhas':>9}",
+        "-" * 87
+    ]
+    for r in _tree_order(records):
+        label = ('  ' * r['depth'] + r['stage'])[:40]
+        rows = f"{r['rows']:,}" if r['rows'] is not None else '-'
+        lines.append(f"{label:<40} {r['wall_s']:>8.3f}s {r['cpu_s']:>8.3f}s "
+                     f"{100 * r['wall_s'] / top_wall:>5.1f}% {r['peak_mb']:>9.1f} {rows:>9}")
+    lines.append("-" * 87)
+    lines.append(f"{'Total (etapas de nível 0)':<40} {top_wall:>8.3f}s")
+    return "\n".join(lines) + "\n"
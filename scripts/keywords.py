@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de palavras-chave dos dispositivos EEG/fNIRS
+Todas as listas de palavras-chave usadas pelos scripts de análise ficam
+aqui, compiladas em um único regex de alternância por coluna de texto.
+Cada coluna é varrida uma vez e o resultado é uma máscara de bits inteira
+por dispositivo; as contagens saem de operações bit a bit sobre ela.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+SOFTWARE_COLUMNS = ['Bundled Software', 'Data Synchronization', 'Raw data access']
+
+# (nome da feature, colunas varridas, palavras-chave em minúsculas)
+# colunas = None significa "qualquer coluna do CSV"
+FEATURE_VOCABULARY = [
+    # Software / integração
+    ('open_api', SOFTWARE_COLUMNS, ['open', 'sdk', 'api', 'lsl', 'free']),
+    ('raw_available', ['Raw data access'], ['available']),
+    ('raw_partial', ['Raw data access'], ['partial']),
+    ('raw_license', ['Raw data access'], ['requires', 'license']),
+    ('sync_lsl', ['Data Synchronization'], ['lsl']),
+    ('sync_sdk', ['Data Synchronization'], ['sdk']),
+    ('sync_api', ['Data Synchronization'], ['api']),
+    ('sync_tcp_udp', ['Data Synchronization'], ['tcp', 'udp']),
+
+    # Conectividade
+    ('bluetooth', ['Wireless Connectivity'], ['bluetooth', 'ble']),
+    ('wifi', ['Wireless Connectivity'], ['wi-fi', 'wifi']),
+    ('wlan', ['Wireless Connectivity'], ['wlan']),
+    ('rf', ['Wireless Connectivity'], ['rf']),
+    ('rf_24', ['Wireless Connectivity'], ['2.4']),
+
+    # Tipo de sensor
+    ('sensor_dry', ['Sensor Type'], ['dry']),
+    ('sensor_semi', ['Sensor Type'], ['semi']),
+    ('sensor_hybrid', ['Sensor Type'], ['hybrid']),
+    ('sensor_wet', ['Sensor Type'], ['wet']),
+    ('sensor_gel', ['Sensor Type'], ['gel']),
+    ('sensor_saline', ['Sensor Type'], ['saline']),
+    ('sensor_optode', ['Sensor Type'], ['optode']),
+
+    # Capacidades auxiliares
+    ('aux_imu', ['Auxiliary capabilities'], ['imu', 'accelerometer']),
+    ('aux_motion', ['Auxiliary capabilities'], ['motion']),
+    ('aux_hr', ['Auxiliary capabilities'], ['hr', 'ppg']),
+    ('aux_heart', ['Auxiliary capabilities'], ['heart']),
+    ('aux_emg', ['Auxiliary capabilities'], ['emg']),
+    ('aux_eog', ['Auxiliary capabilities'], ['eog', 'eye']),
+    ('aux_gsr', ['Auxiliary capabilities'], ['gsr', 'eda']),
+    ('aux_resp', ['Auxiliary capabilities'], ['resp']),
+    ('aux_temp', ['Auxiliary capabilities'], ['temp']),
+    ('aux_spo2', ['Auxiliary capabilities'], ['spo']),
+
+    # Certificação / uso clínico
+    ('clinical_grade', ['Auxiliary capabilities'], ['fda', 'medical', 'clinical', 'ce mark', 'certified']),
+    ('medical_cert', None, ['fda', 'ce ', 'medical', 'clinical', 'cleared', 'approved',
+                            'certification', 'certified']),
+
+    # Form factor
+    ('type_headset', ['Type'], ['headset']),
+    ('type_headband', ['Type'], ['headband']),
+    ('type_cap', ['Type'], ['cap']),
+    ('type_adhesive', ['Type'], ['adhesive']),
+    ('type_earphone', ['Type'], ['earphone']),
+    ('type_headphones', ['Type'], ['headphones']),
+    ('type_in_ear', ['Type'], ['in-ear']),
+]
+
+FEATURE_BITS = {name: 1 << i for i, (name, _, _) in enumerate(FEATURE_VOCABULARY)}
+
+assert len(FEATURE_BITS) <= 63, "a máscara de features precisa caber em int64"
+
+
+def feature_mask(*names):
+    """Máscara inteira com os bits das features indicadas"""
+    mask = 0
+    for name in names:
+        mask |= FEATURE_BITS[name]
+    return mask
+
+
+def has_any(bitmask, *names):
+    """Dispositivos com pelo menos uma das features"""
+    return (np.asarray(bitmask) & feature_mask(*names)) != 0
+
+
+def has_all(bitmask, *names):
+    """Dispositivos com todas as features"""
+    mask = feature_mask(*names)
+    return (np.asarray(bitmask) & mask) == mask
+
+
+# ============================================================================
+# COMPILAÇÃO E VARREDURA
+# ============================================================================
+
+def compile_column_matcher(keyword_masks):
+    """Compila {palavra-chave: bits} em um único regex de alternância"""
+    # Alternativas da mais longa para a mais curta: em cada posição o
+    # lookahead devolve a palavra mais longa; as mais curtas que começam na
+    # mesma posição são prefixos dela e entram via prefix_masks
+    keywords = sorted(keyword_masks, key=len, reverse=True)
+    pattern = re.compile('(?=(' + '|'.join(re.escape(k) for k in keywords) + '))')
+
+    prefix_masks = {}
+    for keyword in keywords:
+        mask = 0
+        for other, bits in keyword_masks.items():
+            if keyword.startswith(other):
+                mask |= bits
+        prefix_masks[keyword] = mask
+
+    return {'pattern': pattern, 'prefix_masks': prefix_masks}
+
+
+def compile_vocabulary(columns, vocabulary=FEATURE_VOCABULARY):
+    """Um matcher por coluna de texto com todas as palavras-chave que a envolvem"""
+    per_column = {column: {} for column in columns}
+    for i, (_, feature_columns, keywords) in enumerate(vocabulary):
+        bit = 1 << i
+        for column in (columns if feature_columns is None else feature_columns):
+            if column not in per_column:
+                continue
+            for keyword in keywords:
+                per_column[column][keyword] = per_column[column].get(keyword, 0) | bit
+
+    return {column: compile_column_matcher(kw) for column, kw in per_column.items() if kw}
+
+
+def scan_column(series, matcher):
+    """Varre uma coluna uma única vez e devolve a máscara de bits por linha"""
+    codes, uniques = pd.factorize(series)
+
+    pattern = matcher['pattern']
+    prefix_masks = matcher['prefix_masks']
+
+    # Só os valores distintos são varridos; código -1 (ausente) fica sem bits
+    unique_masks = np.zeros(len(uniques) + 1, dtype=np.int64)
+    for i, value in enumerate(uniques):
+        # Texto como no join das colunas: minúsculas e seguido de espaço
+        text = str(value).lower() + ' '
+        mask = 0
+        for keyword in set(pattern.findall(text)):
+            mask |= prefix_masks[keyword]
+        unique_masks[i] = mask
+
+    return unique_masks[codes]
+
+
+def scan_features(df, vocabulary=FEATURE_VOCABULARY):
+    """Máscara de features (int64) por dispositivo"""
+    matchers = compile_vocabulary(list(df.columns), vocabulary)
+    bitmask = np.zeros(len(df), dtype=np.int64)
+    for column, matcher in matchers.items():
+        bitmask |= scan_column(df[column], matcher)
+    return bitmask
@@ -0,0 +1,540 @@
+# -*- coding: utf-8 -*-
+"""
+Diferenças entre duas versões do artigo (seção -> parágrafo -> palavra)
+Os dois documentos são limpos (cabeçalhos e rodapés repetidos de página),
+divididos em seções pelos templates de split_article_sections e em
+parágrafos. Cada parágrafo recebe um hash do texto normalizado (minúsculas,
+sem pontuação nem hifenização de fim de linha), e o alinhamento é feito
+sobre as listas de hashes: seções com o mesmo hash são puladas, e o diff
+palavra a palavra só roda nos blocos de parágrafos cujos hashes diferem.
+
+Cada parágrafo alterado, inserido ou movido é ligado aos códigos dos
+revisores (R1C3, R2AQ1, ...) citados nele ou nos parágrafos vizinhos e aos
+comentários mais parecidos (TF-IDF sobre o comentário e os textos de
+Alterações/*/<código>_*.txt).
+
+Uso:
+    python manuscript_diff.py [--old DOC] [--new DOC] [--output TXT] [--benchmark]
+"""
+
+import argparse
+import difflib
+import glob
+import hashlib
+import os
+import re
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from cross_reference import CODE_PATTERN, comment_text, load_comments, tfidf_matrix
+from page_store import iter_pages
+from search_index import PROJECT_DIR
+from split_article_sections import load_template, locate_sections, section_body
+
+JSON_DIR = os.path.join(PROJECT_DIR, "textos_json")
+OLD_DOCUMENT = os.path.join(JSON_DIR, "Artigo-inicial")
+NEW_DOCUMENT = os.path.join(JSON_DIR, "Artigo-Revisado")
+# Versão inicial: PDF de submissão (LaTeX); revisada: layout do Word
+OLD_TEMPLATE = 'ieee_submission'
+NEW_TEMPLATE = 'ieee_access'
+OUTPUT_PATH = os.path.join(PROJECT_DIR, "Alterações", "DIFF_ARTIGO.txt")
+
+# Textos das alterações planejadas por código (Alterações/Cluster*/R1C3_Vies.txt)
+CHANGE_FILES = os.path.join(PROJECT_DIR, "Alterações", "*", "R*_*.txt")
+
+# Cabeçalhos/rodapés: linhas entre as EDGE_LINES primeiras ou últimas de uma
+# página que se repetem (com os números trocados por #) em MIN_REPEATS páginas
+EDGE_LINES = 3
+MIN_REPEATS = 3
+
+# Linha terminada em . : ! ? mais curta que esta fração da largura típica
+# fecha o parágrafo (o PDF de submissão não tem linhas em branco)
+SHORT_LINE = 0.8
+
+# Similaridade mínima (multiconjunto de palavras) para parear dois parágrafos
+MIN_PAIR_RATIO = 0.5
+# Acima deste nº de comparações o bloco é tratado como removido + inserido
+MAX_PAIR_CANDIDATES = 10000
+
+# Similaridade TF-IDF mínima de um comentário sugerido
+MIN_SCORE = 0.1
+
+# Parágrafos listados de uma sequência inserida/removida (o resto é resumido)
+MAX_LISTED = 5
+
+NON_WORD = re.compile(r'[\W_]+')
+
+
+# ============================================================================
+# LIMPEZA E DIVISÃO EM PARÁGRAFOS
+# ============================================================================
+
+def _line_key(line):
+    """Linha com os números trocados por # ("Page 4 of 202" -> "Page # of #")"""
+    return re.sub(r'\d+', '#', line.strip())
+
+
+def _edge_indexes(lines, edge=EDGE_LINES):
+    filled = [i for i, line in enumerate(lines) if line.strip()]
+    return set(filled[:edge] + filled[-edge:])
+
+
+def page_furniture(path, edge=EDGE_LINES, min_repeats=MIN_REPEATS):
+    """Chaves das linhas de cabeçalho/rodapé repetidas entre as páginas"""
+    counts = Counter()
+    for page in iter_pages(path):
+        lines = page['texto'].splitlines()
+        counts.update({_line_key(lines[i]) for i in _edge_indexes(lines, edge)})
+    return {key for key, count in counts.items() if count >= min_repeats}
+
+
+def clean_text(path):
+    """
+    Texto do documento sem cabeçalhos/rodapés de página.
+
+    As páginas são unidas por uma quebra de linha simples, então um
+    parágrafo que continua na página seguinte não é cortado.
+    """
+    furniture = page_furniture(path)
+    pages = []
+    for page in iter_pages(path):
+        lines = page['texto'].splitlines()
+        edges = _edge_indexes(lines)
+        pages.append('\n'.join(
+            line for i, line in enumerate(lines)
+            if i not in edges or _line_key(line) not in furniture
+        ))
+    return '\n'.join(pages)
+
+
+def document_sections(path, template):
+    """Seções do documento limpo {nome: texto}, na ordem do texto"""
+    text = clean_text(path)
+    positions = sorted(locate_sections(text, load_template(template)), key=lambda s: s['start'])
+    sections = {}
+    for i, section in enumerate(positions):
+        end = positions[i + 1]['start'] if i + 1 < len(positions) else len(text)
+        sections[section['name']] = section_body(text, section, end)
+    return sections
+
+
+def _join_lines(lines):
+    """Une as linhas de um parágrafo desfazendo hifenização e capitular"""
+    text = '\n'.join(lines)
+    # Capitular do LaTeX: "A\nDVANCES" -> "ADVANCES"
+    text = re.sub(r'^([A-Z])\n(?=[A-Z]{2})', r'\1', text)
+    # Hifenização de fim de linha: "trans-\nformed" -> "transformed";
+    # antes de maiúscula/número o hífen fica ("Multi-\nSubject" -> "Multi-Subject")
+    text = re.sub(r'(\w)-\n(?=[a-z])', r'\1', text)
+    text = re.sub(r'(\w-)\n(?=\w)', r'\1', text)
+    return text.replace('\n', ' ')
+
+
+def split_paragraphs(text):
+    """
+    Parágrafos de uma seção.
+
+    Um parágrafo termina numa linha em branco ou numa linha curta terminada
+    em pontuação final.
+    """
+    lines = [line.strip() for line in text.splitlines()]
+    widths = sorted(len(line) for line in lines if line)
+    width = widths[int(len(widths) * 0.9)] if widths else 0
+
+    paragraphs, current = [], []
+    for line in lines:
+        if line:
+            current.append(line)
+            if line[-1] not in '.:!?' or len(line) >= SHORT_LINE * width:
+                continue
+        if current:
+            paragraphs.append(_join_lines(current))
+            current = []
+    if current:
+        paragraphs.append(_join_lines(current))
+    return paragraphs
+
+
+def paragraph_record(text):
+    """Parágrafo com palavras, palavras normalizadas e hash do conteúdo"""
+    words = text.split()
+    tokens = [NON_WORD.sub('', word.lower()) for word in words]
+    key = ' '.join(token for token in tokens if token)
+    return {
+        'text': text,
+        'words': words,
+        'tokens': tokens,
+        'hash': hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+    }
+
+
+def load_version(path, template):
+    """Versão do artigo: {seção: [parágrafos]} com hash por parágrafo"""
+    version = {}
+    for name, text in document_sections(path, template).items():
+        records = [paragraph_record(p) for p in split_paragraphs(text)]
+        version[name] = [r for r in records if any(r['tokens'])]
+    return version
+
+
+# ============================================================================
+# ALINHAMENTO
+# ============================================================================
+
+def _section_hash(paragraphs):
+    return hashlib.blake2b(''.join(p['hash'] for p in paragraphs).encode('ascii'), digest_size=8).hexdigest()
+
+
+def word_changes(old, new):
+    """
+    Diff palavra a palavra de dois parágrafos (só para pares já alinhados).
+
+    Returns:
+        (similaridade 0-1, lista de (tipo, palavras antigas, palavras novas))
+    """
+    matcher = difflib.SequenceMatcher(None, old['tokens'], new['tokens'], autojunk=False)
+    changes = [
+        (tag, ' '.join(old['words'][i1:i2]), ' '.join(new['words'][j1:j2]))
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal'
+    ]
+    return matcher.ratio(), changes
+
+
+def pair_block(old_block, new_block):
+    """
+    Pareia os parágrafos de um bloco substituído.
+
+    Usa só o quick_ratio (multiconjunto de palavras, barato); o diff
+    completo fica para os pares escolhidos.
+
+    Returns:
+        {índice novo: índice antigo}
+    """
+    pairs = {}
+    if len(old_block) * len(new_block) > MAX_PAIR_CANDIDATES:
+        return pairs
+    used = set()
+    matcher = difflib.SequenceMatcher(None, autojunk=False)
+    for j, new in enumerate(new_block):
+        matcher.set_seq2(new['tokens'])
+        best, best_ratio = None, MIN_PAIR_RATIO
+        for i, old in enumerate(old_block):
+            if i in used:
+                continue
+            matcher.set_seq1(old['tokens'])
+            if matcher.real_quick_ratio() < best_ratio:
+                continue
+            ratio = matcher.quick_ratio()
+            if ratio >= best_ratio:
+                best, best_ratio = i, ratio
+        if best is not None:
+            pairs[j] = best
+            used.add(best)
+    return pairs
+
+
+def _codes_near(paragraphs, index):
+    """Códigos citados no parágrafo e nos vizinhos imediatos"""
+    codes = []
+    for p in paragraphs[max(index - 1, 0):index + 2]:
+        for match in CODE_PATTERN.finditer(p['text']):
+            if match.group(0) not in codes:
+                codes.append(match.group(0))
+    return codes
+
+
+def _change(kind, section, paragraphs, index, **fields):
+    return dict({
+        'kind': kind,
+        'section': section,
+        'index': index,
+        'text': paragraphs[index]['text'],
+        'codes': _codes_near(paragraphs, index)
+    }, **fields)
+
+
+def diff_versions(old, new):
+    """
+    Alinha duas versões seção a seção e parágrafo a parágrafo.
+
+    Returns:
+        (estatísticas por seção, lista de mudanças). Cada mudança é um dict
+        com kind ('alterado', 'inserido', 'removido' ou 'movido'), section,
+        index (parágrafo na versão nova; na antiga para 'removido'), text,
+        codes e, conforme o tipo, old_index, ratio, changes ou moved_from.
+    """
+    # Onde cada hash aparece, para reconhecer parágrafos movidos entre seções
+    old_where = {p['hash']: (name, i) for name, ps in old.items() for i, p in enumerate(ps)}
+    new_hashes = {p['hash'] for ps in new.values() for p in ps}
+
+    stats, changes = {}, []
+    for name in list(new) + [name for name in old if name not in new]:
+        old_ps, new_ps = old.get(name, []), new.get(name, [])
+        counts = Counter()
+        stats[name] = counts
+
+        if old_ps and new_ps and _section_hash(old_ps) == _section_hash(new_ps):
+            counts['iguais'] = len(new_ps)
+            continue
+
+        matcher = difflib.SequenceMatcher(None, [p['hash'] for p in old_ps],
+                                          [p['hash'] for p in new_ps], autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                counts['iguais'] += i2 - i1
+                continue
+
+            pairs = pair_block(old_ps[i1:i2], new_ps[j1:j2]) if tag == 'replace' else {}
+            for j in range(j1, j2):
+                new_p = new_ps[j]
+                if j - j1 in pairs:
+                    i = i1 + pairs[j - j1]
+                    ratio, words = word_changes(old_ps[i], new_p)
+                    changes.append(_change('alterado', name, new_ps, j, old_index=i,
+                                           ratio=ratio, changes=words))
+                elif new_p['hash'] in old_where:
+                    changes.append(_change('movido', name, new_ps, j, moved_from=old_where[new_p['hash']]))
+                else:
+                    changes.append(_change('inserido', name, new_ps, j))
+                counts[changes[-1]['kind']] += 1
+
+            paired = {i1 + i for i in pairs.values()}
+            for i in range(i1, i2):
+                # Parágrafos movidos aparecem do lado novo
+                if i not in paired and old_ps[i]['hash'] not in new_hashes:
+                    changes.append(_change('removido', name, old_ps, i))
+                    counts['removido'] += 1
+
+    return stats, changes
+
+
+# ============================================================================
+# LIGAÇÃO COM OS COMENTÁRIOS
+# ============================================================================
+
+def comment_documents(comment_dirs=None, change_files=CHANGE_FILES):
+    """
+    Texto de referência de cada código: o comentário (sem andamento nem
+    resposta padrão) mais as alterações planejadas em Alterações/*/<código>_*.txt.
+    """
+    documents = {code: comment_text(raw) for code, raw in load_comments(comment_dirs).items()}
+    for path in sorted(glob.glob(change_files)):
+        code = Path(path).name.split('_', 1)[0]
+        if CODE_PATTERN.fullmatch(code):
+            text = Path(path).read_text(encoding='utf-8-sig')
+            documents[code] = documents.get(code, '') + '\n' + text
+    return documents
+
+
+def link_comments(changes, documents, top=3, min_score=MIN_SCORE):
+    """
+    Acrescenta a cada mudança os comentários mais parecidos ('suggested':
+    lista de (código, score)), com um único produto esparso.
+    """
+    if not changes or not documents:
+        for change in changes:
+            change['suggested'] = []
+        return changes
+
+    codes = list(documents)
+    # Palavras novas entram de novo: pesam mais que o texto que não mudou
+    texts = [
+        change['text'] + ' ' + ' '.join(new for _, _, new in change.get('changes', []))
+        for change in changes
+    ]
+    matrix, _ = tfidf_matrix(texts + [documents[code] for code in codes])
+    scores = (matrix[:len(changes)] @ matrix[len(changes):].T).toarray()
+    order = np.argsort(-scores, axis=1, kind='stable')[:, :top]
+
+    for row, change in enumerate(changes):
+        change['suggested'] = [
+            (codes[col], float(scores[row, col])) for col in order[row] if scores[row, col] >= min_score
+        ]
+    return changes
+
+
+# ============================================================================
+# RELATÓRIO
+# ============================================================================
+
+def _clip(text, width):
+    return text if len(text) <= width else text[:width - 1] + '…'
+
+
+def _codes_text(change):
+    parts = list(change['codes'])
+    parts += [f"{code} ({score:.2f})" for code, score in change['suggested'] if code not in change['codes']]
+    return ', '.join(parts) if parts else '-'
+
+
+def _collapse_runs(changes, max_listed=MAX_LISTED):
+    """
+    Resume sequências longas de parágrafos inseridos ou removidos seguidos:
+    os `max_listed` primeiros continuam, o resto vira um item 'resumo'.
+    """
+    result, run = [], []
+
+    def flush():
+        result.extend(run[:max_listed])
+        if len(run) > max_listed:
+            result.append({'kind': 'resumo', 'of': run[0]['kind'], 'count': len(run) - max_listed,
+                           'first': run[max_listed]['index'], 'last': run[-1]['index']})
+        run.clear()
+
+    for change in changes:
+        if run and (change['kind'] != run[-1]['kind'] or change['index'] != run[-1]['index'] + 1):
+            flush()
+        if change['kind'] in ('inserido', 'removido'):
+            run.append(change)
+        else:
+            flush()
+            result.append(change)
+    flush()
+    return result
+
+
+def format_report(stats, changes, old_label, new_label, max_spans=4, max_listed=MAX_LISTED):
+    """Resumo das mudanças, seção por seção"""
+    total = Counter()
+    for counts in stats.values():
+        total.update(counts)
+    kinds = ('iguais', 'alterado', 'inserido', 'removido', 'movido')
+
+    lines = [
+        "=" * 80,
+        "DIFERENÇAS ENTRE AS VERSÕES DO ARTIGO",
+        "=" * 80,
+        f"Antiga: {old_label}",
+        f"Nova:   {new_label}",
+        "Parágrafos: " + ", ".join(f"{total[k]} {k}" for k in kinds),
+        ""
+    ]
+
+    by_section = {}
+    for change in changes:
+        by_section.setdefault(change['section'], []).append(change)
+
+    for name, counts in stats.items():
+        lines.append("-" * 80)
+        lines.append(f"SEÇÃO: {name}  (" + ", ".join(f"{counts[k]} {k}" for k in kinds if counts[k]) + ")")
+        lines.append("-" * 80)
+        for change in _collapse_runs(by_section.get(name, []), max_listed):
+            if change['kind'] == 'resumo':
+                first, last = change['first'] + 1, change['last'] + 1
+                prefix = 'antes ' if change['of'] == 'removido' else ''
+                lines.append(f"   ... mais {change['count']} parágrafo(s) {change['of']}(s) "
+                             f"({prefix}§{first}–§{last})")
+                continue
+            if change['kind'] == 'alterado':
+                where = f"§{change['index'] + 1} (antes §{change['old_index'] + 1})"
+                detail = f"similaridade {change['ratio']:.2f}"
+            elif change['kind'] == 'movido':
+                section, index = change['moved_from']
+                where, detail = f"§{change['index'] + 1}", f"veio de {section} §{index + 1}"
+            elif change['kind'] == 'removido':
+                where, detail = f"antes §{change['index'] + 1}", ''
+            else:
+                where, detail = f"§{change['index'] + 1}", ''
+
+            lines.append(f"[{change['kind'].upper()}] {where} {detail}".rstrip())
+            lines.append(f"   Códigos: {_codes_text(change)}")
+            if change['kind'] == 'alterado':
+                for tag, old_words, new_words in change['changes'][:max_spans]:
+                    if old_words:
+                        lines.append(f"   - {_clip(old_words, 74)}")
+                    if new_words:
+                        lines.append(f"   + {_clip(new_words, 74)}")
+                if len(change['changes']) > max_spans:
+                    lines.append(f"   ... mais {len(change['changes']) - max_spans} trecho(s)")
+            else:
+                lines.append(f"   \"{_clip(change['text'], 74)}\"")
+        lines.append("")
+
+    return "\n".join(lines) + "\n"
+
+
+def diff_documents(old_path=OLD_DOCUMENT, new_path=NEW_DOCUMENT, old_template=OLD_TEMPLATE,
+                   new_template=NEW_TEMPLATE, comment_dirs=None, top=3):
+    """Diff completo com ligação aos comentários: (estatísticas, mudanças)"""
+    old = load_version(old_path, old_template)
+    new = load_version(new_path, new_template)
+    stats, changes = diff_versions(old, new)
+    link_comments(changes, comment_documents(comment_dirs), top)
+    return stats, changes
+
+
+def benchmark(old_path=OLD_DOCUMENT, new_path=NEW_DOCUMENT, old_template=OLD_TEMPLATE,
+              new_template=NEW_TEMPLATE, limit=60.0):
+    """
+    Tempo do diff por hashes x difflib.ndiff sobre o texto inteiro.
+
+    O ndiff é interrompido (e reportado como "> limit") quando passa de
+    `limit` segundos.
+    """
+    start = time.perf_counter()
+    old = load_version(old_path, old_template)
+    new = load_version(new_path, new_template)
+    loaded = time.perf_counter()
+    diff_versions(old, new)
+    hashed = time.perf_counter()
+
+    old_lines = clean_text(old_path).splitlines(keepends=True)
+    new_lines = clean_text(new_path).splitlines(keepends=True)
+    plain_start = time.perf_counter()
+    plain = None
+    for _ in difflib.ndiff(old_lines, new_lines):
+        if time.perf_counter() - plain_start > limit:
+            break
+    else:
+        plain = time.perf_counter() - plain_start
+
+    return {
+        'carregamento_s': loaded - start,
+        'diff_hashes_s': hashed - loaded,
+        'ndiff_s': plain,
+        'limite_s': limit
+    }
+
+
+def main(old_path=OLD_DOCUMENT, new_path=NEW_DOCUMENT, old_template=OLD_TEMPLATE, new_template=NEW_TEMPLATE,
+         output_path=OUTPUT_PATH, comment_dirs=None, top=3, run_benchmark=False):
+    if run_benchmark:
+        result = benchmark(old_path, new_path, old_template, new_template)
+        print(f"Carregamento e divisão: {result['carregamento_s']:.2f}s")
+        print(f"Diff por hashes:        {result['diff_hashes_s']:.2f}s")
+        if result['ndiff_s'] is None:
+            print(f"difflib.ndiff:          > {result['limite_s']:.0f}s (interrompido)")
+        else:
+            print(f"difflib.ndiff:          {result['ndiff_s']:.2f}s")
+        return
+
+    start = time.perf_counter()
+    stats, changes = diff_documents(old_path, new_path, old_template, new_template, comment_dirs, top)
+    report = format_report(stats, changes, old_path, new_path)
+    elapsed = time.perf_counter() - start
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(report)
+
+    total = Counter()
+    for counts in stats.values():
+        total.update(counts)
+    print(f"✅ Diff: {output_path} ({elapsed:.2f}s)")
+    print("   " + ", ".join(f"{count} {kind}" for kind, count in total.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Diferenças entre duas versões do artigo")
+    parser.add_argument('--old', default=OLD_DOCUMENT, help="versão antiga (.jsonl, .json ou sem extensão)")
+    parser.add_argument('--new', default=NEW_DOCUMENT, help="versão nova")
+    parser.add_argument('--old-template', default=OLD_TEMPLATE, help="títulos de seção da versão antiga")
+    parser.add_argument('--new-template', default=NEW_TEMPLATE, help="títulos de seção da versão nova")
+    parser.add_argument('--output', default=OUTPUT_PATH, help="arquivo do resumo")
+    parser.add_argument('--top', type=int, default=3, help="comentários sugeridos por parágrafo")
+    parser.add_argument('--benchmark', action='store_true', help="compara o tempo com difflib.ndiff")
+    args = parser.parse_args()
+    main(args.old, args.new, args.old_template, args.new_template, args.output, top=args.top,
+         run_benchmark=args.benchmark)
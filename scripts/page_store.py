@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Armazenamento de textos extraídos por página (formato "paginas-v1")
+
+Cada documento é gravado em dois arquivos, página a página, sem manter o
+texto inteiro em memória:
+
+    <nome>.txt    texto completo (páginas separadas por linha em branco)
+    <nome>.jsonl  1ª linha: cabeçalho (arquivo, metadados, total_paginas)
+                  uma linha por página: numero, caracteres, inicio, fim
+                  última linha: totais (total_caracteres, total_bytes)
+
+`inicio`/`fim` são offsets em bytes dentro do .txt, então `texto_completo`
+não é duplicado e qualquer página pode ser lida com um seek. O JSON antigo
+(um único objeto com "paginas" e "texto_completo") continua sendo lido
+pelas mesmas funções.
+"""
+
+import json
+import os
+from pathlib import Path
+
+FORMAT = "paginas-v1"
+PAGE_SEPARATOR = "\n\n"
+
+
+def store_paths(path) -> tuple:
+    """Caminhos (.jsonl, .txt) de um documento no formato por páginas"""
+    path = Path(path)
+    stem = path.with_suffix("") if path.suffix in (".jsonl", ".txt") else path
+    return stem.with_name(stem.name + ".jsonl"), stem.with_name(stem.name + ".txt")
+
+
+def resolve_document(path) -> Path:
+    """
+    Arquivo a ler para um documento.
+
+    Caminhos com extensão são usados como estão; sem extensão, o formato
+    por páginas (.jsonl) tem preferência sobre o JSON antigo (.json).
+    """
+    path = Path(path)
+    if path.suffix in (".json", ".jsonl"):
+        return path
+    index_path, _ = store_paths(path)
+    if index_path.exists():
+        return index_path
+    return path.with_name(path.name + ".json")
+
+
+# ============================================================================
+# ESCRITA
+# ============================================================================
+
+def write_page_store(path, header: dict, pages) -> dict:
+    """
+    Grava um documento consumindo `pages` uma página por vez.
+
+    Args:
+        path: Caminho do documento (com ou sem extensão)
+        header: Metadados do documento (arquivo, caminho_original, ...)
+        pages: Iterável de dicts com "numero", "texto" e "caracteres"
+
+    Returns:
+        Resumo com total_paginas, total_caracteres e total_bytes
+    """
+    index_path, text_path = store_paths(path)
+    # Temporários por processo: duas extrações simultâneas não se misturam
+    tmp_index = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    tmp_text = text_path.with_name(f"{text_path.name}.{os.getpid()}.tmp")
+
+    separator = PAGE_SEPARATOR.encode("utf-8")
+    total_pages = 0
+    total_chars = 0
+    offset = 0
+
+    try:
+        with open(tmp_index, "w", encoding="utf-8") as index, open(tmp_text, "wb") as blob:
+            index.write(json.dumps(dict(header, formato=FORMAT, texto=text_path.name),
+                                   ensure_ascii=False) + "\n")
+
+            for page in pages:
+                if total_pages:
+                    blob.write(separator)
+                    offset += len(separator)
+                    total_chars += len(PAGE_SEPARATOR)
+
+                data = page["texto"].encode("utf-8")
+                blob.write(data)
+                index.write(json.dumps({
+                    "numero": page["numero"],
+                    "caracteres": page["caracteres"],
+                    "inicio": offset,
+                    "fim": offset + len(data)
+                }) + "\n")
+
+                offset += len(data)
+                total_chars += len(page["texto"])
+                total_pages += 1
+
+            summary = {
+                "total_paginas": total_pages,
+                "total_caracteres": total_chars,
+                "total_bytes": offset
+            }
+            index.write(json.dumps(summary) + "\n")
+    except BaseException:
+        for tmp in (tmp_index, tmp_text):
+            if tmp.exists():
+                tmp.unlink()
+        raise
+
+    # Troca atômica: leitores nunca veem um documento pela metade
+    os.replace(tmp_text, text_path)
+    os.replace(tmp_index, index_path)
+    return summary
+
+
+# ============================================================================
+# LEITURA
+# ============================================================================
+
+def _read_index(index_path: Path) -> tuple:
+    """(cabeçalho, entradas de página, totais) de um índice .jsonl"""
+    with open(index_path, "r", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        entries = []
+        totals = {}
+        for line in f:
+            record = json.loads(line)
+            if "numero" in record:
+                entries.append(record)
+            else:
+                totals = record
+    return header, entries, totals
+
+
+def iter_pages(path):
+    """Páginas do documento (numero, texto, caracteres), lidas uma a uma"""
+    path = resolve_document(path)
+
+    if path.suffix == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f).get("paginas", [])
+        return
+
+    header, entries, _ = _read_index(path)
+    with open(path.with_name(header["texto"]), "rb") as blob:
+        for entry in entries:
+            blob.seek(entry["inicio"])
+            text = blob.read(entry["fim"] - entry["inicio"]).decode("utf-8")
+            yield {"numero": entry["numero"], "texto": text, "caracteres": entry["caracteres"]}
+
+
+def load_text(path) -> str:
+    """Texto completo do documento (em qualquer um dos dois formatos)"""
+    path = resolve_document(path)
+
+    if path.suffix == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("texto_completo", "")
+
+    with open(path, "r", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+    with open(path.with_name(header["texto"]), "r", encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+def load_document(path) -> dict:
+    """Documento completo no formato do JSON antigo (carrega tudo em memória)"""
+    path = resolve_document(path)
+
+    if path.suffix == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    header, _, totals = _read_index(path)
+    document = {key: value for key, value in header.items() if key not in ("formato", "texto")}
+    document["paginas"] = list(iter_pages(path))
+    document["texto_completo"] = load_text(path)
+    document["total_caracteres"] = totals.get("total_caracteres", len(document["texto_completo"]))
+    return document
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Quantis em fluxo (sketch KLL) para preço, canais, taxa de amostragem e estudos
+Cada sketch é um dict que recebe valores em lotes (update), pode ser
+combinado com outro (merge, entre blocos do CSV ou processos) e responde a
+qualquer percentil (quantiles / summary) sem guardar todos os valores.
+
+Modo exato: até `exact_limit` valores o sketch guarda tudo e os quantis
+são os do np.quantile (interpolação linear: a mediana de uma contagem par
+é a média dos dois valores centrais). Acima disso vira um KLL (Karnin,
+Lang e Liberty, 2016): níveis de "compactores", cada item do nível h vale
+2^h valores; quando um nível enche, ele é ordenado e metade dos itens (os
+de posição par ou ímpar, sorteado) sobe de nível. O erro de rank fica em
+torno de 1,7/k (k=200: ~1%) com memória O(k), e mínimo/máximo são exatos.
+
+Uso:
+    python quantiles.py [--csv CSV] [--chunk-rows N] [--percentiles 5 25 50 75 95] [--exact]
+"""
+
+import argparse
+import math
+
+import numpy as np
+
+from catalog import CSV_PATH
+
+# Tamanho do compactor do topo (erro de rank ~1,7/K)
+K = 200
+# Abaixo disto os valores são guardados e os quantis são exatos
+EXACT_LIMIT = 10_000
+# Razão de capacidade entre níveis vizinhos
+CAPACITY_RATIO = 2 / 3
+
+DEFAULT_PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+# Colunas do catálogo tipado resumidas por padrão
+DISTRIBUTION_COLUMNS = {
+    'price': 'Preço (USD)',
+    'channels_max': 'Canais',
+    'max_fs_hz': 'Taxa de amostragem (Hz)',
+    'studies': 'Estudos'
+}
+
+
+# ============================================================================
+# SKETCH
+# ============================================================================
+
+def new_sketch(k=K, exact_limit=EXACT_LIMIT, seed=0):
+    """
+    Sketch vazio.
+
+    Args:
+        k: Capacidade do nível mais alto (precisão)
+        exact_limit: Valores guardados sem compactar (None = sempre exato)
+        seed: Semente dos sorteios da compactação (resultado reprodutível)
+    """
+    return {
+        'k': k,
+        'exact_limit': exact_limit,
+        'n': 0,
+        'min': None,
+        'max': None,
+        'exact': True,
+        'levels': [np.empty(0)],
+        'rng': np.random.default_rng(seed)
+    }
+
+
+def _capacity(sketch, level):
+    height = len(sketch['levels'])
+    return max(2, math.ceil(sketch['k'] * CAPACITY_RATIO ** (height - 1 - level)))
+
+
+def _compress(sketch):
+    """Compacta os níveis acima da capacidade até todos caberem"""
+    levels = sketch['levels']
+    level = 0
+    while level < len(levels):
+        items = levels[level]
+        if len(items) <= _capacity(sketch, level):
+            level += 1
+            continue
+        items = np.sort(items)
+        # Com número ímpar de itens, o maior fica no nível (peso preservado)
+        keep = items[-1:] if len(items) % 2 else items[:0]
+        pairs = items[:len(items) - len(keep)]
+        promoted = pairs[sketch['rng'].integers(0, 2)::2]
+        if level + 1 == len(levels):
+            levels.append(np.empty(0))
+        levels[level] = keep
+        levels[level + 1] = np.concatenate([levels[level + 1], promoted])
+        # Um nível novo reduz a capacidade dos de baixo: recomeça do início
+        level = 0
+    return sketch
+
+
+def _switch_mode(sketch):
+    limit = sketch['exact_limit']
+    if sketch['exact'] and limit is not None and sketch['n'] > limit:
+        sketch['exact'] = False
+    if not sketch['exact']:
+        _compress(sketch)
+    return sketch
+
+
+def update(sketch, values):
+    """Acrescenta um lote de valores (NaN e None são ignorados)"""
+    values = np.asarray(values, dtype=float).ravel()
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return sketch
+    sketch['n'] += len(values)
+    low, high = values.min(), values.max()
+    sketch['min'] = low if sketch['min'] is None else min(sketch['min'], low)
+    sketch['max'] = high if sketch['max'] is None else max(sketch['max'], high)
+    sketch['levels'][0] = np.concatenate([sketch['levels'][0], values])
+    return _switch_mode(sketch)
+
+
+def merge(a, b):
+    """Sketch com os valores de a e de b (nível a nível)"""
+    merged = new_sketch(max(a['k'], b['k']), a['exact_limit'])
+    merged['rng'] = a['rng']
+    merged['n'] = a['n'] + b['n']
+    bounds = [s for s in (a, b) if s['n']]
+    merged['min'] = min(s['min'] for s in bounds) if bounds else None
+    merged['max'] = max(s['max'] for s in bounds) if bounds else None
+    merged['exact'] = a['exact'] and b['exact']
+    height = max(len(a['levels']), len(b['levels']))
+    merged['levels'] = [
+        np.concatenate([s['levels'][h] for s in (a, b) if h < len(s['levels'])])
+        for h in range(height)
+    ]
+    return _switch_mode(merged)
+
+
+def quantiles(sketch, qs):
+    """
+    Quantis (frações entre 0 e 1). Exatos (interpolação linear) no modo
+    exato; no KLL, o item cujo peso acumulado alcança q*n.
+    """
+    qs = np.atleast_1d(np.asarray(qs, dtype=float))
+    if sketch['n'] == 0:
+        return np.full(len(qs), np.nan)
+    if sketch['exact']:
+        return np.quantile(sketch['levels'][0], qs)
+
+    values = np.concatenate(sketch['levels'])
+    weights = np.concatenate([np.full(len(items), 2.0 ** h) for h, items in enumerate(sketch['levels'])])
+    order = np.argsort(values, kind='stable')
+    values, cumulative = values[order], np.cumsum(weights[order])
+    index = np.searchsorted(cumulative, qs * cumulative[-1], side='left')
+    result = values[np.minimum(index, len(values) - 1)]
+    # Extremos exatos
+    result = np.where(qs <= 0, sketch['min'], result)
+    return np.where(qs >= 1, sketch['max'], result)
+
+
+def summary(sketch, percentiles=DEFAULT_PERCENTILES):
+    """
+    Resumo da distribuição.
+
+    Returns:
+        {'n', 'exact', 'min', 'max', 'median', 'q1', 'q3', 'iqr', 'percentiles': {p: valor}}
+    """
+    percentiles = list(percentiles)
+    values = quantiles(sketch, [0.25, 0.5, 0.75] + [p / 100 for p in percentiles])
+    q1, median, q3 = values[:3]
+    return {
+        'n': sketch['n'],
+        'exact': sketch['exact'],
+        'min': sketch['min'],
+        'max': sketch['max'],
+        'median': median,
+        'q1': q1,
+        'q3': q3,
+        'iqr': q3 - q1,
+        'percentiles': dict(zip(percentiles, values[3:]))
+    }
+
+
+# ============================================================================
+# CATÁLOGO
+# ============================================================================
+
+def column_sketches(catalog, columns=DISTRIBUTION_COLUMNS, sketches=None, exact=False):
+    """
+    Alimenta um sketch por coluna com um catálogo tipado (inteiro ou um bloco).
+    Preço e canais zero contam como ausentes, como nas demais análises.
+    """
+    if sketches is None:
+        sketches = {column: new_sketch(exact_limit=None if exact else EXACT_LIMIT) for column in columns}
+    for column in columns:
+        values = catalog[column]
+        if column in ('price', 'channels_max'):
+            values = values.where(values != 0)
+        update(sketches[column], values.to_numpy(dtype=float))
+    return sketches
+
+
+def format_distributions(summaries, labels=DISTRIBUTION_COLUMNS):
+    """Tabela de texto: n, mediana, IQR e percentis por coluna"""
+    first = next(iter(summaries.values()))
+    percentiles = list(first['percentiles'])
+    header = f"{'Variável':<26} {'n':>8} {'Mediana':>10} {'IQR':>10} " + \
+        ' '.join(f"{'P' + format(p, 'g'):>10}" for p in percentiles)
+    lines = [header, "-" * len(header)]
+    for column, s in summaries.items():
+        mode = '' if s['exact'] else ' ~'
+        cells = ' '.join(f"{v:>10,.1f}" for v in s['percentiles'].values())
+        lines.append(f"{labels.get(column, column)[:24] + mode:<26} {s['n']:>8,} "
+                     f"{s['median']:>10,.1f} {s['iqr']:>10,.1f} {cells}")
+    if any(not s['exact'] for s in summaries.values()):
+        lines.append(f"~ aproximado (sketch KLL, k={K}, erro de rank ~{1.7 / K:.1%})")
+    return "\n".join(lines)
+
+
+def main(csv_path=CSV_PATH, chunk_rows=50_000, percentiles=DEFAULT_PERCENTILES, exact=False):
+    """Percentis das colunas do catálogo lendo o CSV em blocos"""
+    from catalog import build_catalog
+    from chunked_analysis import read_chunks
+
+    sketches = None
+    for raw in read_chunks(csv_path, chunk_rows):
+        sketches = column_sketches(build_catalog(raw), sketches=sketches, exact=exact)
+    if sketches is None:
+        raise ValueError(f"CSV sem linhas: {csv_path}")
+    summaries = {column: summary(sketch, percentiles) for column, sketch in sketches.items()}
+    print(format_distributions(summaries))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Percentis das colunas numéricas do catálogo")
+    parser.add_argument('--csv', default=CSV_PATH, help="CSV da Table1")
+    parser.add_argument('--chunk-rows', type=int, default=50_000, help="linhas por bloco")
+    parser.add_argument('--percentiles', type=float, nargs='+', default=list(DEFAULT_PERCENTILES))
+    parser.add_argument('--exact', action='store_true', help="guarda todos os valores (quantis exatos)")
+    args = parser.parse_args()
+    main(args.csv, args.chunk_rows, args.percentiles, args.exact)
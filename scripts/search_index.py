@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+Índice invertido com ranking BM25 sobre as seções e os comentários
+Indexa as seções do artigo (Artigo-Partes), os comentários individuais dos
+revisores (Comentarios_Individuais) e os clusters de alterações
+(Alterações/Cluster*). O índice fica em disco (pickle em .cache/) e é
+atualizado de forma incremental: só os arquivos com tamanho/mtime
+diferentes são relidos, e só os com hash diferente são reindexados. As
+consultas usam apenas o índice, sem reler os arquivos.
+
+Uso:
+    python search_index.py index
+    python search_index.py search "R3C3 Gini" [--top 10]
+"""
+
+import argparse
+import glob
+import hashlib
+import math
+import os
+import pickle
+import re
+import sys
+import unicodedata
+from collections import Counter
+
+# Configuração de caminhos (sem pandas: consultas precisam ser rápidas)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+INDEX_PATH = os.path.join(PROJECT_DIR, ".cache", "search_index.pkl")
+
+# Incrementar sempre que a tokenização ou a estrutura mudar (reconstrói o índice)
+INDEX_VERSION = 1
+
+# Erros de um pickle ilegível (os de catalog.CACHE_ERRORS, sem importar o pandas)
+CACHE_ERRORS = (pickle.UnpicklingError, AttributeError, ImportError, ValueError, EOFError)
+
+# Padrões glob (relativos ao projeto) dos arquivos indexados
+DEFAULT_SOURCES = [
+    os.path.join("Artigo-Partes", "*.txt"),
+    os.path.join("Artigo-Partes-Lote", "*", "*.txt"),
+    os.path.join("Comentarios_Individuais", "*.txt"),
+    os.path.join("Alterações", "Comentarios_Individuais", "*.txt"),
+    os.path.join("Alterações", "Cluster*", "*.txt"),
+    os.path.join("Alterações", "Outros", "*.txt"),
+]
+
+# Parâmetros do BM25
+K1 = 1.5
+B = 0.75
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = set(
+    "a o e de da do das dos em no na nos nas um uma para por com que se ao aos "
+    "the of and to in on for with is are be by as an at or this that from it "
+    "which these was were".split()
+)
+
+
+# ============================================================================
+# TOKENIZAÇÃO
+# ============================================================================
+
+def normalize(text):
+    """Minúsculas e sem acentos ("Alterações" -> "alteracoes")"""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """Tokens alfanuméricos normalizados (códigos como R3C3 viram 'r3c3')"""
+    return [t for t in TOKEN_PATTERN.findall(normalize(text)) if t not in STOPWORDS]
+
+
+# ============================================================================
+# CONSTRUÇÃO E ATUALIZAÇÃO
+# ============================================================================
+
+def empty_index():
+    return {
+        'version': INDEX_VERSION,
+        # caminho relativo -> {'id', 'size', 'mtime', 'sha256', 'length'}
+        'documents': {},
+        # id -> {termo: frequência} (para remover um documento do índice)
+        'doc_terms': {},
+        # termo -> {id: frequência}
+        'postings': {},
+        'total_length': 0,
+        'next_id': 0
+    }
+
+
+def load_index(index_path=INDEX_PATH):
+    """Índice salvo (ou vazio se não existir, for de outra versão ou estiver ilegível)"""
+    if os.path.exists(index_path):
+        try:
+            with open(index_path, 'rb') as f:
+                index = pickle.load(f)
+        except CACHE_ERRORS:
+            # Pickle truncado ou de outra versão: reconstrói
+            return empty_index()
+        if index.get('version') == INDEX_VERSION:
+            return index
+    return empty_index()
+
+
+def save_index(index, index_path=INDEX_PATH):
+    """Grava o índice de forma atômica"""
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, index_path)
+
+
+def source_files(project_dir=PROJECT_DIR, sources=None):
+    """Caminhos relativos dos arquivos a indexar"""
+    paths = set()
+    for pattern in (DEFAULT_SOURCES if sources is None else sources):
+        for path in glob.glob(os.path.join(project_dir, pattern)):
+            if os.path.isfile(path):
+                paths.add(os.path.relpath(path, project_dir))
+    return sorted(paths)
+
+
+def _remove_document(index, rel_path):
+    doc = index['documents'].pop(rel_path)
+    for term in index['doc_terms'].pop(doc['id']):
+        postings = index['postings'][term]
+        del postings[doc['id']]
+        if not postings:
+            del index['postings'][term]
+    index['total_length'] -= doc['length']
+
+
+def _add_document(index, rel_path, text, stat, sha256):
+    doc_id = index['next_id']
+    index['next_id'] += 1
+
+    counts = Counter(tokenize(text))
+    for term, tf in counts.items():
+        index['postings'].setdefault(term, {})[doc_id] = tf
+    index['doc_terms'][doc_id] = dict(counts)
+
+    length = sum(counts.values())
+    index['documents'][rel_path] = {
+        'id': doc_id,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'sha256': sha256,
+        'length': length
+    }
+    index['total_length'] += length
+
+
+def update_index(index, project_dir=PROJECT_DIR, sources=None):
+    """
+    Sincroniza o índice com os arquivos atuais.
+
+    Returns:
+        Contagens {'adicionados', 'atualizados', 'removidos', 'revalidados',
+        'inalterados'}
+    """
+    stats = Counter()
+    current = source_files(project_dir, sources)
+
+    for rel_path in set(index['documents']) - set(current):
+        _remove_document(index, rel_path)
+        stats['removidos'] += 1
+
+    for rel_path in current:
+        path = os.path.join(project_dir, rel_path)
+        stat = os.stat(path)
+        doc = index['documents'].get(rel_path)
+
+        # Tamanho e mtime iguais: nem abre o arquivo
+        if doc and doc['size'] == stat.st_size and doc['mtime'] == stat.st_mtime:
+            stats['inalterados'] += 1
+            continue
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        sha256 = hashlib.sha256(data).hexdigest()
+
+        if doc and doc['sha256'] == sha256:
+            # Mesmo conteúdo com outro mtime: só atualiza o registro
+            doc['mtime'] = stat.st_mtime
+            stats['revalidados'] += 1
+            continue
+
+        if doc:
+            _remove_document(index, rel_path)
+            stats['atualizados'] += 1
+        else:
+            stats['adicionados'] += 1
+        _add_document(index, rel_path, data.decode('utf-8', errors='replace'), stat, sha256)
+
+    return {key: stats[key] for key in ('adicionados', 'atualizados', 'removidos', 'revalidados', 'inalterados')}
+
+
+def build_index(project_dir=PROJECT_DIR, index_path=INDEX_PATH, sources=None):
+    """Carrega, atualiza e grava o índice; devolve (índice, contagens)"""
+    index = load_index(index_path)
+    changes = update_index(index, project_dir, sources)
+    if sum(changes.values()) > changes['inalterados'] or not os.path.exists(index_path):
+        save_index(index, index_path)
+    return index, changes
+
+
+# ============================================================================
+# CONSULTA
+# ============================================================================
+
+def bm25_scores(index, query, k1=K1, b=B):
+    """Pontuação BM25 de cada documento que contém algum termo da consulta"""
+    n_docs = len(index['documents'])
+    scores = Counter()
+    if n_docs == 0:
+        return scores
+    avgdl = index['total_length'] / n_docs
+    lengths = {doc['id']: doc['length'] for doc in index['documents'].values()}
+
+    for term in set(tokenize(query)):
+        postings = index['postings'].get(term)
+        if not postings:
+            continue
+        df = len(postings)
+        idf = math.log((n_docs - df + 0.5) / (df + 0.5) + 1)
+        for doc_id, tf in postings.items():
+            norm = k1 * (1 - b + b * lengths[doc_id] / avgdl)
+            scores[doc_id] += idf * tf * (k1 + 1) / (tf + norm)
+    return scores
+
+
+def search(index, query, top=10):
+    """Documentos mais relevantes: lista de (caminho relativo, pontuação)"""
+    paths = {doc['id']: path for path, doc in index['documents'].items()}
+    scores = bm25_scores(index, query)
+    return [(paths[doc_id], score) for doc_id, score in scores.most_common(top)]
+
+
+def best_line(path, query):
+    """Linha do arquivo com mais termos da consulta (para exibir o resultado)"""
+    terms = set(tokenize(query))
+    best, best_hits = '', 0
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                hits = len(terms & set(tokenize(line)))
+                if hits > best_hits:
+                    best, best_hits = line.strip(), hits
+    except OSError:
+        return ''
+    return best
+
+
+def run_index(project_dir=PROJECT_DIR, index_path=INDEX_PATH):
+    """Atualiza o índice e imprime o resumo"""
+    index, changes = build_index(project_dir, index_path)
+    print(f"✅ Índice: {len(index['documents'])} arquivo(s), {len(index['postings']):,} termos")
+    print("   " + ", ".join(f"{count} {name}" for name, count in changes.items()))
+
+
+def run_search(query, top=10, project_dir=PROJECT_DIR, index_path=INDEX_PATH, update=False, snippet=True):
+    """Consulta o índice (criado na primeira consulta) e imprime os resultados"""
+    if update or not os.path.exists(index_path):
+        index, _ = build_index(project_dir, index_path)
+    else:
+        index = load_index(index_path)
+
+    results = search(index, query, top)
+    if not results:
+        print("Nenhum resultado.")
+        return
+    for rank, (rel_path, score) in enumerate(results, start=1):
+        print(f"{rank:>2}. {score:7.3f}  {rel_path}")
+        if snippet:
+            line = best_line(os.path.join(project_dir, rel_path), query)
+            if line:
+                print(f"              {line[:100]}")
+
+
+def add_arguments(commands):
+    """Subcomandos 'index' e 'search' (usados também por brain_devices)"""
+    index = commands.add_parser('index', help="cria/atualiza o índice BM25 de seções e comentários")
+    search_parser = commands.add_parser('search', help="consulta o índice BM25")
+    search_parser.add_argument('query', nargs='+', help="termos da consulta")
+    search_parser.add_argument('--top', type=int, default=10, help="número de resultados")
+    search_parser.add_argument('--update', action='store_true', help="atualiza o índice antes de consultar")
+    search_parser.add_argument('--no-snippet', action='store_true',
+                               help="não lê os arquivos para mostrar a linha")
+    for sub in (index, search_parser):
+        sub.add_argument('--project-dir', default=PROJECT_DIR, help="raiz do projeto")
+        sub.add_argument('--index', default=INDEX_PATH, help="arquivo do índice")
+    return index, search_parser
+
+
+def run_command(args):
+    if args.command == 'index':
+        run_index(args.project_dir, args.index)
+    else:
+        run_search(' '.join(args.query), args.top, args.project_dir, args.index,
+                   update=args.update, snippet=not args.no_snippet)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Índice BM25 das seções e comentários")
+    commands = parser.add_subparsers(dest='command', metavar='COMANDO')
+    commands.required = True
+    add_arguments(commands)
+    run_command(parser.parse_args(argv))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
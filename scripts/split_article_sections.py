@@ -1,6 +1,10 @@
 """
 Script para dividir o artigo revisado em seções separadas.
 
+Os títulos de seção de um template de periódico são compilados em um único
+regex de alternância e localizados em uma só passada (finditer). O modo em
+lote divide todos os documentos de um diretório em paralelo.
+
 Uso:
     python split_article_sections.py
 """
@@ -8,53 +12,149 @@ Uso:
 import json
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from page_store import load_text
+
+
+# Títulos de seção por template: (regex do título, nome do arquivo[, 'inline'])
+# Os títulos ocupam uma linha inteira; maiúsculas/minúsculas são ignoradas.
+# Títulos 'inline' começam a linha e o texto da seção segue na mesma linha
+# ("ABSTRACT This scoping review...", layout de submissão do IEEE)
+SECTION_TEMPLATES = {
+    'ieee_access': [
+        (r'Abstract', 'Abstract'),
+        (r'Keywords', 'Keywords'),
+        (r'Introduction', 'Introduction'),
+        (r'Background', 'Background'),
+        (r'Method', 'Method'),
+        (r'Results', 'Results'),
+        (r'Table Description', 'Table_Description'),
+        (r'Discussion of Results', 'Discussion'),
+        (r'Limitations of Technologies Evaluated', 'Limitations'),
+        (r'Conclusion', 'Conclusion'),
+        (r'Acknowledgment', 'Acknowledgment'),
+        (r'Bibliography', 'Bibliography'),
+    ],
+    'imrad': [
+        (r'Abstract', 'Abstract'),
+        (r'Key ?words|Index Terms', 'Keywords'),
+        (r'(?:\d+\.?\s*)?Introduction', 'Introduction'),
+        (r'(?:\d+\.?\s*)?(?:Materials and )?Methods?', 'Methods'),
+        (r'(?:\d+\.?\s*)?Results', 'Results'),
+        (r'(?:\d+\.?\s*)?Discussion', 'Discussion'),
+        (r'(?:\d+\.?\s*)?Conclusions?', 'Conclusion'),
+        (r'Acknowledge?ments?', 'Acknowledgment'),
+        (r'References|Bibliography', 'References'),
+    ],
+    # PDF de submissão (LaTeX IEEE): mesmos nomes de arquivo do 'ieee_access'
+    'ieee_submission': [
+        (r'ABSTRACT', 'Abstract', 'inline'),
+        (r'INDEX TERMS', 'Keywords', 'inline'),
+        (r'[IVX]+\.\s*INTRODUCTION', 'Introduction'),
+        (r'[IVX]+\.\s*BACKGROUND', 'Background'),
+        (r'[IVX]+\.\s*METHODS?', 'Method'),
+        (r'[IVX]+\.\s*RESULTS', 'Results'),
+        (r'[A-Z]\.\s*TABLE DESCRIPTION', 'Table_Description'),
+        (r'[A-Z]\.\s*DISCUSSION OF RESULTS', 'Discussion'),
+        (r'[A-Z]\.\s*LIMITATIONS OF TECHNOLOGIES EVALUATED', 'Limitations'),
+        (r'[IVX]+\.\s*CONCLUSIONS?', 'Conclusion'),
+        (r'ACKNOWLEDGE?MENTS?', 'Acknowledgment'),
+        (r'REFERENCES', 'Bibliography'),
+    ],
+}
+
+DEFAULT_TEMPLATE = 'ieee_access'
+
+
+def load_template(template=DEFAULT_TEMPLATE) -> list:
+    """
+    Títulos de um template pelo nome ou de um arquivo JSON.
+    
+    O JSON é uma lista de pares [regex do título, nome da seção], com um
+    terceiro item "inline" opcional.
+    """
+    if isinstance(template, (list, tuple)):
+        return [tuple(item) for item in template]
+    if template in SECTION_TEMPLATES:
+        return SECTION_TEMPLATES[template]
+    if str(template).endswith('.json') and os.path.exists(template):
+        with open(template, 'r', encoding='utf-8') as f:
+            return [tuple(item) for item in json.load(f)]
+    raise ValueError(f"Template de seções desconhecido: {template!r}")
+
+
+def _is_inline(heading) -> bool:
+    return len(heading) > 2 and heading[2] == 'inline'
+
+
+def compile_headings(headings: list):
+    """Uma alternância com um grupo nomeado por título (linha inteira ou inline)"""
+    alternatives = '|'.join(
+        f'(?P<s{i}>{heading[0]})' + (r'(?=[ \t]+\S)' if _is_inline(heading) else r'\s*$')
+        for i, heading in enumerate(headings)
+    )
+    return re.compile(rf'^(?:{alternatives})', re.MULTILINE | re.IGNORECASE)
+
 
-def split_article_into_sections(json_path: str, output_dir: str) -> dict:
+def locate_sections(texto_completo: str, headings: list) -> list:
+    """
+    Posição da primeira ocorrência de cada título, em uma única passada.
+    
+    Returns:
+        Lista de dicts com 'name', 'start', 'end' e 'inline', na ordem do
+        template ('end' é o fim do título)
+    """
+    names = {f's{i}': heading[1] for i, heading in enumerate(headings)}
+    inline = {f's{i}' for i, heading in enumerate(headings) if _is_inline(heading)}
+    found = {}
+    for match in compile_headings(headings).finditer(texto_completo):
+        key = match.lastgroup
+        # Só a primeira ocorrência de cada título conta
+        if key not in found:
+            found[key] = {'name': names[key], 'start': match.start(), 'end': match.end(),
+                          'inline': key in inline}
+            if len(found) == len(headings):
+                break
+    return [found[key] for key in names if key in found]
+
+
+def section_body(texto_completo: str, section: dict, section_end: int) -> str:
+    """Conteúdo de uma seção localizada, sem o título"""
+    if section.get('inline'):
+        # O texto começa logo depois do título, na mesma linha
+        return texto_completo[section['end']:section_end].strip()
+    
+    # Extrair o texto da seção (incluindo o título)
+    section_text = texto_completo[section['start']:section_end].strip()
+    
+    # Remover o título da seção do conteúdo (primeira linha)
+    lines = section_text.split('\n')
+    if len(lines) > 1:
+        return '\n'.join(lines[1:]).strip()
+    return section_text
+
+
+def split_article_into_sections(json_path: str, output_dir: str, template=DEFAULT_TEMPLATE,
+                                verbose: bool = True) -> dict:
     """
     Divide o artigo em seções baseado nos títulos identificados.
     
     Args:
-        json_path: Caminho para o arquivo JSON do artigo
+        json_path: Caminho do documento do artigo (.json, .jsonl ou sem extensão)
         output_dir: Diretório para salvar os arquivos TXT
+        template: Nome do template, arquivo JSON ou lista de (regex, nome)
+        verbose: Imprime cada arquivo criado
         
     Returns:
         Dicionário com as seções extraídas
     """
-    # Carregar o JSON
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    texto_completo = data.get('texto_completo', '')
-    
-    # Definir os padrões de seção (títulos em ordem de aparição)
-    section_patterns = [
-        (r'^Abstract\s*$', 'Abstract'),
-        (r'^Keywords\s*$', 'Keywords'),
-        (r'^Introduction\s*$', 'Introduction'),
-        (r'^Background\s*$', 'Background'),
-        (r'^Method\s*$', 'Method'),
-        (r'^Results\s*$', 'Results'),
-        (r'^Table Description\s*$', 'Table_Description'),
-        (r'^Discussion of Results\s*$', 'Discussion'),
-        (r'^Limitations of Technologies Evaluated\s*$', 'Limitations'),
-        (r'^Conclusion\s*$', 'Conclusion'),
-        (r'^Acknowledgment\s*$', 'Acknowledgment'),
-        (r'^Bibliography\s*$', 'Bibliography'),
-    ]
+    # Carregar o texto (JSON antigo ou formato por páginas .jsonl + .txt)
+    texto_completo = load_text(json_path)
     
     # Encontrar as posições de cada seção
-    section_positions = []
-    
-    for pattern, name in section_patterns:
-        match = re.search(pattern, texto_completo, re.MULTILINE | re.IGNORECASE)
-        if match:
-            section_positions.append({
-                'name': name,
-                'start': match.start(),
-                'end': match.end()
-            })
+    section_positions = locate_sections(texto_completo, load_template(template))
     
     # Ordenar por posição
     section_positions.sort(key=lambda x: x['start'])
@@ -82,15 +182,7 @@ def split_article_into_sections(json_path: str, output_dir: str) -> dict:
         else:
             section_end = len(texto_completo)
         
-        # Extrair o texto da seção (incluindo o título)
-        section_text = texto_completo[section['start']:section_end].strip()
-        
-        # Remover o título da seção do conteúdo (primeira linha)
-        lines = section_text.split('\n')
-        if len(lines) > 1:
-            section_content = '\n'.join(lines[1:]).strip()
-        else:
-            section_content = section_text
+        section_content = section_body(texto_completo, section, section_end)
         
         # Numerar para manter ordem
         order = str(i + 1).zfill(2)
@@ -101,17 +193,93 @@ def split_article_into_sections(json_path: str, output_dir: str) -> dict:
         with open(output_path / filename, 'w', encoding='utf-8') as f:
             f.write(section_content)
         
-        print(f"✅ Criado: {filename} ({len(section_content):,} caracteres)")
+        if verbose:
+            print(f"✅ Criado: {filename} ({len(section_content):,} caracteres)")
     
     return sections
 
 
-def main():
+def find_documents(input_dir: str) -> list:
+    """
+    Documentos extraídos de um diretório (um por nome, .jsonl antes de .json).
+    """
+    documents = {}
+    for path in sorted(Path(input_dir).iterdir()):
+        if path.name.startswith('_') or path.suffix not in ('.json', '.jsonl'):
+            continue
+        if path.stem not in documents or path.suffix == '.jsonl':
+            documents[path.stem] = path
+    return list(documents.values())
+
+
+def _split_one(json_path: str, output_dir: str, template) -> tuple:
+    """Executado em um processo do pool: (nome, nº de seções ou erro)"""
+    try:
+        sections = split_article_into_sections(json_path, output_dir, template, verbose=False)
+        return Path(json_path).stem, len(sections)
+    except Exception as e:
+        return Path(json_path).stem, e
+
+
+def split_directory(input_dir: str, output_root: str, template=DEFAULT_TEMPLATE, workers: int = None) -> dict:
+    """
+    Divide todos os documentos de um diretório, um por processo.
+    
+    Args:
+        input_dir: Diretório com os documentos extraídos (.json / .jsonl)
+        output_root: Diretório de saída (um subdiretório por documento)
+        template: Template de títulos usado em todos os documentos
+        workers: Número de processos (None = todos os núcleos)
+        
+    Returns:
+        {nome do documento: nº de seções criadas ou a exceção}
+    """
+    documents = find_documents(input_dir)
+    # Valida o template antes de distribuir o trabalho
+    headings = load_template(template)
+    
+    jobs = [(str(path), str(Path(output_root) / path.stem), headings) for path in documents]
+    workers = min(workers or os.cpu_count(), len(jobs)) if jobs else 1
+    
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_split_one, *zip(*jobs)))
+    else:
+        results = [_split_one(*job) for job in jobs]
+    return dict(results)
+
+
+def main_batch(input_dir, output_dir=None, template=DEFAULT_TEMPLATE, workers=None):
+    project_dir = Path(__file__).parent.parent
+    output_dir = Path(output_dir) if output_dir else project_dir / "Artigo-Partes-Lote"
+    
+    print("=" * 60)
+    print("📄 DIVISOR DE SEÇÕES DO ARTIGO (LOTE)")
+    print("=" * 60)
+    print(f"\n📥 Entrada: {input_dir}")
+    print(f"📤 Saída:   {output_dir}\n")
+    print("-" * 60 + "\n")
+    
+    results = split_directory(str(input_dir), str(output_dir), template, workers)
+    for name, result in results.items():
+        if isinstance(result, Exception):
+            print(f"❌ {name}: {result}")
+        else:
+            print(f"✅ {name}: {result} seções")
+    
+    print("\n" + "-" * 60)
+    print(f"\n✨ Total: {len(results)} documento(s) processado(s)!")
+
+
+def main(json_path=None, output_dir=None, template=DEFAULT_TEMPLATE, input_dir=None, workers=None):
+    if input_dir:
+        return main_batch(input_dir, output_dir, template, workers)
+    
     script_dir = Path(__file__).parent
     project_dir = script_dir.parent
     
-    json_path = project_dir / "textos_json" / "Artigo-Revisado.json"
-    output_dir = project_dir / "Artigo-Partes"
+    json_path = Path(json_path) if json_path else project_dir / "textos_json" / "Artigo-Revisado"
+    output_dir = Path(output_dir) if output_dir else project_dir / "Artigo-Partes"
     
     print("=" * 60)
     print("📄 DIVISOR DE SEÇÕES DO ARTIGO")
@@ -120,7 +288,7 @@ def main():
     print(f"📤 Saída:   {output_dir}\n")
     print("-" * 60 + "\n")
     
-    sections = split_article_into_sections(str(json_path), str(output_dir))
+    sections = split_article_into_sections(str(json_path), str(output_dir), template)
     
     print("\n" + "-" * 60)
     print(f"\n✨ Total: {len(sections)} seções criadas!")
@@ -1,101 +1,165 @@
 """
 Script para dividir o documento de alterações necessárias em seções por revisor e comentário.
 
+Todos os marcadores (Decision Letter, Reviewer N, RnCm, RnAQm, Additional
+Questions, FINAL STATEMENT) são encontrados em uma única varredura do texto
+e as seções são recortadas pelos offsets, em tempo linear. Aceita qualquer
+número de revisores e várias rodadas (uma nova "Decision Letter" abre a
+rodada seguinte).
+
 Uso:
     python split_reviewer_comments.py
 """
 
-import json
-import os
 import re
 from pathlib import Path
 
+from page_store import load_text
+
+
+# Um único regex com todos os marcadores; o grupo nomeado que casa define o
+# tipo. Todos os marcadores começam uma linha, então menções no meio do texto
+# ("See the Decision Letter above") não abrem seções
+MARKER_PATTERN = re.compile(
+    r'(?m)^(?:Decision Letter(?P<decision>)'
+    r'|Additional Questions(?:[ \t]+Reviewer[ \t]+\d+)?(?P<questions>)'
+    r'|Reviewer[ \t]+(?P<reviewer>\d+)\s*\n'
+    r'|R(?P<code>\d+(?:C|AQ)\d+)\.?\s*\n'
+    r'|FINAL STATEMENT(?P<final>))'
+)
+
+
+def tokenize_markers(text: str) -> list:
+    """
+    Marcadores do documento em ordem, com o offset de início.
+    
+    Returns:
+        Lista de dicts com "tipo" ("decision", "questions", "reviewer",
+        "code" ou "final"), "inicio", "rodada" e, conforme o tipo,
+        "revisor" ou "codigo"
+    """
+    markers = []
+    round_number = 0
+    
+    for match in MARKER_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == 'decision':
+            round_number += 1
+        
+        marker = {'tipo': kind, 'inicio': match.start(), 'rodada': max(round_number, 1)}
+        if kind == 'reviewer':
+            marker['revisor'] = int(match.group('reviewer'))
+        elif kind == 'code':
+            marker['codigo'] = 'R' + match.group('code')
+        markers.append(marker)
+    
+    return markers
+
+
+def _round_suffix(marker: dict) -> str:
+    return '' if marker['rodada'] == 1 else f"_round{marker['rodada']}"
+
+
+def segment_document(text: str, markers: list) -> tuple:
+    """
+    Recorta o texto pelos marcadores.
+    
+    Cada seção vai do seu marcador até o próximo marcador que a encerra:
+    - Decision Letter: próximo Reviewer N
+    - Reviewer N: próximo Reviewer N, FINAL STATEMENT ou nova Decision Letter
+    - comentários (RnCm, RnAQm): qualquer marcador seguinte
+    - FINAL STATEMENT: nova Decision Letter ou fim do texto
+    
+    Returns:
+        (seções [(nome, texto)], comentários [(código, texto)]) em ordem
+    """
+    # Próximo marcador de cada grupo de fronteiras, calculado de trás para frente
+    n = len(markers)
+    end = len(text)
+    next_any = [end] * (n + 1)
+    next_reviewer = [end] * (n + 1)
+    next_section = [end] * (n + 1)
+    next_decision = [end] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        start, kind = markers[i]['inicio'], markers[i]['tipo']
+        next_any[i] = start
+        next_reviewer[i] = start if kind in ('reviewer', 'decision') else next_reviewer[i + 1]
+        next_section[i] = start if kind in ('reviewer', 'final', 'decision') else next_section[i + 1]
+        next_decision[i] = start if kind == 'decision' else next_decision[i + 1]
+    
+    sections = []
+    comments = []
+    for i, marker in enumerate(markers):
+        kind, start = marker['tipo'], marker['inicio']
+        suffix = _round_suffix(marker)
+        
+        if kind == 'decision':
+            sections.append((f"Decision_Letter{suffix}", text[start:next_reviewer[i + 1]].strip()))
+        elif kind == 'reviewer':
+            sections.append((f"Reviewer_{marker['revisor']}{suffix}", text[start:next_section[i + 1]].strip()))
+        elif kind == 'final':
+            sections.append((f"Final_Statement{suffix}", text[start:next_decision[i + 1]].strip()))
+        elif kind == 'code':
+            comments.append((marker['codigo'] + suffix, text[start:next_any[i + 1]].strip()))
+    
+    return sections, comments
+
 
 def split_reviewer_comments(json_path: str, output_dir: str) -> dict:
     """
     Divide o documento de revisão em seções por revisor e comentário.
     """
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    texto_completo = data.get('texto_completo', '')
+    # Carregar o texto (JSON antigo ou formato por páginas .jsonl + .txt)
+    texto_completo = load_text(json_path)
     
     # Criar diretório de saída
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
     
-    sections = {}
+    markers = tokenize_markers(texto_completo)
+    section_list, comment_list = segment_document(texto_completo, markers)
     
-    # Extrair o cabeçalho (Decision Letter)
-    header_match = re.search(r'^(Decision Letter.*?)(?=Reviewer 1)', texto_completo, re.DOTALL)
-    if header_match:
-        header_text = header_match.group(1).strip()
-        sections['00_Decision_Letter.txt'] = header_text
-        with open(output_path / '00_Decision_Letter.txt', 'w', encoding='utf-8') as f:
-            f.write(header_text)
-        print(f"✅ Criado: 00_Decision_Letter.txt ({len(header_text):,} caracteres)")
-    
-    # Padrões para identificar seções de revisores
-    reviewer_sections = [
-        (r'(Reviewer 1\s*\n.*?)(?=Reviewer 2|$)', 'Reviewer_1'),
-        (r'(Reviewer 2\s*\n.*?)(?=Reviewer 3|$)', 'Reviewer_2'),
-        (r'(Reviewer 3\s*\n.*?)(?=FINAL STATEMENT|$)', 'Reviewer_3'),
-        (r'(FINAL STATEMENT.*?)$', 'Final_Statement'),
-    ]
+    sections = {}
     
+    # Decision Letter da primeira rodada é o arquivo 00; as demais seções
+    # são numeradas na ordem em que aparecem
     order = 1
-    for pattern, name in reviewer_sections:
-        match = re.search(pattern, texto_completo, re.DOTALL)
-        if match:
-            content = match.group(1).strip()
+    for name, content in section_list:
+        if name == 'Decision_Letter':
+            filename = "00_Decision_Letter.txt"
+        else:
             filename = f"{str(order).zfill(2)}_{name}.txt"
-            sections[filename] = content
-            
-            with open(output_path / filename, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            print(f"✅ Criado: {filename} ({len(content):,} caracteres)")
             order += 1
+        sections[filename] = content
+        
+        with open(output_path / filename, 'w', encoding='utf-8') as f:
+            f.write(content)
+        
+        print(f"✅ Criado: {filename} ({len(content):,} caracteres)")
     
     # Também criar arquivos separados para cada comentário individual
     comments_dir = output_path / "Comentarios_Individuais"
     comments_dir.mkdir(parents=True, exist_ok=True)
     
-    # Padrão para identificar comentários (R1C0, R1C1, R2C0, etc.)
-    comment_pattern = r'(R[123]C\d+\.?\s*\n.*?)(?=R[123]C\d+\.|R[123]AQ\d+\.|Additional Questions|Reviewer \d|FINAL STATEMENT|$)'
-    aq_pattern = r'(R[123]AQ\d+\.?\s*\n.*?)(?=R[123]C\d+\.|R[123]AQ\d+\.|Reviewer \d|FINAL STATEMENT|$)'
-    
-    # Encontrar todos os comentários
-    comments = re.findall(comment_pattern, texto_completo, re.DOTALL)
-    additional_questions = re.findall(aq_pattern, texto_completo, re.DOTALL)
-    
-    all_items = comments + additional_questions
-    
-    for item in all_items:
-        item = item.strip()
-        if not item:
+    for code, content in comment_list:
+        if not content:
             continue
-            
-        # Extrair o código do comentário
-        code_match = re.match(r'(R[123](?:C|AQ)\d+)', item)
-        if code_match:
-            code = code_match.group(1)
-            filename = f"{code}.txt"
-            
-            with open(comments_dir / filename, 'w', encoding='utf-8') as f:
-                f.write(item)
-            
-            print(f"   📝 {filename}")
+        
+        filename = f"{code}.txt"
+        with open(comments_dir / filename, 'w', encoding='utf-8') as f:
+            f.write(content)
+        
+        print(f"   📝 {filename}")
     
     return sections
 
 
-def main():
+def main(json_path=None, output_dir=None):
     script_dir = Path(__file__).parent
     project_dir = script_dir.parent
     
-    json_path = project_dir / "textos_json" / "Altereções-necessárias.json"
-    output_dir = project_dir / "Alterações"
+    json_path = Path(json_path) if json_path else project_dir / "textos_json" / "Altereções-necessárias"
+    output_dir = Path(output_dir) if output_dir else project_dir / "Alterações"
     
     print("=" * 60)
     print("📋 DIVISOR DE COMENTÁRIOS DE REVISORES")
@@ -104,10 +168,10 @@ def main():
     print(f"📤 Saída:   {output_dir}\n")
     print("-" * 60 + "\n")
     
-    sections = split_reviewer_comments(str(json_path), str(output_dir))
+    split_reviewer_comments(str(json_path), str(output_dir))
     
     print("\n" + "-" * 60)
-    print(f"\n✨ Divisão concluída!")
+    print("\n✨ Divisão concluída!")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Gerador de catálogos sintéticos no formato da Table1_v12
+Mesmas 20 colunas, na mesma ordem, com os valores "sujos" do CSV real:
+células com várias opções ("8 | 16 | 32") e quebras de linha, preços
+">1,300", marcadores "---" e "-", taxas em Hz e kHz, porcentagens com
+vírgula decimal e espaços sobrando. As colunas descritivas são sorteadas
+das frequências do CSV real; as numéricas (ano, canais, taxa, preço,
+estudos, inclusão) são geradas nos formatos que os parsers do catalog
+precisam tratar.
+
+O CSV é gravado em blocos (cada bloco com sua própria semente derivada
+por SeedSequence.spawn), então 1M+ linhas não exigem o catálogo inteiro
+em memória. Mesma semente, número de linhas e tamanho de bloco geram o
+mesmo arquivo.
+
+Uso:
+    python synthetic_catalog.py --rows 100000 [--output CSV] [--seed 42]
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from catalog import CSV_PATH, PROJECT_DIR
+
+OUTPUT_PATH = os.path.join(PROJECT_DIR, ".cache", "synthetic", "Table1_sintetica.csv")
+
+COLUMNS = [
+    'Technology', 'Model', 'Type', 'Manufacturer', 'Origin', 'Year of first appearance',
+    'Sensor Type', 'Sensor Technology', 'Channels', 'Positioning', 'Wireless Connectivity',
+    'Sampling Rate', 'ADC resolution', 'Raw data access', 'Bundled Software',
+    'Data Synchronization', 'Auxiliary capabilities', 'Price (USD)', 'Studies Found',
+    'Inclusion (%)'
+]
+
+# Colunas sorteadas com as frequências do CSV real (valores copiados como estão)
+EMPIRICAL_COLUMNS = [
+    'Technology', 'Type', 'Origin', 'Sensor Type', 'Sensor Technology', 'Positioning',
+    'Wireless Connectivity', 'ADC resolution', 'Raw data access', 'Bundled Software',
+    'Data Synchronization', 'Auxiliary capabilities'
+]
+
+CHUNK_ROWS = 100_000
+
+SYLLABLES = np.array(['neu', 'ro', 'brain', 'cor', 'tex', 'eeg', 'flex', 'mind', 'nir', 'wave',
+                      'sync', 'lab', 'mo', 'bi', 'sense', 'quick', 'smart', 'al', 'pha', 'io'])
+VARIANTS = np.array(['PRO', 'Lite', 'Kids', 'Mini', 'X', 'MKII', 'Research', 'Flex'])
+CHANNEL_OPTIONS = np.array([1, 2, 4, 6, 8, 14, 16, 20, 24, 32, 64, 128])
+RATES = np.array([86, 128, 250, 256, 300, 500, 512, 600, 1000, 2000, 4000, 16000])
+
+
+def empirical_pools(csv_path=CSV_PATH):
+    """Valores distintos e frequências de cada coluna do CSV real"""
+    real = pd.read_csv(csv_path, encoding='utf-8', dtype=str, keep_default_na=False)
+    pools = {}
+    for column in EMPIRICAL_COLUMNS:
+        counts = real[column].value_counts()
+        pools[column] = (counts.index.to_numpy(dtype=object), (counts / counts.sum()).to_numpy())
+    return pools
+
+
+def _choice(rng, pool, n):
+    values, weights = pool
+    return values[rng.choice(len(values), size=n, p=weights)]
+
+
+def _join(parts, separator):
+    """Concatena colunas de texto elemento a elemento"""
+    result = parts[0]
+    for part in parts[1:]:
+        result = result + separator + part
+    return result
+
+
+def _models(rng, n, offset):
+    """Nomes de modelo únicos; parte com variantes em outra linha ("DSI\\n7 | 24")"""
+    s = pd.Series(SYLLABLES[rng.integers(0, len(SYLLABLES), n)]).str.capitalize()
+    s = s + pd.Series(SYLLABLES[rng.integers(0, len(SYLLABLES), n)])
+    s = s + ' ' + pd.Series(np.arange(offset, offset + n)).astype(str)
+
+    variants = _join([pd.Series(VARIANTS[rng.integers(0, len(VARIANTS), n)]) for _ in range(2)], ' | ')
+    kind = rng.random(n)
+    s = s.where(kind >= 0.15, s + '\n' + variants)
+    s = s.where((kind < 0.15) | (kind >= 0.2), s + ' | ' + variants)
+    # Espaços sobrando, como em " NirSmart | NirSmart II" e "neuroNicle FX2 "
+    s = s.where(rng.random(n) >= 0.05, s + ' ')
+    return s
+
+
+def _manufacturers(rng, n):
+    count = max(20, n // 4)
+    ids = np.minimum(rng.zipf(1.3, n), count)
+    names = 'Maker' + pd.Series(ids).astype(str)
+    return names.where(rng.random(n) >= 0.1, names + ' ')
+
+
+def _years(rng, n):
+    years = pd.Series(rng.integers(2008, 2026, n)).astype(str)
+    return years.where(rng.random(n) >= 0.04, '-')
+
+
+def _channels(rng, n):
+    first = rng.integers(0, len(CHANNEL_OPTIONS) - 3, n)
+    single = pd.Series(CHANNEL_OPTIONS[first]).astype(str)
+    multi = _join([pd.Series(CHANNEL_OPTIONS[first + k]).astype(str) for k in range(3)], ' | ')
+    return single.where(rng.random(n) >= 0.2, multi)
+
+
+def _sampling_rates(rng, n):
+    index = rng.integers(0, len(RATES) - 1, n)
+    low, high = RATES[index], RATES[index + 1]
+    hz = pd.Series(low).astype(str) + ' Hz'
+    # 1000 -> "1 kHz", 16000 -> "16 kHz"
+    khz = pd.Series(low // 1000).astype(str) + ' kHz'
+    multi = pd.Series(low).astype(str) + ' | ' + pd.Series(high).astype(str) + 'Hz '
+
+    kind = rng.random(n)
+    rates = hz.where(~((low >= 1000) & (low % 1000 == 0)), khz)
+    rates = rates.where(kind >= 0.15, multi)
+    return rates.where(kind < 0.88, '---')
+
+
+def _prices(rng, n):
+    values = np.round(rng.lognormal(7.0, 1.4, n), -1).astype(np.int64) + 100
+    prices = '>' + pd.Series(values).map('{:,}'.format)
+    return prices.where(rng.random(n) >= 0.57, '---')
+
+
+def generate_chunk(rng, n, pools, offset=0):
+    """Bloco de `n` linhas sintéticas (DataFrame só com texto, colunas da Table1)"""
+    studies = np.where(rng.random(n) < 0.4, 0, np.minimum(rng.zipf(1.6, n), 2000))
+    inclusion = studies / 3741 * 100
+    inclusion_text = (pd.Series(inclusion).map('{:.2f}'.format).str.replace('.', ',', regex=False) + '%')
+
+    data = {column: _choice(rng, pools[column], n) for column in EMPIRICAL_COLUMNS}
+    data.update({
+        'Model': _models(rng, n, offset).to_numpy(dtype=object),
+        'Manufacturer': _manufacturers(rng, n).to_numpy(dtype=object),
+        'Year of first appearance': _years(rng, n).to_numpy(dtype=object),
+        'Channels': _channels(rng, n).to_numpy(dtype=object),
+        'Sampling Rate': _sampling_rates(rng, n).to_numpy(dtype=object),
+        'Price (USD)': _prices(rng, n).to_numpy(dtype=object),
+        'Studies Found': studies.astype(str),
+        # Sem estudos a inclusão fica vazia, como no CSV real
+        'Inclusion (%)': inclusion_text.where(studies > 0, '').to_numpy(dtype=object),
+    })
+    return pd.DataFrame(data, columns=COLUMNS)
+
+
+def generate_catalog(n_rows, seed=42, csv_path=CSV_PATH, chunk_rows=CHUNK_ROWS):
+    """Catálogo sintético inteiro em memória (para tamanhos pequenos)"""
+    return pd.concat(list(iter_chunks(n_rows, seed, csv_path, chunk_rows)), ignore_index=True)
+
+
+def iter_chunks(n_rows, seed=42, csv_path=CSV_PATH, chunk_rows=CHUNK_ROWS):
+    """Blocos do catálogo sintético, cada um com a sua semente"""
+    pools = empirical_pools(csv_path)
+    n_chunks = max(1, -(-n_rows // chunk_rows))
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    for i, child in enumerate(seeds):
+        offset = i * chunk_rows
+        n = min(chunk_rows, n_rows - offset)
+        if n > 0:
+            yield generate_chunk(np.random.default_rng(child), n, pools, offset)
+
+
+def write_catalog(output_path, n_rows, seed=42, csv_path=CSV_PATH, chunk_rows=CHUNK_ROWS):
+    """
+    Grava o catálogo sintético em CSV, bloco a bloco.
+
+    Args:
+        output_path: CSV de saída
+        n_rows: Número de linhas (dispositivos)
+        seed: Semente (mesma semente e tamanho -> mesmo arquivo)
+        csv_path: CSV real de onde vêm as frequências das colunas descritivas
+        chunk_rows: Linhas geradas por bloco
+
+    Returns:
+        Caminho do CSV gravado
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        for i, chunk in enumerate(iter_chunks(n_rows, seed, csv_path, chunk_rows)):
+            chunk.to_csv(f, index=False, header=(i == 0))
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def main(n_rows=1000, output_path=OUTPUT_PATH, seed=42):
+    write_catalog(output_path, n_rows, seed)
+    size_mb = os.path.getsize(output_path) / 1e6
+    print(f"✅ Catálogo sintético: {output_path} ({n_rows:,} linhas, {size_mb:.1f} MB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera um catálogo sintético no formato da Table1_v12")
+    parser.add_argument('--rows', type=int, default=1000, help="número de dispositivos")
+    parser.add_argument('--output', default=OUTPUT_PATH, help="CSV de saída")
+    parser.add_argument('--seed', type=int, default=42, help="semente do gerador")
+    args = parser.parse_args()
+    main(args.rows, args.output, args.seed)
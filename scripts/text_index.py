@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+"""
+Índice invertido das colunas de texto livre do catálogo
+Cada token normalizado ("imu", "lsl", "ag/agcl", "fp1", "10-20") aponta para
+as linhas (posições no catálogo, como em device_query) que o contêm, em
+arrays ordenados de inteiros. As consultas combinam esses arrays sem ler o
+texto de nenhum dispositivo:
+
+    sync:lsl aux:imu                  (AND implícito)
+    lsl AND (imu OR accelerometer)
+    sensor:ag/agcl NOT software:matlab
+    positioning:fp*                   (prefixo)
+
+Tokens compostos ("ag/agcl-coated") são indexados inteiros e em cada
+trecho contíguo das partes ("ag/agcl", "agcl-coated", "ag", "agcl",
+"coated"), então um termo composto acha o texto que o contém. Sem campo,
+o termo vale para qualquer uma das TEXT_COLUMNS.
+
+O índice fica em .cache/text_index.pkl com o hash do CSV. Quando o CSV
+muda, a reconstrução é incremental: só as linhas com texto novo são
+tokenizadas (as demais reaproveitam os tokens, pelo hash da linha) e as
+listas de linhas são remontadas a partir deles.
+
+Uso:
+    python text_index.py "sync:lsl aux:imu" [--limit N] [--rebuild]
+    python text_index.py --check [TERMO...]   (compara com a varredura do texto)
+"""
+
+import argparse
+import bisect
+import hashlib
+import os
+import pickle
+import re
+import time
+from collections import Counter
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from catalog import CACHE_DIR, CACHE_ERRORS, CSV_PATH, csv_hash
+from search_index import STOPWORDS, normalize
+
+INDEX_PATH = os.path.join(CACHE_DIR, "text_index.pkl")
+
+# Incrementar sempre que a tokenização ou a estrutura mudar (reconstrói o índice)
+INDEX_VERSION = 2
+
+# Campo da consulta -> coluna do CSV
+TEXT_COLUMNS = {
+    'aux': 'Auxiliary capabilities',
+    'software': 'Bundled Software',
+    'sync': 'Data Synchronization',
+    'positioning': 'Positioning',
+    'sensor': 'Sensor Technology',
+    'wireless': 'Wireless Connectivity',
+    'raw': 'Raw data access',
+}
+
+# Token composto: partes alfanuméricas ligadas por / - . +
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+(?:[/.+-][a-z0-9]+)*')
+JOINER_PATTERN = re.compile(r'([/.+-])')
+
+# Termos conferidos por --check (índice x varredura do texto)
+CHECK_TERMS = [
+    'sensor:ag/agcl', 'sensor:agcl', 'sync:lsl', 'aux:imu', 'aux:ppg', 'positioning:fp1',
+    'positioning:10-20', 'positioning:fp*', 'wireless:wi-fi', 'wireless:bluetooth', 'software:app',
+]
+
+OPERATORS = {'AND', 'OR', 'NOT'}
+
+
+# ============================================================================
+# TOKENIZAÇÃO
+# ============================================================================
+
+def tokenize(text):
+    """Tokens de uma célula: cada trecho contíguo dos compostos, sem repetição"""
+    tokens = set()
+    for token in TOKEN_PATTERN.findall(normalize(text)):
+        # "ag/agcl-coated" -> ['ag', '/', 'agcl', '-', 'coated']
+        pieces = JOINER_PATTERN.split(token)
+        n_parts = len(pieces) // 2 + 1
+        for start in range(n_parts):
+            for end in range(start + 1, n_parts + 1):
+                tokens.add(''.join(pieces[2 * start:2 * end - 1]))
+    return tuple(sorted(tokens - STOPWORDS))
+
+
+def _row_key(values):
+    """Hash do texto de uma linha (todas as colunas indexadas)"""
+    return hashlib.sha1('\x1f'.join(values).encode('utf-8')).hexdigest()
+
+
+# ============================================================================
+# CONSTRUÇÃO E ATUALIZAÇÃO
+# ============================================================================
+
+def empty_index():
+    return {
+        'version': INDEX_VERSION,
+        'csv_sha256': None,
+        'n': 0,
+        'models': [],
+        # (campo, token) -> id do termo; campo '*' = qualquer coluna
+        'terms': {},
+        # hash da linha -> ids dos termos (reaproveitado entre versões do CSV)
+        'row_terms': {},
+        # Linhas de todos os termos, em ordem de id; as do termo i estão em
+        # rows[offsets[i]:offsets[i + 1]] (ordenadas)
+        'rows': np.empty(0, dtype=np.int32),
+        'offsets': np.zeros(1, dtype=np.int64),
+        # campo -> tokens em ordem alfabética (consultas por prefixo)
+        'vocabulary': {}
+    }
+
+
+def load_index(index_path=INDEX_PATH):
+    """Índice salvo (ou vazio se não existir, for de outra versão ou estiver ilegível)"""
+    if os.path.exists(index_path):
+        try:
+            with open(index_path, 'rb') as f:
+                index = pickle.load(f)
+        except CACHE_ERRORS:
+            # Pickle truncado ou de outra versão: reconstrói
+            return empty_index()
+        if index.get('version') == INDEX_VERSION:
+            return index
+    return empty_index()
+
+
+def save_index(index, index_path=INDEX_PATH):
+    """Grava o índice de forma atômica"""
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, index_path)
+
+
+def _term_ids(terms, values):
+    """Ids dos termos de uma linha (por campo e em '*'), criando os novos"""
+    ids = set()
+    for field, value in zip(TEXT_COLUMNS, values):
+        for token in tokenize(value):
+            for key in ((field, token), ('*', token)):
+                ids.add(terms.setdefault(key, len(terms)))
+    return tuple(sorted(ids))
+
+
+def _postings(row_terms, n_terms):
+    """
+    Listas de linhas de todos os termos numa passada: os pares (termo, linha)
+    são ordenados pelo termo (estável, então as linhas seguem em ordem).
+
+    Returns:
+        (rows, offsets)
+    """
+    lengths = np.fromiter(map(len, row_terms), dtype=np.int64, count=len(row_terms))
+    ids = np.fromiter(chain.from_iterable(row_terms), dtype=np.int64, count=int(lengths.sum()))
+    rows = np.repeat(np.arange(len(row_terms), dtype=np.int32), lengths)
+    offsets = np.zeros(n_terms + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(ids, minlength=n_terms))
+    return rows[np.argsort(ids, kind='stable')], offsets
+
+
+def update_index(index, csv_path=CSV_PATH):
+    """
+    Sincroniza o índice com o CSV (nada a fazer se o hash não mudou).
+
+    Returns:
+        Contagens {'tokenizadas', 'reaproveitadas', 'descartadas'} de linhas
+    """
+    stats = Counter()
+    sha256 = csv_hash(csv_path)
+    if index['csv_sha256'] == sha256:
+        return {'tokenizadas': 0, 'reaproveitadas': index['n'], 'descartadas': 0}
+
+    columns = ['Model'] + list(TEXT_COLUMNS.values())
+    df = pd.read_csv(csv_path, encoding='utf-8', usecols=columns, dtype=str).fillna('')
+    text = df[list(TEXT_COLUMNS.values())].to_numpy()
+
+    # Os ids dos termos são estáveis entre versões (termos que somem ficam com lista vazia)
+    terms, previous = index['terms'], index['row_terms']
+    row_terms, per_row = {}, []
+    for values in text:
+        key = _row_key(values)
+        if key not in row_terms:
+            if key in previous:
+                row_terms[key] = previous[key]
+                stats['reaproveitadas'] += 1
+            else:
+                row_terms[key] = _term_ids(terms, values)
+                stats['tokenizadas'] += 1
+        per_row.append(row_terms[key])
+    stats['descartadas'] = len(set(previous) - set(row_terms))
+
+    rows, offsets = _postings(per_row, len(terms))
+    counts = np.diff(offsets)
+    vocabulary = {field: [] for field in list(TEXT_COLUMNS) + ['*']}
+    for (field, token), term_id in terms.items():
+        if counts[term_id]:
+            vocabulary[field].append(token)
+
+    index.update({
+        'csv_sha256': sha256,
+        'n': len(df),
+        'models': df['Model'].str.split('\n').str[0].str.strip().tolist(),
+        'row_terms': row_terms,
+        'rows': rows,
+        'offsets': offsets,
+        'vocabulary': {field: sorted(tokens) for field, tokens in vocabulary.items()}
+    })
+    return {key: stats[key] for key in ('tokenizadas', 'reaproveitadas', 'descartadas')}
+
+
+def build_index(csv_path=CSV_PATH, index_path=INDEX_PATH, rebuild=False):
+    """Carrega, atualiza e grava o índice; devolve (índice, contagens)"""
+    index = empty_index() if rebuild else load_index(index_path)
+    previous = index['csv_sha256']
+    changes = update_index(index, csv_path)
+    if index['csv_sha256'] != previous or not os.path.exists(index_path):
+        save_index(index, index_path)
+    return index, changes
+
+
+# ============================================================================
+# CONSULTA
+# ============================================================================
+
+def _lex(text):
+    """Parênteses, operadores (AND/OR/NOT, em qualquer caixa) e termos"""
+    return [t.upper() if t.upper() in OPERATORS else t for t in re.findall(r'\(|\)|[^\s()]+', text)]
+
+
+def postings(index, field, token):
+    """Linhas (ordenadas) que contêm o token no campo ('*' = qualquer coluna)"""
+    term_id = index['terms'].get((field, token))
+    if term_id is None:
+        return np.empty(0, dtype=np.int32)
+    offsets = index['offsets']
+    return index['rows'][offsets[term_id]:offsets[term_id + 1]]
+
+
+def _term_rows(index, term):
+    """Linhas de um termo: [campo:]token ou [campo:]prefixo*"""
+    field, _, word = term.rpartition(':') if ':' in term else ('*', '', term)
+    if field not in index['vocabulary']:
+        raise ValueError(f"Campo desconhecido: {field} (disponíveis: {', '.join(TEXT_COLUMNS)})")
+    prefix = word.endswith('*')
+    word = normalize(word.rstrip('*')).strip('/.+-')
+
+    if not prefix:
+        return postings(index, field, word)
+    vocabulary = index['vocabulary'][field]
+    start = bisect.bisect_left(vocabulary, word)
+    end = bisect.bisect_left(vocabulary, word + '\uffff', start)
+    matches = [postings(index, field, token) for token in vocabulary[start:end]]
+    return np.unique(np.concatenate(matches)) if matches else np.empty(0, dtype=np.int32)
+
+
+def _parse(index, tokens, position=0):
+    """
+    Descida recursiva: or := and (OR and)*; and := not ([AND] not)*;
+    not := NOT not | ( or ) | termo. Devolve (linhas, próxima posição).
+    """
+    def parse_or(i):
+        rows, i = parse_and(i)
+        while i < len(tokens) and tokens[i] == 'OR':
+            other, i = parse_and(i + 1)
+            rows = np.union1d(rows, other)
+        return rows, i
+
+    def parse_and(i):
+        rows, i = parse_not(i)
+        while i < len(tokens) and tokens[i] not in ('OR', ')'):
+            if tokens[i] == 'AND':
+                i += 1
+            other, i = parse_not(i)
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows, i
+
+    def parse_not(i):
+        if i >= len(tokens):
+            raise ValueError("Consulta incompleta")
+        if tokens[i] == 'NOT':
+            rows, i = parse_not(i + 1)
+            return np.setdiff1d(np.arange(index['n'], dtype=np.int32), rows, assume_unique=True), i
+        if tokens[i] == '(':
+            rows, i = parse_or(i + 1)
+            if i >= len(tokens) or tokens[i] != ')':
+                raise ValueError("Parêntese não fechado")
+            return rows, i + 1
+        if tokens[i] in OPERATORS or tokens[i] == ')':
+            raise ValueError(f"Termo esperado, encontrado {tokens[i]!r}")
+        return _term_rows(index, tokens[i]), i + 1
+
+    return parse_or(position)
+
+
+def search(index, text):
+    """
+    Linhas (ordem crescente) que satisfazem a consulta.
+
+    Args:
+        index: Índice (build_index / load_index)
+        text: Consulta com termos, campo:termo, prefixo*, AND/OR/NOT e parênteses
+    """
+    tokens = _lex(text)
+    if not tokens:
+        return np.empty(0, dtype=np.int32)
+    rows, end = _parse(index, tokens)
+    if end != len(tokens):
+        raise ValueError(f"Sobrou na consulta: {' '.join(tokens[end:])}")
+    return rows
+
+
+def check_terms(index, csv_path=CSV_PATH, terms=CHECK_TERMS):
+    """
+    Confere termos do índice com uma varredura do texto normalizado (o termo
+    entre caracteres não alfanuméricos).
+
+    Returns:
+        Lista de (termo, linhas no índice, linhas na varredura)
+    """
+    df = pd.read_csv(csv_path, encoding='utf-8', usecols=list(TEXT_COLUMNS.values()), dtype=str).fillna('')
+    results = []
+    for term in terms:
+        # A busca vem antes: valida o campo (ValueError com os disponíveis)
+        found = search(index, term)
+        field, _, word = term.rpartition(':') if ':' in term else ('*', '', term)
+        columns = list(TEXT_COLUMNS.values()) if field == '*' else [TEXT_COLUMNS[field]]
+        # Prefixo: só o começo precisa estar na fronteira
+        end = '' if word.endswith('*') else r'(?![a-z0-9])'
+        pattern = re.compile(r'(?<![a-z0-9])' + re.escape(normalize(word.rstrip('*'))) + end)
+        text = df[columns].apply(lambda column: column.map(normalize)).agg('\n'.join, axis=1)
+        scan = np.flatnonzero(text.map(lambda cell: bool(pattern.search(cell))).to_numpy())
+        results.append((term, found, scan))
+    return results
+
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def main(text, csv_path=CSV_PATH, index_path=INDEX_PATH, limit=20, rebuild=False, check=False):
+    index, changes = build_index(csv_path, index_path, rebuild)
+    if changes['tokenizadas'] or changes['descartadas']:
+        print("Índice atualizado: " + ", ".join(f"{count} {name}" for name, count in changes.items()))
+
+    try:
+        if check:
+            results = check_terms(index, csv_path, text.split() or CHECK_TERMS)
+        else:
+            start = time.perf_counter()
+            rows = search(index, text)
+            elapsed = time.perf_counter() - start
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    if check:
+        mismatches = 0
+        for term, found, scan in results:
+            ok = np.array_equal(found, scan)
+            mismatches += not ok
+            print(f"{'✅' if ok else '❌'} {term:<22} índice: {len(found):>6,} | varredura: {len(scan):>6,}")
+        return mismatches
+
+    print(f"Consulta: {text}")
+    print(f"{len(rows):,} de {index['n']:,} dispositivos ({elapsed * 1e6:,.0f} µs)\n")
+    for row in rows[:limit]:
+        print(f"  {row:>6}  {index['models'][row][:40]}")
+    if len(rows) > limit:
+        print(f"  ... e mais {len(rows) - limit:,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Índice invertido das colunas de texto do catálogo")
+    parser.add_argument('query', nargs='*', help="termos, campo:termo, prefixo*, AND/OR/NOT")
+    parser.add_argument('--csv', default=CSV_PATH, help="CSV da Table1")
+    parser.add_argument('--index', default=INDEX_PATH, help="arquivo do índice")
+    parser.add_argument('--limit', type=int, default=20, help="dispositivos listados")
+    parser.add_argument('--rebuild', action='store_true', help="reconstrói o índice do zero")
+    parser.add_argument('--check', action='store_true',
+                        help="confere os termos (ou CHECK_TERMS) com a varredura do texto")
+    args = parser.parse_args()
+    if not args.query and not args.check:
+        parser.error("informe uma consulta ou --check")
+    if main(' '.join(args.query), args.csv, args.index, args.limit, args.rebuild, args.check):
+        raise SystemExit(1)
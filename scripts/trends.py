@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de tendências temporais (R1C1, R3C5)
+Agrega o catálogo por ano em uma única passada agrupada e obtém qualquer
+conjunto de períodos (fixos, anuais ou janelas móveis) por diferença de
+somas acumuladas, localizando os limites com np.searchsorted.
+Usado pelo relatório (analyze_table) e pela figura (generate_timeline).
+"""
+
+import argparse
+import re
+
+import numpy as np
+import pandas as pd
+
+# Períodos usados no artigo
+DEFAULT_PERIODS = {
+    '2008-2014': (2008, 2014),
+    '2015-2018': (2015, 2018),
+    '2019-2022': (2019, 2022),
+    '2023-2025': (2023, 2025)
+}
+
+# Especificações aceitas: default, yearly, rolling ou rolling:N (N >= 1)
+PERIOD_SPEC = re.compile(r'default|yearly|rolling(?::[1-9]\d*)?')
+
+TREND_COLUMNS = [
+    'devices',
+    'avg_channels',
+    'avg_price',
+    'avg_cost_per_channel',
+    'pct_bluetooth',
+    'pct_wifi'
+]
+
+
+# ============================================================================
+# DEFINIÇÃO DE PERÍODOS
+# ============================================================================
+
+def yearly_periods(start, end):
+    """Um período por ano"""
+    return {str(year): (year, year) for year in range(start, end + 1)}
+
+
+def rolling_periods(start, end, window=3, step=1):
+    """Janelas móveis de `window` anos, avançando `step` anos"""
+    return {
+        f"{first}-{first + window - 1}": (first, first + window - 1)
+        for first in range(start, end - window + 2, step)
+    }
+
+
+def period_spec(value):
+    """Tipo argparse de --periods: erro de uso em vez de traceback"""
+    if not PERIOD_SPEC.fullmatch(value):
+        raise argparse.ArgumentTypeError(f"especificação de período desconhecida: {value!r} "
+                                         "(use default, yearly ou rolling:N com N >= 1)")
+    return value
+
+
+def parse_periods(spec, years=None):
+    """
+    Períodos a partir de uma especificação ('default', 'yearly', 'rolling:3').
+    'yearly' e 'rolling:N' cobrem do menor ao maior ano de `years` (a coluna
+    'year' do catálogo ou o índice de yearly_aggregates); sem anos, ficam vazios.
+    """
+    if spec is None or spec == 'default':
+        return dict(DEFAULT_PERIODS)
+    if not PERIOD_SPEC.fullmatch(spec):
+        raise ValueError(f"Especificação de período desconhecida: {spec!r}")
+
+    years = np.asarray([] if years is None else years, dtype=float)
+    years = years[~np.isnan(years)]
+    if not len(years):
+        return {}
+    start, end = int(years.min()), int(years.max())
+    if spec == 'yearly':
+        return yearly_periods(start, end)
+    _, _, window = spec.partition(':')
+    return rolling_periods(start, end, int(window or 3))
+
+
+# ============================================================================
+# AGREGAÇÃO
+# ============================================================================
+
+def yearly_aggregates(df):
+    """Somas e contagens por ano de lançamento (uma passada agrupada)"""
+    dated = df[df['year'].notna()]
+
+    # Canais e preços zero contam como ausentes
+    channels = dated['channels_max'].where(dated['channels_max'] != 0)
+    price = dated['price'].where(dated['price'] != 0)
+    # Custo por canal pareado no mesmo dispositivo
+    cost = price / channels
+
+    parts = pd.DataFrame({
+        'year': dated['year'].astype(int),
+        'devices': 1,
+        'channels_sum': channels.fillna(0),
+        'channels_n': channels.notna().astype(int),
+        'price_sum': price.fillna(0),
+        'price_n': price.notna().astype(int),
+        'cost_sum': cost.fillna(0),
+        'cost_n': cost.notna().astype(int),
+        'bluetooth': dated['bluetooth'].astype(int),
+        'wifi': dated['wifi'].astype(int)
+    })
+    return parts.groupby('year').sum()
+
+
+def _ratio(numerator, denominator, scale=1.0):
+    """Divisão elemento a elemento com 0 onde o denominador é 0"""
+    out = np.zeros(len(numerator), dtype=float)
+    np.divide(scale * numerator, denominator, out=out, where=denominator > 0)
+    return out
+
+
+def compute_trends(df, periods=None):
+    """Agregados por período: dispositivos, médias de canais/preço/$ por canal, % BT e Wi-Fi"""
+    return trends_from_yearly(yearly_aggregates(df), periods)
+
+
+def trends_from_yearly(yearly, periods=None):
+    """
+    Tendências por período a partir dos agregados anuais (yearly_aggregates).
+    Os agregados são somas, então os de partes do catálogo podem ser somados
+    antes (modo em blocos do analyze_table).
+    """
+    periods = DEFAULT_PERIODS if periods is None else periods
+
+    years = yearly.index.to_numpy()
+    values = yearly.to_numpy(dtype=float)
+    cumulative = np.vstack([np.zeros((1, values.shape[1])), values.cumsum(axis=0)])
+
+    starts = np.array([start for start, _ in periods.values()])
+    ends = np.array([end for _, end in periods.values()])
+    lo = np.searchsorted(years, starts, side='left')
+    hi = np.searchsorted(years, ends, side='right')
+
+    totals = pd.DataFrame(cumulative[hi] - cumulative[lo], index=list(periods), columns=yearly.columns)
+    devices = totals['devices'].to_numpy()
+
+    trends = pd.DataFrame({
+        'devices': devices.round().astype(int),
+        'avg_channels': _ratio(totals['channels_sum'].to_numpy(), totals['channels_n'].to_numpy()),
+        'avg_price': _ratio(totals['price_sum'].to_numpy(), totals['price_n'].to_numpy()),
+        'avg_cost_per_channel': _ratio(totals['cost_sum'].to_numpy(), totals['cost_n'].to_numpy()),
+        'pct_bluetooth': _ratio(totals['bluetooth'].to_numpy(), devices, 100),
+        'pct_wifi': _ratio(totals['wifi'].to_numpy(), devices, 100)
+    }, index=totals.index)
+    trends.index.name = 'period'
+    return trends